@@ -1,4 +1,15 @@
+from .driver_location import DriverLocationAdmin
 from .ride import RideAdmin
+from .ride_archive import ArchivedRideAdmin
 from .ride_event import RideEventAdmin
+from .ride_outbox import RideOutboxAdmin
+from .service_zone import ServiceZoneAdmin
 
-__all__ = ["RideAdmin", "RideEventAdmin"]
+__all__ = [
+    "ArchivedRideAdmin",
+    "DriverLocationAdmin",
+    "RideAdmin",
+    "RideEventAdmin",
+    "RideOutboxAdmin",
+    "ServiceZoneAdmin",
+]
@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from app_ride.models import DriverLocation
+
+
+@admin.register(DriverLocation)
+class DriverLocationAdmin(admin.ModelAdmin):
+    list_display = ["driver", "latitude", "longitude", "is_available", "updated_at"]
+    list_filter = ["is_available"]
+    list_select_related = ["driver"]
+    search_fields = ["^driver__email"]
+    autocomplete_fields = ["driver"]
+    ordering = ["-updated_at"]
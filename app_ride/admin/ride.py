@@ -1,7 +1,9 @@
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 
+from app_ride.admin.search import search_by_id_or_user
 from app_ride.models import Ride
+from utils.paginators import EstimatedCountPaginator
 
 User = get_user_model()
 
@@ -9,11 +11,26 @@ User = get_user_model()
 @admin.register(Ride)
 class RideAdmin(admin.ModelAdmin):
     list_display = ["id", "rider", "driver", "status", "pickup_time", "created_at"]
-    list_filters = ["status"]
-    search_fields = ["rider__email", "driver__email"]
+    list_filter = ["status"]
+    search_fields = ["=id", "^rider__email", "^driver__email"]
+    search_help_text = "Ride id, or the start of the rider's or driver's email."
+    autocomplete_fields = ["rider", "driver"]
+    ordering = ["-id"]
+
+    # The changelist of a large table must not count every row.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     # This will limit the rider and driver's selection to basic users only.
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name in ["rider", "driver"]:
             kwargs["queryset"] = User.objects.exclude(role="admin")
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_queryset(self, request):
+        # `Ride.__str__` shows the rider, e.g. in the RideEvent ride autocomplete.
+        # Joined here rather than with `list_select_related` so every admin view gets it.
+        return super().get_queryset(request).select_related("rider", "driver")
+
+    def get_search_results(self, request, queryset, search_term):
+        return search_by_id_or_user(queryset, search_term, ["rider", "driver"]), False
@@ -0,0 +1,40 @@
+from django.contrib import admin
+
+from app_ride.admin.search import search_by_id_or_user
+from app_ride.models import ArchivedRide, ArchivedRideEvent
+from utils.paginators import EstimatedCountPaginator
+
+
+class ArchivedRideEventInline(admin.TabularInline):
+    model = ArchivedRideEvent
+    fields = ["event_type", "to_status", "description", "created_at"]
+    readonly_fields = fields
+    can_delete = False
+    extra = 0
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedRide)
+class ArchivedRideAdmin(admin.ModelAdmin):
+    """Read-only, archived rides are only written by `archive_rides`."""
+
+    list_display = ["id", "rider", "driver", "status", "pickup_time", "archived_at"]
+    list_select_related = ["rider", "driver"]
+    search_fields = ["=id", "^rider__email", "^driver__email"]
+    search_help_text = "Ride id, or the start of the rider's or driver's email."
+    ordering = ["-id"]
+    inlines = [ArchivedRideEventInline]
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_search_results(self, request, queryset, search_term):
+        return search_by_id_or_user(queryset, search_term, ["rider", "driver"]), False
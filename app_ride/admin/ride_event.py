@@ -1,9 +1,35 @@
 from django.contrib import admin
 
+from app_ride.admin.search import search_by_id_or_user
 from app_ride.models.ride_event import RideEvent
+from utils.paginators import EstimatedCountPaginator
 
 
 @admin.register(RideEvent)
 class RideEventAdmin(admin.ModelAdmin):
-    list_display = ["id", "ride", "description", "created_at"]
-    search_fields = ["description", "ride__rider__email", "ride__driver__email"]
+    list_display = [
+        "id",
+        "ride",
+        "event_type",
+        "to_status",
+        "description",
+        "created_at",
+    ]
+    list_filter = ["event_type", "to_status"]
+    list_select_related = ["ride__rider"]
+    search_fields = ["=id", "^ride__rider__email", "^ride__driver__email"]
+    search_help_text = "Event id, or the start of the ride's rider or driver email."
+    autocomplete_fields = ["ride"]
+    ordering = ["-id"]
+
+    # The changelist of a large table must not count every row.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        return (
+            search_by_id_or_user(
+                queryset, search_term, ["ride__rider", "ride__driver"]
+            ),
+            False,
+        )
@@ -0,0 +1,29 @@
+from django.contrib import admin
+from django.utils.timezone import now
+
+from app_ride.models import RideOutbox
+
+
+@admin.register(RideOutbox)
+class RideOutboxAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "ride_id",
+        "handler",
+        "status",
+        "attempts",
+        "available_at",
+        "created_at",
+    ]
+    list_filter = ["status", "handler"]
+    search_fields = ["=ride_id"]
+    readonly_fields = ["created_at"]
+    ordering = ["-id"]
+    actions = ["retry"]
+
+    @admin.action(description="Retry the selected messages now")
+    def retry(self, request, queryset):
+        count = queryset.update(
+            status=RideOutbox.PENDING, attempts=0, available_at=now(), last_error=""
+        )
+        self.message_user(request, f"{count} message(s) will be retried.")
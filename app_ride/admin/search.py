@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+def matching_user_ids(search_term):
+    """
+    Ids of users whose email starts with `search_term`.
+
+    Resolving users first keeps ride searches on the rider/driver foreign key
+    indexes instead of an OR across two joins, and the prefix match is served by
+    the `UPPER(email)` pattern index on PostgreSQL.
+    """
+    return User.objects.filter(email__istartswith=search_term.strip()).values("pk")
+
+
+def search_by_id_or_user(queryset, search_term, user_lookups):
+    """Filter `queryset` by exact id, or by users matched in `user_lookups`."""
+    search_term = search_term.strip()
+    if not search_term:
+        return queryset
+
+    if search_term.isdigit():
+        return queryset.filter(pk=int(search_term))
+
+    user_ids = matching_user_ids(search_term)
+    matches = queryset.none()
+    for lookup in user_lookups:
+        matches |= queryset.filter(**{f"{lookup}__in": user_ids})
+    return matches
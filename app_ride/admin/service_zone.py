@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from app_ride.models import ServiceZone
+
+
+@admin.register(ServiceZone)
+class ServiceZoneAdmin(admin.ModelAdmin):
+    list_display = ["code", "name", "is_active", "updated_at"]
+    list_filter = ["is_active"]
+    search_fields = ["code", "name"]
+    readonly_fields = ["min_latitude", "max_latitude", "min_longitude", "max_longitude"]
+    ordering = ["code"]
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AppRideConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "app_ride"
+
+    def ready(self):
+        from app_ride import signals  # noqa: F401
@@ -0,0 +1,113 @@
+"""
+Hot/cold storage of rides.
+
+Completed rides older than `RIDE_ARCHIVE_AFTER_DAYS` are moved with their
+events into `ArchivedRide`/`ArchivedRideEvent` in small batches, each in its
+own short transaction, so the live tables (and their indexes) only hold recent
+and in-progress rides. Each ride database is archived on its own. Run it with
+`python manage.py archive_rides`.
+"""
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Value
+
+from app_ride.models import ArchivedRide, ArchivedRideEvent, Ride, RideEvent
+from app_ride.signals import archiving_rides
+
+RIDE_FIELDS = [field.attname for field in Ride._meta.concrete_fields]
+EVENT_FIELDS = [field.attname for field in RideEvent._meta.concrete_fields]
+
+
+def archivable_rides(cutoff, using=DEFAULT_DB_ALIAS):
+    """Completed rides picked up before `cutoff`, served by the (status, pickup_time) index."""
+    return Ride.objects.using(using).filter(status="dropoff", pickup_time__lt=cutoff)
+
+
+def archive_batch(cutoff, batch_size=1000, using=DEFAULT_DB_ALIAS):
+    """
+    Move up to `batch_size` archivable rides of one ride database and their
+    events, returns how many moved. The archive rows stay in the same database.
+    """
+    with transaction.atomic(using=using):
+        ride_ids = list(
+            archivable_rides(cutoff, using)
+            .order_by("pickup_time")
+            .select_for_update(skip_locked=True)
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ride_ids:
+            return 0
+
+        rides = Ride.objects.using(using).filter(pk__in=ride_ids)
+        ArchivedRide.objects.using(using).bulk_create(
+            ArchivedRide(**ride) for ride in rides.values(*RIDE_FIELDS)
+        )
+        events = RideEvent.objects.using(using).filter(ride_id__in=ride_ids)
+        ArchivedRideEvent.objects.using(using).bulk_create(
+            (ArchivedRideEvent(**event) for event in events.values(*EVENT_FIELDS)),
+            batch_size=batch_size,
+        )
+
+        events.delete()
+        with archiving_rides():
+            rides.delete()
+        return len(ride_ids)
+
+
+class CombinedRides:
+    """
+    Live and archived rides as one ordered, sliceable sequence for pagination.
+
+    The requested page is resolved on `(id, ordering fields)` only through a
+    UNION of both tables, then the rows of that page are loaded from each table
+    with the querysets' annotations and prefetches. Without `archived` it pages
+    the live rides alone, see `app_ride.sharding.ShardedRides`.
+    """
+
+    def __init__(self, live, archived=None):
+        self.live = live
+        self.archived = archived
+        self.ordering = [
+            "-id" if field == "-pk" else "id" if field == "pk" else field
+            for field in (live.query.order_by or ["-pk"])
+        ]
+        self.key_fields = list(
+            dict.fromkeys(["id", *(field.lstrip("-") for field in self.ordering)])
+        )
+
+    def keys(self, queryset, archived):
+        return (
+            queryset.order_by()
+            .prefetch_related(None)
+            .annotate(is_archived=Value(archived))
+            .values_list(*self.key_fields, "is_archived")
+        )
+
+    def count(self):
+        if self.archived is None:
+            return self.live.count()
+        return self.live.count() + self.archived.count()
+
+    def __len__(self):
+        return self.count()
+
+    def rows(self, index):
+        """Keys of the rows in `index` (a slice), `(id, *ordering fields, is_archived)`."""
+        keys = self.keys(self.live, False)
+        if self.archived is not None:
+            keys = keys.union(self.keys(self.archived, True), all=True)
+        return keys.order_by(*self.ordering)[index]
+
+    def load(self, rows):
+        live = self.live.in_bulk([row[0] for row in rows if not row[-1]])
+        archived = (
+            self.archived.in_bulk([row[0] for row in rows if row[-1]])
+            if self.archived is not None
+            else {}
+        )
+        return [(archived if row[-1] else live)[row[0]] for row in rows]
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index : index + 1][0]
+        return self.load(list(self.rows(index)))
@@ -0,0 +1,356 @@
+"""
+Batch dispatch: assign unassigned pending rides to available drivers.
+
+Batches up to `DISPATCH_OPTIMAL_MAX` rides or drivers are solved optimally
+(minimum total pickup distance, Hungarian algorithm) over one vectorized
+haversine distance matrix. Larger ones are solved greedily from KD-tree nearest
+neighbours, without a full matrix. All assignments of a batch are committed in
+one transaction per ride database. Run it with `python manage.py dispatch_rides`.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Exists, OuterRef
+from django.utils.timezone import now, timedelta
+from scipy.optimize import linear_sum_assignment
+from scipy.spatial import cKDTree
+
+from app_ride.models import DriverLocation, Ride, RideChange, RideCounter
+from app_ride.sharding import ride_databases
+from app_ride.streams import publish_ride_change
+
+EARTH_RADIUS_KM = 6371.0
+
+# Rows of the distance matrix computed at once, bounds the float64 temporaries.
+CHUNK_ROWS = 1024
+
+# Nearest candidates per ride and per driver in each greedy round.
+GREEDY_CANDIDATES = 8
+
+
+def unit_vectors(points):
+    """(latitude, longitude) pairs in degrees to unit vectors on the sphere."""
+    lat, lng = np.radians(np.asarray(points, dtype=np.float64).reshape(-1, 2)).T
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)])
+
+
+def distance_matrix(pickups, drivers, dtype=np.float32):
+    """
+    Great-circle distance in km from every pickup (rows) to every driver (columns).
+
+    `pickups` and `drivers` are sequences of (latitude, longitude) pairs. The
+    chord between the unit vectors comes from one matrix product, which is the
+    haversine formula without a trig call per pair.
+    """
+    pickups = unit_vectors(pickups)
+    drivers = unit_vectors(drivers)
+
+    matrix = np.empty((len(pickups), len(drivers)), dtype=dtype)
+    for start in range(0, len(pickups), CHUNK_ROWS):
+        # squared chord = 2 - 2 cos(angle), half chord = sin(angle / 2)
+        half_chord = 1 - pickups[start : start + CHUNK_ROWS] @ drivers.T
+        np.clip(half_chord, 0, 2, out=half_chord)
+        np.sqrt(half_chord / 2, out=half_chord)
+        matrix[start : start + CHUNK_ROWS] = (
+            2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(half_chord, 1))
+        )
+    return matrix
+
+
+def solve_optimal(cost, max_distance):
+    """Minimum total distance assignment, pairs beyond `max_distance` are dropped."""
+    # Out of range pairs get a prohibitive cost instead of inf so a full matching
+    # always exists, they are filtered out afterwards.
+    penalty = max(float(cost.max(initial=0)), max_distance) * (min(cost.shape) + 1)
+    feasible = cost <= max_distance
+    rows, cols = linear_sum_assignment(np.where(feasible, cost, penalty))
+
+    keep = feasible[rows, cols]
+    return rows[keep], cols[keep]
+
+
+def chord_to_km(chord):
+    """Great-circle distance in km of the chord between two unit vectors."""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.asarray(chord) / 2, 1))
+
+
+def km_to_chord(km):
+    return 2 * np.sin(min(km / (2 * EARTH_RADIUS_KM), np.pi / 2))
+
+
+def nearest_pairs(points, targets, k, max_chord):
+    """
+    `(point index, target index, chord)` arrays of the `k` nearest targets of
+    every point, within `max_chord`.
+    """
+    chords, indexes = cKDTree(targets).query(
+        points,
+        k=min(k, len(targets)),
+        distance_upper_bound=max_chord,
+        workers=-1,
+    )
+    chords = chords.reshape(len(points), -1)
+    indexes = indexes.reshape(len(points), -1)
+    rows, ranks = np.nonzero(np.isfinite(chords))
+    return rows, indexes[rows, ranks], chords[rows, ranks]
+
+
+def sweep(rows, cols, n_rides, n_drivers):
+    """
+    Indexes of the pairs taken by one pass over pairs sorted by distance, each
+    taken when its ride and driver are both still free.
+
+    Done as rounds of the pairs that come first for both their ride and their
+    driver, which are exactly the ones the pass would take, so numpy does the
+    work instead of a Python loop.
+    """
+    index = np.arange(rows.size)
+    first_ride = np.empty(n_rides, dtype=np.intp)
+    first_driver = np.empty(n_drivers, dtype=np.intp)
+    taken = []
+    while index.size:
+        ride, driver = rows[index], cols[index]
+        # written in reverse, so the earliest pair of each ride and driver wins
+        first_ride[ride[::-1]] = index[::-1]
+        first_driver[driver[::-1]] = index[::-1]
+        lead = (first_ride[ride] == index) & (first_driver[driver] == index)
+        taken.append(index[lead])
+
+        taken_rides = np.zeros(n_rides, dtype=bool)
+        taken_rides[ride[lead]] = True
+        taken_drivers = np.zeros(n_drivers, dtype=bool)
+        taken_drivers[driver[lead]] = True
+        index = index[~taken_rides[ride] & ~taken_drivers[driver]]
+    return np.concatenate(taken) if taken else np.empty(0, dtype=np.intp)
+
+
+def solve_greedy(pickups, drivers, max_distance, k=GREEDY_CANDIDATES):
+    """
+    Closest pairs first, for batches too large to solve optimally.
+
+    Candidate pairs are the `k` nearest free drivers of every ride and the `k`
+    nearest free rides of every driver, found with KD-trees over the unit
+    vectors, and are swept once in distance order (see `sweep`). A ride or
+    driver whose candidates were all taken by closer pairs gets new ones for
+    another sweep, one whose query finds nobody in range is done. Every sweep
+    assigns at least the closest remaining pair.
+
+    Returns the ride rows, driver columns and distances in km.
+    """
+    points = [unit_vectors(pickups), unit_vectors(drivers)]
+    sizes = [len(points[0]), len(points[1])]
+    max_chord = km_to_chord(max_distance)
+
+    taken = [np.zeros(sizes[0], dtype=bool), np.zeros(sizes[1], dtype=bool)]
+    # candidates still open: ride, driver, chord and whose list they are from
+    pairs = [np.empty(0, dtype=np.intp)] * 2 + [np.empty(0), np.empty(0, dtype=int)]
+    queried = [np.arange(sizes[0]), np.arange(sizes[1])]
+    assigned = []
+
+    while True:
+        found = [pairs]
+        for side, other in [(0, 1), (1, 0)]:
+            targets = np.flatnonzero(~taken[other])
+            if not queried[side].size or not targets.size:
+                continue
+            own, target, chords = nearest_pairs(
+                points[side][queried[side]], points[other][targets], k, max_chord
+            )
+            ends = [queried[side][own], targets[target]]
+            found.append([ends[side], ends[other], chords, np.full(chords.size, side)])
+        rows, cols, chords, lists = (np.concatenate(parts) for parts in zip(*found))
+        if not rows.size:
+            break
+
+        order = np.argsort(chords, kind="stable")
+        rows, cols, chords, lists = (
+            rows[order],
+            cols[order],
+            chords[order],
+            lists[order],
+        )
+        chosen = sweep(rows, cols, *sizes)
+        assigned.append((rows[chosen], cols[chosen], chords[chosen]))
+        taken[0][rows[chosen]] = True
+        taken[1][cols[chosen]] = True
+
+        # Pairs of two free ends stay candidates. A free ride or driver whose
+        # own list lost all of them is queried again.
+        keep = ~taken[0][rows] & ~taken[1][cols]
+        pairs = [rows[keep], cols[keep], chords[keep], lists[keep]]
+        for side, ends in enumerate([rows, cols]):
+            had_list = np.zeros(sizes[side], dtype=bool)
+            had_list[ends[lists == side]] = True
+            has_list = np.zeros(sizes[side], dtype=bool)
+            has_list[ends[keep & (lists == side)]] = True
+            queried[side] = np.flatnonzero(had_list & ~has_list & ~taken[side])
+
+    if not assigned:
+        return (
+            np.empty(0, dtype=np.intp),
+            np.empty(0, dtype=np.intp),
+            np.empty(0, dtype=np.float64),
+        )
+    rows, cols, chords = (np.concatenate(parts) for parts in zip(*assigned))
+    return rows, cols, chord_to_km(chords)
+
+
+def solve(pickups, drivers, max_distance):
+    """Ride rows, driver columns and distances in km of the assignment."""
+    if max(len(pickups), len(drivers)) <= settings.DISPATCH_OPTIMAL_MAX:
+        cost = distance_matrix(pickups, drivers)
+        rows, cols = solve_optimal(cost, max_distance)
+        return rows, cols, cost[rows, cols].astype(np.float64)
+    return solve_greedy(pickups, drivers, max_distance)
+
+
+@dataclass
+class DispatchResult:
+    rides: int
+    drivers: int
+    assigned: int
+    total_distance: float
+
+
+def pending_rides(limit, using=DEFAULT_DB_ALIAS):
+    return (
+        Ride.objects.using(using)
+        .filter(status="pending", driver__isnull=True)
+        .order_by("pickup_time")
+        .values_list("id", "rider_id", "pickup_latitude", "pickup_longitude")[:limit]
+    )
+
+
+def available_drivers():
+    """Drivers online with a fresh position and no ride in progress in any ride database."""
+    drivers = DriverLocation.objects.filter(
+        is_available=True,
+        updated_at__gte=now() - timedelta(seconds=settings.DISPATCH_LOCATION_MAX_AGE),
+        driver__is_active=True,
+    ).exclude(driver__role="admin")
+
+    for alias in ride_databases():
+        if alias == DEFAULT_DB_ALIAS:
+            busy = Ride.objects.filter(driver=OuterRef("driver_id")).exclude(
+                status="dropoff"
+            )
+            drivers = drivers.exclude(Exists(busy))
+        else:
+            # rides of another database cannot be joined, exclude their drivers by id
+            busy = (
+                Ride.objects.using(alias)
+                .filter(driver__isnull=False)
+                .exclude(status="dropoff")
+                .values_list("driver_id", flat=True)
+                .distinct()
+            )
+            drivers = drivers.exclude(driver_id__in=list(busy))
+
+    return drivers.values_list("driver_id", "latitude", "longitude")
+
+
+def dispatch_pending(max_distance=None, limit=10000):
+    """
+    Assign one batch of pending rides per ride database, returns what was assigned.
+
+    Regions are far apart, so each database's rides are solved on their own
+    against the drivers still free.
+    """
+    max_distance = max_distance or settings.DISPATCH_MAX_DISTANCE_KM
+
+    drivers = list(available_drivers())
+    result = DispatchResult(0, len(drivers), 0, 0.0)
+    for alias in ride_databases():
+        rides = list(pending_rides(limit, alias))
+        result.rides += len(rides)
+        if not rides or not drivers:
+            continue
+
+        rows, cols, distances = solve(
+            [(lat, lng) for _, _, lat, lng in rides],
+            [(lat, lng) for _, lat, lng in drivers],
+            max_distance,
+        )
+        pairs = [
+            (rides[row], drivers[col][0], distance)
+            for row, col, distance in zip(
+                rows.tolist(), cols.tolist(), distances.tolist()
+            )
+        ]
+        assigned = commit_assignments(pairs, using=alias)
+
+        result.assigned += len(assigned)
+        result.total_distance += sum(distance for _, _, distance in assigned)
+        taken = {driver_id for _, driver_id, _ in assigned}
+        drivers = [driver for driver in drivers if driver[0] not in taken]
+
+    return result
+
+
+def commit_assignments(pairs, using=DEFAULT_DB_ALIAS):
+    """
+    Write all assignments of one ride database in one transaction.
+
+    Rides and drivers are locked with SKIP LOCKED and re-checked, so anything
+    changed since the batch was read is simply left for the next run. The
+    counters and change feed that `Ride.save()` signals maintain are updated in
+    bulk here.
+    """
+    # driver locations live in `default`, lock them for the whole write too
+    with transaction.atomic(using=using), transaction.atomic(using=DEFAULT_DB_ALIAS):
+        ride_ids = [ride[0] for ride, _, _ in pairs]
+        driver_ids = [driver_id for _, driver_id, _ in pairs]
+
+        still_pending = set(
+            Ride.objects.using(using)
+            .select_for_update(skip_locked=True)
+            .filter(pk__in=ride_ids, status="pending", driver__isnull=True)
+            .values_list("pk", flat=True)
+        )
+        still_free = set(
+            available_drivers()
+            .select_for_update(skip_locked=True, of=("self",))
+            .filter(driver_id__in=driver_ids)
+            .values_list("driver_id", flat=True)
+        )
+        pairs = [
+            (ride, driver_id, distance)
+            for ride, driver_id, distance in pairs
+            if ride[0] in still_pending and driver_id in still_free
+        ]
+        if not pairs:
+            return []
+
+        Ride.objects.using(using).bulk_update(
+            [Ride(pk=ride[0], driver_id=driver_id) for ride, driver_id, _ in pairs],
+            ["driver"],
+            batch_size=1000,
+        )
+        RideCounter.objects.db_manager(using).apply(
+            Counter(
+                (RideCounter.ACTIVE_DRIVER, str(driver_id)) for _, driver_id, _ in pairs
+            )
+        )
+        RideChange.objects.using(using).bulk_create(
+            [
+                RideChange(ride_id=ride[0], kind=RideChange.UPDATED)
+                for ride, _, _ in pairs
+            ],
+            batch_size=1000,
+        )
+
+        for (ride_id, rider_id, _, _), driver_id, _ in pairs:
+            publish_ride_change(
+                Ride(
+                    pk=ride_id, rider_id=rider_id, driver_id=driver_id, status="pending"
+                ),
+                type="assigned",
+            )
+        return pairs
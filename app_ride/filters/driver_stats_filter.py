@@ -0,0 +1,17 @@
+import django_filters
+
+from app_ride.models import DriverDailyStats, DriverMonthlyStats
+
+
+class DriverMonthlyStatsFilter(django_filters.FilterSet):
+    period_from = django_filters.DateFilter(field_name="period", lookup_expr="gte")
+    period_to = django_filters.DateFilter(field_name="period", lookup_expr="lte")
+
+    class Meta:
+        model = DriverMonthlyStats
+        fields = ["driver", "period", "period_from", "period_to"]
+
+
+class DriverDailyStatsFilter(DriverMonthlyStatsFilter):
+    class Meta(DriverMonthlyStatsFilter.Meta):
+        model = DriverDailyStats
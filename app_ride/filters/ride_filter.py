@@ -2,6 +2,7 @@ import django_filters
 from django.db.models import Q
 
 from app_ride.models.ride import Ride
+from app_ride.zones import rides_in_zone
 
 
 class RideFilter(django_filters.FilterSet):
@@ -15,11 +16,17 @@ class RideFilter(django_filters.FilterSet):
         ]
     )
 
+    region = django_filters.CharFilter()
+    zone = django_filters.CharFilter(method="filter_zone")
+
     class Meta:
         model = Ride
-        fields = ["search", "status"]
+        fields = ["search", "status", "region", "zone"]
 
     def filter_search(self, queryset, name, value):
         return queryset.filter(
             Q(rider__email__icontains=value) | Q(driver__email__icontains=value)
         )
+
+    def filter_zone(self, queryset, name, value):
+        return rides_in_zone(queryset, value)
@@ -0,0 +1,138 @@
+"""
+Pickup and dropoff density heatmaps aggregated in SQL.
+
+The map is cut into square tiles of `360 / 2**zoom` degrees, each split into
+`HEATMAP_TILE_CELLS` x `HEATMAP_TILE_CELLS` cells. A tile is one `GROUP BY`
+query per ride database returning the ride count and centroid of every non
+empty cell, and is cached for `HEATMAP_CACHE_SECONDS`. Time windows are widened
+to whole `HEATMAP_WINDOW_STEP_SECONDS` steps so nearby requests share tiles.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, F
+from django.db.models.functions import Floor
+
+from app_ride.models import Ride
+from app_ride.sharding import ride_databases
+
+POINTS = ["pickup", "dropoff"]
+
+
+@dataclass(frozen=True)
+class Heatmap:
+    zoom: int
+    # "pickup" or "dropoff"
+    point: str
+    start: datetime
+    end: datetime
+    status: Optional[str] = None
+
+    @property
+    def tile_size(self) -> float:
+        return 360 / 2**self.zoom
+
+    @property
+    def cell_size(self) -> float:
+        return self.tile_size / settings.HEATMAP_TILE_CELLS
+
+    def tiles(
+        self, south: float, west: float, north: float, east: float
+    ) -> list[tuple[int, int]]:
+        """(column, row) of the tiles covering the bounding box."""
+        size = self.tile_size
+
+        def span(low, high, offset):
+            first = math.floor((low + offset) / size)
+            return range(first, max(math.ceil((high + offset) / size), first + 1))
+
+        columns, rows = span(west, east, 180), span(south, north, 90)
+        if len(columns) * len(rows) > settings.HEATMAP_MAX_TILES:
+            raise ValueError(
+                f"The area covers {len(columns) * len(rows)} tiles at zoom {self.zoom}, "
+                f"at most {settings.HEATMAP_MAX_TILES} are allowed: zoom out or narrow bbox."
+            )
+        return [(column, row) for row in rows for column in columns]
+
+    def cache_key(self, tile: tuple[int, int]) -> str:
+        return (
+            f"heatmap:{self.point}:{self.status or ''}:{self.start.timestamp():.0f}:"
+            f"{self.end.timestamp():.0f}:{self.zoom}:{tile[0]}:{tile[1]}"
+        )
+
+    def cells(self, tiles: list[tuple[int, int]]) -> list[list]:
+        """`[cell id, count, latitude, longitude]` of every non empty cell of the tiles."""
+        keys = {self.cache_key(tile): tile for tile in tiles}
+        found = cache.get_many(keys)
+        missing = {
+            key: self.tile_cells(tile) for key, tile in keys.items() if key not in found
+        }
+        if missing:
+            cache.set_many(missing, settings.HEATMAP_CACHE_SECONDS)
+        found.update(missing)
+        return [cell for key in keys for cell in found[key]]
+
+    def tile_cells(self, tile: tuple[int, int]) -> list[list]:
+        column, row = tile
+        size, cell = self.tile_size, self.cell_size
+        latitude, longitude = f"{self.point}_latitude", f"{self.point}_longitude"
+        west, south = column * size - 180, row * size - 90
+
+        rides = Ride.objects.filter(
+            pickup_time__gte=self.start,
+            pickup_time__lt=self.end,
+            **{
+                f"{latitude}__gte": south,
+                f"{latitude}__lt": south + size,
+                f"{longitude}__gte": west,
+                f"{longitude}__lt": west + size,
+            },
+        )
+        if self.status:
+            rides = rides.filter(status=self.status)
+        grouped = (
+            rides.order_by()
+            .values(
+                column=Floor((F(longitude) + 180) / cell),
+                row=Floor((F(latitude) + 90) / cell),
+            )
+            .annotate(
+                count=Count("pk"), latitude=Avg(latitude), longitude=Avg(longitude)
+            )
+            .values_list("column", "row", "count", "latitude", "longitude")
+        )
+
+        # each ride database holds its own rides, sum counts and weight centroids
+        cells = {}
+        for alias in ride_databases():
+            for cell_column, cell_row, count, lat, lng in grouped.using(alias):
+                key = f"{int(cell_column)}:{int(cell_row)}"
+                total, lat_sum, lng_sum = cells.get(key, (0, 0.0, 0.0))
+                cells[key] = (
+                    total + count,
+                    lat_sum + lat * count,
+                    lng_sum + lng * count,
+                )
+
+        return [
+            [key, total, round(lat_sum / total, 6), round(lng_sum / total, 6)]
+            for key, (total, lat_sum, lng_sum) in sorted(cells.items())
+        ]
+
+
+def snap_window(start: datetime, end: datetime) -> tuple[datetime, datetime]:
+    """Widen the window to whole `HEATMAP_WINDOW_STEP_SECONDS` steps."""
+    step = settings.HEATMAP_WINDOW_STEP_SECONDS
+    start = math.floor(start.timestamp() / step) * step
+    end = math.ceil(end.timestamp() / step) * step
+    return (
+        datetime.fromtimestamp(start, tz=timezone.utc),
+        datetime.fromtimestamp(end, tz=timezone.utc),
+    )
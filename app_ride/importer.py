@@ -0,0 +1,565 @@
+"""
+Streaming bulk import of rides and ride events from CSV or NDJSON files.
+
+Files are read record by record and imported in batches: each batch is
+validated with set lookups (referenced users and rides are fetched once per
+batch, admin users once per run) and inserted with `COPY` on PostgreSQL or
+`bulk_create` elsewhere, in its own transaction. After every batch the byte
+offset reached is written to a checkpoint file so an interrupted import resumes
+where it stopped. The transaction inserting a batch also stores that offset on
+its database (`ImportProgress`), so a batch committed just before a crash, ahead
+of the checkpoint, is not imported twice. Run it with
+`python manage.py import_rides`.
+
+Rows are inserted directly, bypassing `Ride.save()` and its signals: run
+`reconcile_ride_counters` and `rebuild_driver_stats` afterwards (the command
+does by default). The change feed and zone rows the signals would write are
+written with each batch, in its transaction, so feed clients, the pickup
+scheduler and zone filters see the imported rides. Each row goes to its ride
+database (see app_ride.sharding), a batch spanning several databases commits
+once per database.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterator, Optional
+
+import orjson
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware, now
+
+from app_ride.models import ImportProgress, Ride, RideChange, RideEvent, RideZone
+from app_ride.sharding import (
+    database_for_id,
+    database_for_region,
+    region_for_point,
+    ride_databases,
+)
+from app_ride.zones import ride_zones
+
+
+class RowError(ValueError):
+    """A record that cannot be imported, the message says why."""
+
+
+class LineReader:
+    """Iterate the decoded lines of a binary file, tracking the byte offset consumed."""
+
+    def __init__(self, file):
+        self.file = file
+        self.offset = file.tell()
+
+    def __iter__(self) -> Iterator[str]:
+        for raw in self.file:
+            self.offset += len(raw)
+            yield raw.decode("utf-8")
+
+
+def read_records(file, fmt: str, offset: int = 0) -> Iterator[tuple[dict, int]]:
+    """
+    Yield `(record, offset after the record)` from a CSV or NDJSON file.
+
+    CSV records may span several lines (quoted newlines), the reader only pulls
+    the lines of one record at a time so the offset is exact either way.
+    """
+    if fmt == "csv":
+        file.seek(0)
+        header_reader = LineReader(file)
+        header = next(csv.reader(header_reader), None)
+        if header is None:
+            return
+        file.seek(max(offset, header_reader.offset))
+        lines = LineReader(file)
+        for values in csv.reader(lines):
+            if values:
+                yield dict(zip(header, values)), lines.offset
+    else:
+        file.seek(offset)
+        lines = LineReader(file)
+        for line in lines:
+            if line.strip():
+                yield orjson.loads(line), lines.offset
+
+
+def detect_format(path: str) -> str:
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+
+def blank(value) -> bool:
+    return value is None or value == ""
+
+
+def to_int(value, name: str, required: bool = True) -> Optional[int]:
+    if blank(value):
+        if required:
+            raise RowError(f"{name} is required.")
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RowError(f"{name} must be an integer, got {value!r}.")
+
+
+def to_float(value, name: str, bound: float) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise RowError(f"{name} must be a number, got {value!r}.")
+    if not -bound <= number <= bound:
+        raise RowError(f"{name} must be between -{bound} and {bound}.")
+    return number
+
+
+def to_datetime(value, name: str, default: Optional[datetime] = None) -> datetime:
+    if blank(value):
+        if default is None:
+            raise RowError(f"{name} is required.")
+        return default
+    parsed = parse_datetime(str(value))
+    if parsed is None:
+        raise RowError(f"{name} must be an ISO 8601 datetime, got {value!r}.")
+    return make_aware(parsed) if is_naive(parsed) else parsed
+
+
+def to_choice(value, name: str, choices, required: bool = True) -> Optional[str]:
+    if blank(value):
+        if required:
+            raise RowError(f"{name} is required.")
+        return None
+    if value not in choices:
+        raise RowError(f"{name} must be one of {', '.join(choices)}, got {value!r}.")
+    return value
+
+
+def int_ids(values) -> set[int]:
+    """The values usable as primary keys, for one `pk__in` lookup per batch."""
+    ids = set()
+    for value in values:
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            pass
+    return ids
+
+
+def pick(record: dict, name: str):
+    """`rider` or `rider_id` style keys, as exported by dumpdata or a SQL client."""
+    value = record.get(name)
+    return record.get(f"{name}_id") if value is None else value
+
+
+class Importer:
+    """Validate and insert batches of one model's records."""
+
+    model = None
+    columns: list[str] = []
+
+    def __init__(self):
+        # databases rows were inserted into, their sequences are reset at the end
+        self.written: set[str] = set()
+        # database alias -> offset of the input file committed there
+        self.committed: dict[str, int] = {}
+        self.source = ""
+
+    def resume(self, path: str, restart: bool = False) -> None:
+        """Load the offsets of `path` committed on each database, or clear them."""
+        self.source = f"{self.model._meta.label_lower}:{os.path.abspath(path)}"
+        for using in ride_databases():
+            progress = ImportProgress.objects.using(using).filter(source=self.source)
+            if restart:
+                progress.delete()
+            elif offset := progress.values_list("offset", flat=True).first():
+                self.committed[using] = offset
+
+    def finish(self) -> None:
+        """Forget the committed offsets once the whole file is imported."""
+        for using in ride_databases():
+            ImportProgress.objects.using(using).filter(source=self.source).delete()
+        self.committed = {}
+
+    def clean(self, records: list[dict]) -> tuple[list[dict], list[tuple[int, str]]]:
+        """Return the valid rows and `(index in batch, message)` per invalid record."""
+        raise NotImplementedError
+
+    def database(self, row: dict) -> str:
+        """The ride database a clean row belongs to."""
+        raise NotImplementedError
+
+    def insert(self, rows: list[dict], offsets: list[int], end: int) -> int:
+        """
+        Insert the rows not committed yet and record `end`, the offset after the
+        batch, on their databases. `offsets` are the offsets after each row's
+        record. Returns the number of rows inserted.
+        """
+        with_ids = rows[0]["id"] is not None
+        if any((row["id"] is not None) != with_ids for row in rows):
+            raise RowError("id must be given for every record of a batch or for none.")
+        columns = self.columns if with_ids else self.columns[1:]
+
+        by_database: dict[str, list[dict]] = {}
+        for row, offset in zip(rows, offsets):
+            using = self.database(row)
+            database_rows = by_database.setdefault(using, [])
+            if offset > self.committed.get(using, 0):
+                database_rows.append(row)
+
+        for using, database_rows in by_database.items():
+            with transaction.atomic(using=using):
+                if database_rows:
+                    self.write(database_rows, columns, using)
+                ImportProgress.objects.using(using).update_or_create(
+                    source=self.source, defaults={"offset": end}
+                )
+            self.committed[using] = end
+            if database_rows:
+                self.written.add(using)
+        return sum(len(database_rows) for database_rows in by_database.values())
+
+    def write(self, rows: list[dict], columns: list[str], using: str) -> None:
+        if connections[using].vendor == "postgresql":
+            self.copy(rows, columns, using)
+        else:
+            objs = self.model.objects.using(using).bulk_create(
+                [
+                    self.model(**{column: row[column] for column in columns})
+                    for row in rows
+                ],
+                batch_size=1000,
+            )
+            for row, obj in zip(rows, objs):
+                row["id"] = obj.pk
+
+    def copy(self, rows: list[dict], columns: list[str], using: str) -> None:
+        table = self.model._meta.db_table
+        names = ", ".join(f'"{column}"' for column in columns)
+        with connections[using].cursor() as cursor:
+            with cursor.cursor.copy(f'COPY "{table}" ({names}) FROM STDIN') as copy:
+                for row in rows:
+                    copy.write_row([row[column] for column in columns])
+
+    def reset_sequence(self) -> None:
+        """Move the id sequences past explicitly imported ids."""
+        for using in self.written:
+            connection = connections[using]
+            statements = connection.ops.sequence_reset_sql(no_style(), [self.model])
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+
+class RideImporter(Importer):
+    model = Ride
+    columns = [
+        "id",
+        "rider_id",
+        "driver_id",
+        "status",
+        "region",
+        "pickup_latitude",
+        "pickup_longitude",
+        "dropoff_latitude",
+        "dropoff_longitude",
+        "pickup_time",
+        "created_at",
+    ]
+
+    def __init__(self):
+        super().__init__()
+        # users live in `default` and are replicated to the other databases
+        users = get_user_model().objects.using(DEFAULT_DB_ALIAS)
+        # few admins, fetched once so the role check is a set lookup
+        self.admin_ids = set(users.filter(role="admin").values_list("pk", flat=True))
+        self.users = users
+
+    def clean(self, records):
+        user_ids = int_ids(
+            value
+            for record in records
+            for value in (pick(record, "rider"), pick(record, "driver"))
+        )
+        existing = set(self.users.filter(pk__in=user_ids).values_list("pk", flat=True))
+
+        imported_at = now()
+        rows, errors = [], []
+        for index, record in enumerate(records):
+            try:
+                rows.append(self.clean_record(record, existing, imported_at))
+            except RowError as ex:
+                errors.append((index, str(ex)))
+        return rows, errors
+
+    def clean_record(self, record, existing, imported_at):
+        rider_id = to_int(pick(record, "rider"), "rider")
+        driver_id = to_int(pick(record, "driver"), "driver", required=False)
+        status = to_choice(
+            record.get("status") or "pending", "status", Ride.STATUS_PROGRESSION
+        )
+
+        for name, user_id in (("rider", rider_id), ("driver", driver_id)):
+            if user_id is None:
+                continue
+            if user_id not in existing:
+                raise RowError(f"{name} {user_id} does not exist.")
+            if user_id in self.admin_ids:
+                raise RowError(f"{name} {user_id} is an admin user.")
+        if driver_id is None and status != "pending":
+            raise RowError(f"A {status} ride must have a driver.")
+
+        pickup_latitude = to_float(record.get("pickup_latitude"), "pickup_latitude", 90)
+        pickup_longitude = to_float(
+            record.get("pickup_longitude"), "pickup_longitude", 180
+        )
+        region = record.get("region") or region_for_point(
+            pickup_latitude, pickup_longitude
+        )
+        if region and region not in settings.RIDE_REGIONS:
+            raise RowError(f"region {region!r} is not in RIDE_REGIONS.")
+
+        ride_id = to_int(record.get("id"), "id", required=False)
+        database = database_for_region(region)
+        if ride_id is not None and database_for_id(ride_id) != database:
+            raise RowError(
+                f"id {ride_id} is outside the id range of the {database} database."
+            )
+
+        return {
+            "id": ride_id,
+            "rider_id": rider_id,
+            "driver_id": driver_id,
+            "status": status,
+            "region": region,
+            "pickup_latitude": pickup_latitude,
+            "pickup_longitude": pickup_longitude,
+            "dropoff_latitude": to_float(
+                record.get("dropoff_latitude"), "dropoff_latitude", 90
+            ),
+            "dropoff_longitude": to_float(
+                record.get("dropoff_longitude"), "dropoff_longitude", 180
+            ),
+            "pickup_time": to_datetime(record.get("pickup_time"), "pickup_time"),
+            "created_at": to_datetime(
+                record.get("created_at"), "created_at", imported_at
+            ),
+        }
+
+    def database(self, row):
+        return database_for_region(row["region"])
+
+    def write(self, rows, columns, using):
+        connection = connections[using]
+        if rows[0]["id"] is None and connection.vendor == "postgresql":
+            # COPY returns no ids, take them from the table's sequence instead
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT nextval(pg_get_serial_sequence(%s, 'id')) "
+                    "FROM generate_series(1, %s)",
+                    [self.model._meta.db_table, len(rows)],
+                )
+                for row, (ride_id,) in zip(rows, cursor.fetchall()):
+                    row["id"] = ride_id
+            columns = self.columns
+        super().write(rows, columns, using)
+        RideChange.objects.using(using).bulk_create(
+            [RideChange(ride_id=row["id"], kind=RideChange.CREATED) for row in rows],
+            batch_size=1000,
+        )
+        # tagged like `Ride.save` does, one vectorized lookup per batch
+        RideZone.objects.using(using).bulk_create(
+            ride_zones(
+                [row["id"] for row in rows],
+                [row["pickup_latitude"] for row in rows],
+                [row["pickup_longitude"] for row in rows],
+            ),
+            batch_size=1000,
+        )
+
+
+class RideEventImporter(Importer):
+    model = RideEvent
+    columns = [
+        "id",
+        "ride_id",
+        "event_type",
+        "from_status",
+        "to_status",
+        "description",
+        "created_at",
+    ]
+
+    def clean(self, records):
+        by_database: dict[str, list[int]] = {}
+        for ride_id in int_ids(pick(record, "ride") for record in records):
+            by_database.setdefault(database_for_id(ride_id), []).append(ride_id)
+        existing = {
+            pk
+            for using, ride_ids in by_database.items()
+            for pk in Ride.objects.using(using)
+            .filter(pk__in=ride_ids)
+            .values_list("pk", flat=True)
+        }
+
+        imported_at = now()
+        event_types = [choice for choice, _ in RideEvent.EVENT_TYPE_CHOICES]
+        rows, errors = [], []
+        for index, record in enumerate(records):
+            try:
+                ride_id = to_int(pick(record, "ride"), "ride")
+                if ride_id not in existing:
+                    raise RowError(f"ride {ride_id} does not exist.")
+                if blank(record.get("description")):
+                    raise RowError("description is required.")
+                event_id = to_int(record.get("id"), "id", required=False)
+                database = database_for_id(ride_id)
+                if event_id is not None and database_for_id(event_id) != database:
+                    raise RowError(
+                        f"id {event_id} is outside the id range of the {database} "
+                        "database."
+                    )
+
+                rows.append(
+                    {
+                        "id": event_id,
+                        "ride_id": ride_id,
+                        "event_type": to_choice(
+                            record.get("event_type") or RideEvent.NOTE,
+                            "event_type",
+                            event_types,
+                        ),
+                        "from_status": to_choice(
+                            record.get("from_status"),
+                            "from_status",
+                            Ride.STATUS_PROGRESSION,
+                            False,
+                        ),
+                        "to_status": to_choice(
+                            record.get("to_status"),
+                            "to_status",
+                            Ride.STATUS_PROGRESSION,
+                            False,
+                        ),
+                        "description": str(record["description"]),
+                        "created_at": to_datetime(
+                            record.get("created_at"), "created_at", imported_at
+                        ),
+                    }
+                )
+            except RowError as ex:
+                errors.append((index, str(ex)))
+        return rows, errors
+
+    def database(self, row):
+        return database_for_id(row["ride_id"])
+
+    def write(self, rows, columns, using):
+        super().write(rows, columns, using)
+        ride_ids = dict.fromkeys(row["ride_id"] for row in rows)
+        RideChange.objects.using(using).bulk_create(
+            [
+                RideChange(ride_id=ride_id, kind=RideChange.EVENT)
+                for ride_id in ride_ids
+            ],
+            batch_size=1000,
+        )
+
+
+@dataclass
+class Checkpoint:
+    """Progress of one input file, saved next to it after every committed batch."""
+
+    path: str
+    offset: int = 0
+    imported: int = 0
+    skipped: int = 0
+    # database alias -> definitions of the indexes dropped there
+    deferred_indexes: dict[str, list[str]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str) -> Checkpoint:
+        if not os.path.exists(path):
+            return cls(path)
+        with open(path) as file:
+            return cls(path, **json.load(file))
+
+    def save(self) -> None:
+        state = {
+            "offset": self.offset,
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "deferred_indexes": self.deferred_indexes,
+        }
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(state, file)
+        os.replace(temporary, self.path)
+
+    def delete(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def secondary_indexes(model, using: str = "default") -> list[tuple[str, str]]:
+    """`(name, definition)` of the model's indexes not backing a constraint (PostgreSQL)."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT i.indexname, i.indexdef
+            FROM pg_indexes i
+            WHERE i.schemaname = current_schema() AND i.tablename = %s
+            AND NOT EXISTS (
+                SELECT 1 FROM pg_constraint c
+                WHERE c.conindid = format('%%I.%%I', i.schemaname, i.indexname)::regclass
+            )
+            """,
+            [model._meta.db_table],
+        )
+        return cursor.fetchall()
+
+
+def drop_indexes(model, using: str = "default") -> list[str]:
+    """Drop the secondary indexes, returns their definitions to recreate them."""
+    indexes = secondary_indexes(model, using)
+    with connections[using].cursor() as cursor:
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
+    return [definition for _, definition in indexes]
+
+
+def create_indexes(definitions: list[str], using: str = "default") -> None:
+    with connections[using].cursor() as cursor:
+        for definition in definitions:
+            cursor.execute(
+                definition.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS", 1)
+            )
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def batches(
+    records: Iterator[tuple[dict, int]], size: int
+) -> Iterator[tuple[list[dict], list[int]]]:
+    """Group records, yielding each batch with the offset right after each record."""
+    batch: list[dict[str, Any]] = []
+    offsets: list[int] = []
+    for record, offset in records:
+        batch.append(record)
+        offsets.append(offset)
+        if len(batch) >= size:
+            yield batch, offsets
+            batch, offsets = [], []
+    if batch:
+        yield batch, offsets
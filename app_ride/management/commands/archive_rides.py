@@ -0,0 +1,55 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now, timedelta
+
+from app_ride.archive import archivable_rides, archive_batch
+from app_ride.sharding import ride_databases
+
+
+class Command(BaseCommand):
+    help = "Move completed rides older than RIDE_ARCHIVE_AFTER_DAYS and their events to the archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.RIDE_ARCHIVE_AFTER_DAYS,
+            help="archive rides picked up more than this many days ago",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.1,
+            help="seconds to sleep between batches, leaves room for live traffic",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="only count the archivable rides"
+        )
+
+    def handle(self, *args, **options):
+        cutoff = now() - timedelta(days=options["days"])
+
+        if options["dry_run"]:
+            count = sum(
+                archivable_rides(cutoff, alias).count() for alias in ride_databases()
+            )
+            self.stdout.write(
+                f"{count} rides picked up before {cutoff:%Y-%m-%d} can be archived."
+            )
+            return
+
+        total = 0
+        for alias in ride_databases():
+            while moved := archive_batch(cutoff, options["batch_size"], using=alias):
+                total += moved
+                self.stdout.write(f"Archived {total} rides...")
+                time.sleep(options["pause"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {total} rides picked up before {cutoff:%Y-%m-%d}."
+            )
+        )
@@ -0,0 +1,87 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from app_ride.dispatch import distance_matrix, solve_greedy, solve_optimal
+
+CENTER = np.array([7.0731, 125.6128])
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the dispatch distance matrix and solvers on random city-sized data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rides", type=int, default=10000)
+        parser.add_argument("--drivers", type=int, default=10000)
+        parser.add_argument(
+            "--compare", type=int, default=500, help="batch size for optimal vs greedy"
+        )
+        parser.add_argument("--max-distance", type=float, default=10.0)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        max_distance = options["max_distance"]
+        drivers = self.points(rng, options["drivers"])
+
+        for demand in ["uniform", "clustered"]:
+            rides = self.points(rng, options["rides"], demand)
+
+            started = time.perf_counter()
+            rows, cols, distances = solve_greedy(rides, drivers, max_distance)
+            greedy_time = time.perf_counter() - started
+
+            self.stdout.write(
+                f"{len(rides)} rides ({demand}) x {len(drivers)} drivers, greedy "
+                f"{greedy_time * 1000:10.1f} ms, {len(rows)} assigned, "
+                f"{distances.mean():.2f} km mean pickup"
+            )
+
+        rides = self.points(rng, options["rides"])
+        started = time.perf_counter()
+        cost = distance_matrix(rides, drivers)
+        matrix_time = time.perf_counter() - started
+        self.stdout.write(
+            f"{len(rides)} x {len(drivers)} distance matrix "
+            f"{matrix_time * 1000:10.1f} ms, {cost.nbytes / 2**20:.0f} MiB"
+        )
+
+        n = options["compare"]
+        small = cost[:n, :n]
+        started = time.perf_counter()
+        opt_rows, opt_cols = solve_optimal(small, max_distance)
+        optimal_time = time.perf_counter() - started
+        started = time.perf_counter()
+        greedy_rows, greedy_cols, _ = solve_greedy(rides[:n], drivers[:n], max_distance)
+        greedy_time = time.perf_counter() - started
+
+        self.stdout.write(f"{n} x {n} batch")
+        for name, elapsed, (r, c) in [
+            ("optimal", optimal_time, (opt_rows, opt_cols)),
+            ("greedy", greedy_time, (greedy_rows, greedy_cols)),
+        ]:
+            self.stdout.write(
+                f"  {name:<8} {elapsed * 1000:8.1f} ms, {len(r)} assigned, "
+                f"{small[r, c].sum():.1f} km total, {small[r, c].mean():.3f} km mean pickup"
+            )
+
+    def points(self, rng, count, demand="uniform"):
+        """
+        Random positions in a ~30 km square around Davao City. Clustered demand
+        puts most of them within ~1 km of a few hotspots (a mall, the airport).
+        """
+        if demand == "uniform":
+            return CENTER + rng.uniform(-0.135, 0.135, size=(count, 2))
+
+        hotspots = CENTER + rng.uniform(-0.1, 0.1, size=(4, 2))
+        clustered = count * 4 // 5
+        return np.concatenate(
+            [
+                hotspots[rng.integers(len(hotspots), size=clustered)]
+                + rng.normal(0, 0.005, size=(clustered, 2)),
+                CENTER + rng.uniform(-0.135, 0.135, size=(count - clustered, 2)),
+            ]
+        )
@@ -0,0 +1,137 @@
+import json
+import timeit
+
+import msgpack
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now, timedelta
+from rest_framework.renderers import JSONRenderer
+
+from app_ride.models import Ride, RideEvent
+from app_ride.serializers.ride import RideDefaultSerializer
+from app_ride.views import RideView
+from app_user.models import User
+from utils.renderers import FastJSONRenderer, MessagePackRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark rendering a page of rides with the default and the fast JSON "
+        "renderer and MessagePack, row by row and columnar: time and payload size."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100)
+        parser.add_argument("--events", type=int, default=4, help="events per ride")
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=0,
+            help="riders and drivers shared by the rides, 0 for new ones on every ride",
+        )
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        rides = self.build_rides(rows, options["events"], options["users"])
+
+        # Same envelope `RestViewMixin.RestResponse` builds around a paginated list.
+        payload = {
+            "message": "Success",
+            "errors": [],
+            "data": {
+                "count": rows,
+                "page": 1,
+                "limit": rows,
+                "next": None,
+                "previous": None,
+                "results": RideDefaultSerializer(rides, many=True).data,
+            },
+            "status": 200,
+        }
+
+        default, fast, binary = (
+            JSONRenderer(),
+            FastJSONRenderer(),
+            MessagePackRenderer(),
+        )
+        columnar_type = f"{binary.media_type}; layout=columnar"
+        columnar_context = {"view": RideView()}
+        if json.loads(default.render(payload)) != json.loads(fast.render(payload)):
+            self.stderr.write("Renderers produced different documents.")
+            return
+        if msgpack.unpackb(binary.render(payload)) != json.loads(fast.render(payload)):
+            self.stderr.write("MessagePack produced a different document.")
+            return
+
+        serialize = timeit.timeit(
+            lambda: RideDefaultSerializer(rides, many=True).data, number=repeat
+        )
+        renders = {
+            "JSONRenderer": lambda: default.render(payload),
+            "FastJSONRenderer": lambda: fast.render(payload),
+            "MessagePack": lambda: binary.render(payload),
+            "MessagePack columnar": lambda: binary.render(
+                payload, columnar_type, columnar_context
+            ),
+        }
+        results = {
+            name: timeit.timeit(render, number=repeat)
+            for name, render in renders.items()
+        }
+        sizes = {name: len(render()) for name, render in renders.items()}
+
+        self.stdout.write(
+            f"{rows} rides x {options['events']} events, {repeat} iterations"
+        )
+        self.stdout.write(f"  serializer           {serialize / repeat * 1000:8.3f} ms")
+        for name, elapsed in results.items():
+            self.stdout.write(
+                f"  {name:<20} {elapsed / repeat * 1000:8.3f} ms {sizes[name]:>9} bytes "
+                f"({sizes[name] / sizes['JSONRenderer']:.0%})"
+            )
+        self.stdout.write(
+            f"  speedup              {results['JSONRenderer'] / results['FastJSONRenderer']:8.2f}x"
+        )
+
+    def build_rides(self, rows, events, users=0):
+        """Build unsaved rides with nested users and events, no database required."""
+        created = now()
+        rides = []
+        for index in range(rows):
+            user = index % users if users else index
+            rider = User(
+                id=user * 2 + 1,
+                email=f"rider{user}@rider.com",
+                first_name="Rider",
+                last_name=f"No. {user}",
+                phone_number="+639170000000",
+            )
+            driver = User(
+                id=user * 2 + 2,
+                email=f"driver{user}@rider.com",
+                first_name="Driver",
+                last_name=f"No. {user}",
+            )
+            ride = Ride(
+                id=index + 1,
+                rider=rider,
+                driver=driver,
+                status="pickup",
+                pickup_latitude=7.449681 + index / 1000,
+                pickup_longitude=125.780084 - index / 1000,
+                dropoff_latitude=7.07306,
+                dropoff_longitude=125.61278,
+                pickup_time=created - timedelta(minutes=index),
+                created_at=created - timedelta(hours=1, minutes=index),
+            )
+            ride.todays_ride_events = [
+                RideEvent(
+                    id=index * events + n + 1,
+                    ride=ride,
+                    description="Status changed to en-route.",
+                    created_at=created - timedelta(seconds=n),
+                )
+                for n in range(events)
+            ]
+            rides.append(ride)
+        return rides
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from app_ride.partitions import create_partitions, is_partitioned
+from app_ride.sharding import ride_databases
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the monthly RideEvent partitions ahead of time on every ride "
+        "database (PostgreSQL only)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=settings.RIDE_EVENT_PARTITIONS_AHEAD,
+            help="months ahead of the current one to create partitions for",
+        )
+
+    def handle(self, *args, **options):
+        for alias in ride_databases():
+            if not is_partitioned(alias):
+                self.stdout.write(
+                    f"RideEvent is not partitioned on the {alias} database, nothing to do."
+                )
+                continue
+
+            created = create_partitions(options["months"], now(), using=alias)
+            for name in created:
+                self.stdout.write(f"Created {name} on {alias}.")
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Partitions exist on {alias} for the next {options['months']} months "
+                    f"({len(created)} created)."
+                )
+            )
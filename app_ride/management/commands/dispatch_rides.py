@@ -0,0 +1,48 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from app_ride.dispatch import dispatch_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Assign unassigned pending rides to the nearest available drivers in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="run a single batch and exit"
+        )
+        parser.add_argument(
+            "--interval", type=float, default=5.0, help="seconds between batches"
+        )
+        parser.add_argument(
+            "--max-distance",
+            type=float,
+            help="km, defaults to DISPATCH_MAX_DISTANCE_KM",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=10000, help="rides considered per batch"
+        )
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        if not options["once"]:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, lambda *_: stop.set())
+
+        while not stop.is_set():
+            result = dispatch_pending(
+                max_distance=options["max_distance"], limit=options["batch_size"]
+            )
+            if result.assigned or options["once"]:
+                self.stdout.write(
+                    f"Assigned {result.assigned} of {result.rides} pending ride(s) "
+                    f"to {result.drivers} available driver(s), "
+                    f"{result.total_distance:.1f} km total pickup distance."
+                )
+            if options["once"]:
+                break
+            stop.wait(options["interval"])
@@ -0,0 +1,36 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from utils.schema import generate_schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema once and write it to OPENAPI_SCHEMA_FILE, "
+        "served as is from /openapi.json and the docs pages."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=str(settings.OPENAPI_SCHEMA_FILE),
+            help="defaults to OPENAPI_SCHEMA_FILE",
+        )
+
+    def handle(self, *args, **options):
+        schema = generate_schema()
+
+        # Workers may be reading the file, replace it in one step.
+        path = options["output"]
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(schema)
+        os.replace(temporary, path)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote the OpenAPI schema to {path} ({len(schema)} bytes)."
+            )
+        )
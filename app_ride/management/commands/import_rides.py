@@ -0,0 +1,164 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from app_ride.importer import (
+    Checkpoint,
+    RideEventImporter,
+    RideImporter,
+    RowError,
+    batches,
+    create_indexes,
+    detect_format,
+    drop_indexes,
+    format_bytes,
+    read_records,
+)
+from app_ride.sharding import ride_databases
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream rides and/or ride events from CSV or NDJSON files into the database "
+        "in validated batches, resuming from the last checkpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rides", help="CSV or NDJSON file of rides")
+        parser.add_argument(
+            "--events",
+            help="CSV or NDJSON file of ride events, imported after the rides",
+        )
+        parser.add_argument(
+            "--format", choices=["csv", "ndjson"], help="defaults to the file extension"
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--skip-invalid",
+            action="store_true",
+            help="report and skip invalid records instead of stopping at the first one",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="ignore an existing checkpoint and import the files from the start",
+        )
+        parser.add_argument(
+            "--defer-indexes",
+            action="store_true",
+            help="drop secondary indexes during the import and rebuild them at the end (PostgreSQL)",
+        )
+        parser.add_argument(
+            "--no-rebuild",
+            action="store_true",
+            help="do not recompute the ride counters and driver rollups afterwards",
+        )
+
+    def handle(self, *args, **options):
+        if not options["rides"] and not options["events"]:
+            raise CommandError("Pass --rides and/or --events.")
+
+        imported = 0
+        for importer_class, path in (
+            (RideImporter, options["rides"]),
+            (RideEventImporter, options["events"]),
+        ):
+            if path:
+                imported += self.import_file(importer_class(), path, options)
+
+        if imported and not options["no_rebuild"]:
+            call_command("reconcile_ride_counters", stdout=self.stdout)
+            call_command("rebuild_driver_stats", stdout=self.stdout)
+
+    def import_file(self, importer, path, options):
+        label = importer.model._meta.verbose_name_plural.lower()
+        fmt = options["format"] or detect_format(path)
+        checkpoint = Checkpoint.load(f"{path}.checkpoint")
+        importer.resume(path, restart=options["restart"])
+        if options["restart"]:
+            checkpoint = Checkpoint(
+                checkpoint.path, deferred_indexes=checkpoint.deferred_indexes
+            )
+        elif checkpoint.offset:
+            self.stdout.write(
+                f"Resuming {path} after {checkpoint.imported} imported {label} "
+                f"(byte {checkpoint.offset})."
+            )
+
+        if options["defer_indexes"]:
+            for using in ride_databases():
+                if connections[using].vendor != "postgresql":
+                    continue
+                if using not in checkpoint.deferred_indexes:
+                    checkpoint.deferred_indexes[using] = drop_indexes(
+                        importer.model, using
+                    )
+                    checkpoint.save()
+                self.stdout.write(
+                    f"Deferred {len(checkpoint.deferred_indexes[using])} indexes on {using}."
+                )
+
+        started = time.monotonic()
+        imported_before = checkpoint.imported
+        with open(path, "rb") as file:
+            size = file.seek(0, 2) or 1
+            records = read_records(file, fmt, checkpoint.offset)
+            for batch, offsets in batches(records, options["batch_size"]):
+                rows, errors = importer.clean(batch)
+                for index, message in errors:
+                    self.stderr.write(
+                        f"{path}: record {checkpoint.imported + checkpoint.skipped + index + 1}: {message}"
+                    )
+                if errors and not options["skip_invalid"]:
+                    raise CommandError(
+                        f"Stopped at an invalid record, fix it and run again to resume "
+                        f"(or pass --skip-invalid). {checkpoint.imported} {label} imported."
+                    )
+
+                offset = offsets[-1]
+                inserted = 0
+                if rows:
+                    invalid = {index for index, _ in errors}
+                    row_offsets = [
+                        record_offset
+                        for index, record_offset in enumerate(offsets)
+                        if index not in invalid
+                    ]
+                    try:
+                        # rows committed before an interrupted run are skipped
+                        inserted = importer.insert(rows, row_offsets, offset)
+                    except RowError as ex:
+                        raise CommandError(f"{path}: {ex}")
+
+                checkpoint.offset = offset
+                checkpoint.imported += inserted
+                checkpoint.skipped += len(errors)
+                checkpoint.save()
+
+                elapsed = time.monotonic() - started
+                rate = (
+                    (checkpoint.imported - imported_before) / elapsed if elapsed else 0
+                )
+                self.stdout.write(
+                    f"{label}: {checkpoint.imported} imported, {checkpoint.skipped} skipped, "
+                    f"{format_bytes(offset)} of {format_bytes(size)} ({offset / size:.0%}), "
+                    f"{rate:,.0f} rows/s"
+                )
+
+        for using, definitions in list(checkpoint.deferred_indexes.items()):
+            self.stdout.write(f"Rebuilding {len(definitions)} indexes on {using}...")
+            create_indexes(definitions, using)
+            del checkpoint.deferred_indexes[using]
+            checkpoint.save()
+
+        importer.reset_sequence()
+        importer.finish()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {checkpoint.imported} {label} from {path} "
+                f"({checkpoint.skipped} skipped). Delete {checkpoint.path} to import it again."
+            )
+        )
+        return checkpoint.imported - imported_before
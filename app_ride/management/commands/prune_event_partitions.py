@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from app_ride.partitions import (
+    expired_partitions,
+    is_partitioned,
+    month_start,
+    remove_partition,
+)
+from app_ride.sharding import ride_databases
+
+
+class Command(BaseCommand):
+    help = (
+        "Drop (or detach) RideEvent partitions older than the retention period on "
+        "every ride database (PostgreSQL only)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=settings.RIDE_EVENT_RETENTION_MONTHS,
+            help="keep partitions holding events of the last MONTHS months",
+        )
+        parser.add_argument(
+            "--detach",
+            action="store_true",
+            help="only detach the partitions, e.g. to dump them before dropping",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="only list the expired partitions"
+        )
+
+    def handle(self, *args, **options):
+        for alias in ride_databases():
+            if not is_partitioned(alias):
+                self.stdout.write(
+                    f"RideEvent is not partitioned on the {alias} database, nothing to do."
+                )
+                continue
+            self.prune(alias, options)
+
+    def prune(self, using, options):
+        cutoff = month_start(now(), -options["months"])
+        expired = expired_partitions(cutoff, using=using)
+        verb = "Detached" if options["detach"] else "Dropped"
+
+        for partition in expired:
+            if options["dry_run"]:
+                self.stdout.write(
+                    f"{partition.name} (events before {partition.upper:%Y-%m-%d})"
+                )
+                continue
+            remove_partition(partition.name, detach_only=options["detach"], using=using)
+            self.stdout.write(f"{verb} {partition.name} on {using}.")
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"{len(expired)} partitions older than {cutoff:%Y-%m-%d} on {using}."
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{verb} {len(expired)} partitions older than {cutoff:%Y-%m-%d} on {using}."
+                )
+            )
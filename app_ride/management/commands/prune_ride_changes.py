@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now, timedelta
+
+from app_ride.models import RideChange
+from app_ride.sharding import ride_databases
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete ride change feed entries older than RIDE_CHANGES_RETENTION_DAYS on "
+        "every ride database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.RIDE_CHANGES_RETENTION_DAYS,
+            help="keep the changes of the last DAYS days",
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        cutoff = now() - timedelta(days=options["days"])
+
+        total = 0
+        for alias in ride_databases():
+            deleted = RideChange.objects.prune(
+                cutoff, batch_size=options["batch_size"], using=alias
+            )
+            self.stdout.write(f"Deleted {deleted} changes on {alias}.")
+            total += deleted
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {total} ride changes made before {cutoff:%Y-%m-%d}."
+            )
+        )
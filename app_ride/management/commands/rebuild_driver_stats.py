@@ -0,0 +1,94 @@
+from collections import defaultdict
+from itertools import chain
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import localdate
+
+from app_ride.models import (
+    ArchivedRide,
+    CountedTrip,
+    DriverDailyStats,
+    DriverMonthlyStats,
+    Ride,
+)
+from app_ride.models.driver_stats import trip_metrics
+from app_ride.sharding import ride_databases
+
+
+class Command(BaseCommand):
+    help = "Recompute the driver trip rollups from completed (and archived) rides and their events."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        monthly = defaultdict(lambda: defaultdict(float))
+        daily = defaultdict(lambda: defaultdict(float))
+
+        rides = chain.from_iterable(
+            model.objects.using(alias)
+            .filter(status="dropoff")
+            .with_transition_time("en-route")
+            .with_transition_time("pickup")
+            .with_transition_time("dropoff")
+            .values(
+                "pk",
+                "driver_id",
+                "pickup_time",
+                "enroute_at",
+                "pickup_at",
+                "dropoff_at",
+            )
+            .iterator(chunk_size=options["batch_size"])
+            for alias in ride_databases()
+            for model in (Ride, ArchivedRide)
+        )
+
+        count, counted = 0, []
+        for ride in rides:
+            counted.append(ride["pk"])
+            metrics = trip_metrics(
+                ride["enroute_at"], ride["pickup_at"], ride["dropoff_at"]
+            )
+            day = localdate(ride["pickup_time"])
+            for rollup, period in (
+                (monthly, day.replace(day=1)),
+                (daily, day),
+            ):
+                totals = rollup[(ride["driver_id"], period)]
+                for field, value in metrics.items():
+                    totals[field] += value
+
+            count += 1
+            if count % options["batch_size"] == 0:
+                self.stdout.write(f"Processed {count} rides...")
+
+        with transaction.atomic():
+            for model, rollup in (
+                (DriverMonthlyStats, monthly),
+                (DriverDailyStats, daily),
+            ):
+                model.objects.all().delete()
+                model.objects.bulk_create(
+                    (
+                        model(driver_id=driver_id, period=period, **totals)
+                        for (driver_id, period), totals in rollup.items()
+                    ),
+                    batch_size=options["batch_size"],
+                )
+            # outbox messages still pending for these rides must not add them again
+            CountedTrip.objects.all().delete()
+            CountedTrip.objects.bulk_create(
+                (CountedTrip(ride_id=ride_id) for ride_id in counted),
+                batch_size=options["batch_size"],
+                # a ride read both live and archived while being archived
+                ignore_conflicts=True,
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt rollups from {count} rides: "
+                f"{len(monthly)} monthly and {len(daily)} daily rows."
+            )
+        )
@@ -0,0 +1,106 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+from app_ride.models import ArchivedRide, Ride, RideCounter
+from app_ride.sharding import is_sharded, ride_databases
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the dashboard ride counters from scratch and report any drift, "
+        "on every ride database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="only report drift, do not write the recomputed counters",
+        )
+
+    def handle(self, *args, **options):
+        for alias in ride_databases():
+            self.reconcile(alias, options)
+
+    def reconcile(self, using, options):
+        # each ride database counts its own rides
+        if is_sharded():
+            self.stdout.write(f"Database {using}:")
+
+        outermost = not connections[using].in_atomic_block
+        with transaction.atomic(using=using):
+            # Lock the counters before counting the rides: a ride write updates its
+            # counters before committing, so with no counter writable every
+            # committed ride is in both counts and every pending one in neither.
+            self.lock_counters(using, snapshot=outermost)
+            expected = self.recount(using)
+            stored = Counter(
+                {
+                    (row["scope"], row["key"]): row["total"]
+                    for row in RideCounter.objects.using(using).totals().iterator()
+                }
+            )
+
+            drift = {
+                key: expected[key] - stored[key]
+                for key in expected.keys() | stored.keys()
+                if expected[key] != stored[key]
+            }
+            for (scope, key), delta in sorted(drift.items()):
+                self.stdout.write(
+                    f"{scope}:{key} stored={stored[(scope, key)]} "
+                    f"expected={expected[(scope, key)]} drift={delta:+d}"
+                )
+
+            if not drift:
+                self.stdout.write(self.style.SUCCESS("Counters are in sync."))
+                return
+            if options["dry_run"]:
+                self.stdout.write(self.style.WARNING(f"{len(drift)} counters drifted."))
+                return
+
+            RideCounter.objects.db_manager(using).apply(drift)
+            self.stdout.write(self.style.SUCCESS(f"Fixed {len(drift)} counters."))
+
+    def lock_counters(self, using, snapshot):
+        # SQLite has a single writer and reads one snapshot per transaction
+        connection = connections[using]
+        if connection.vendor != "postgresql":
+            return
+        table = connection.ops.quote_name(RideCounter._meta.db_table)
+        with connection.cursor() as cursor:
+            if snapshot:
+                # Rides and archived rides read in one snapshot, taken after the
+                # lock, so a ride archived meanwhile is counted once.
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            # conflicts with row updates and inserts, not with reads
+            cursor.execute(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE")
+
+    def recount(self, using):
+        counts = Counter()
+        # archived rides are still counted, archiving only moves them
+        for model in (Ride, ArchivedRide):
+            rides = model.objects.using(using)
+            for row in rides.values("status").annotate(total=Count("pk")):
+                counts[(RideCounter.STATUS, row["status"])] += row["total"]
+
+            created = rides.annotate(day=TruncDate("created_at")).values("day")
+            for row in created.annotate(total=Count("pk")):
+                counts[(RideCounter.CREATED_DAY, row["day"].isoformat())] += row[
+                    "total"
+                ]
+
+        active = (
+            Ride.objects.using(using)
+            .exclude(status="dropoff")
+            .filter(driver__isnull=False)
+        )
+        active = active.values("driver_id")
+        for row in active.annotate(total=Count("pk")):
+            counts[(RideCounter.ACTIVE_DRIVER, str(row["driver_id"]))] = row["total"]
+
+        return counts
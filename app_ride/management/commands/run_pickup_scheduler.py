@@ -0,0 +1,34 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.utils.timezone import timedelta
+
+from app_ride.scheduler import PickupScheduler, configured_jobs
+
+
+class Command(BaseCommand):
+    help = "Run the worker firing PICKUP_SCHEDULER_JOBS ahead of upcoming ride pickups."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--horizon", type=int, default=60, help="minutes of rides kept in memory"
+        )
+        parser.add_argument(
+            "--poll", type=float, default=1.0, help="seconds between change feed syncs"
+        )
+
+    def handle(self, *args, **options):
+        jobs = configured_jobs()
+        scheduler = PickupScheduler(jobs, horizon=timedelta(minutes=options["horizon"]))
+
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+
+        self.stdout.write(
+            f"Pickup scheduler running {len(jobs)} job(s) "
+            f"with a {options['horizon']} minute horizon."
+        )
+        scheduler.run_forever(poll_interval=options["poll"], stop=stop)
+        self.stdout.write("Pickup scheduler stopped.")
@@ -0,0 +1,79 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from app_ride.outbox import OutboxWorker
+from app_ride.sharding import ride_databases
+
+
+class Command(BaseCommand):
+    help = "Run the worker pool handling the side effects queued in the ride outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="worker threads")
+        parser.add_argument(
+            "--batch-size", type=int, default=None, help="rows claimed per query"
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=1.0,
+            help="seconds between polls of an empty outbox",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="handle the rows due now with one worker, then exit",
+        )
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            worker = OutboxWorker(batch_size=options["batch_size"])
+            handled = 0
+            while claimed := worker.run_once():
+                handled += claimed
+            self.stdout.write(f"Handled {handled} outbox message(s).")
+            return
+
+        workers = options["workers"]
+        if workers > 1 and not all(
+            connections[alias].features.has_select_for_update_skip_locked
+            for alias in ride_databases()
+        ):
+            self.stderr.write(
+                "The database cannot skip locked rows, running a single worker."
+            )
+            workers = 1
+
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+
+        threads = [
+            threading.Thread(
+                target=self.work,
+                args=(options, stop),
+                name=f"ride-outbox-{number}",
+            )
+            for number in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(f"Ride outbox running {workers} worker(s).")
+
+        # keep the main thread free to receive the signals
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1)
+        self.stdout.write("Ride outbox stopped.")
+
+    def work(self, options, stop):
+        try:
+            OutboxWorker(batch_size=options["batch_size"]).run_forever(
+                poll_interval=options["poll"], stop=stop
+            )
+        finally:
+            # database connections are per thread
+            connections.close_all()
@@ -0,0 +1,102 @@
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from app_ride.models import Ride, RideEvent
+from app_ride.sharding import first_id, ride_databases
+
+
+class Command(BaseCommand):
+    help = (
+        "Prepare every ride database of RIDE_SHARDS: migrate it, copy the users "
+        "from default and start its ride and ride event ids at its id range."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--skip-migrate",
+            action="store_true",
+            help="the databases are already migrated",
+        )
+
+    def handle(self, *args, **options):
+        for alias in ride_databases():
+            if not options["skip_migrate"]:
+                call_command(
+                    "migrate", database=alias, interactive=False, stdout=self.stdout
+                )
+
+            if alias != DEFAULT_DB_ALIAS:
+                copied = self.copy_users(alias)
+                self.stdout.write(f"Copied {copied} users to {alias}.")
+
+            for model in (Ride, RideEvent):
+                self.start_ids(model, alias)
+            self.stdout.write(
+                self.style.SUCCESS(f"{alias}: ids start at {first_id(alias)}.")
+            )
+
+    def copy_users(self, alias):
+        User = get_user_model()
+        fields = [
+            field.attname
+            for field in User._meta.concrete_fields
+            if not field.primary_key
+        ]
+        copied = 0
+        users = (
+            User._base_manager.using(DEFAULT_DB_ALIAS)
+            .order_by("pk")
+            .iterator(chunk_size=1000)
+        )
+        batch = []
+        for user in users:
+            batch.append(user)
+            if len(batch) == 1000:
+                copied += self.upsert_users(batch, alias, fields)
+                batch = []
+        if batch:
+            copied += self.upsert_users(batch, alias, fields)
+        return copied
+
+    def upsert_users(self, users, alias, fields):
+        User = get_user_model()
+        User._base_manager.using(alias).bulk_create(
+            users,
+            update_conflicts=True,
+            unique_fields=[User._meta.pk.name],
+            update_fields=fields,
+        )
+        return len(users)
+
+    def start_ids(self, model, alias):
+        """Move the id sequence to the database's range, unless it is already past it."""
+        start = first_id(alias)
+        if start <= 1:
+            return
+
+        connection = connections[alias]
+        table = model._meta.db_table
+        with transaction.atomic(using=alias), connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                for sequence in connection.introspection.get_sequences(cursor, table):
+                    cursor.execute(
+                        f'SELECT setval(%s, GREATEST((SELECT MAX("id") FROM "{table}"), %s))',
+                        [sequence["name"], start - 1],
+                    )
+            elif connection.vendor == "sqlite":
+                cursor.execute(
+                    "UPDATE sqlite_sequence SET seq = MAX(seq, %s) WHERE name = %s",
+                    [start - 1, table],
+                )
+                if not cursor.rowcount:
+                    cursor.execute(
+                        "INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)",
+                        [table, start - 1],
+                    )
+            else:
+                self.stderr.write(
+                    f"Cannot set the {table} ids on {alias} ({connection.vendor}), "
+                    f"start them at {start} by hand."
+                )
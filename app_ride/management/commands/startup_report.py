@@ -0,0 +1,90 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter, so nothing is imported yet: prints the
+# duration of each startup phase as JSON, imports are traced by -X importtime.
+STARTUP = """
+import json, time
+started = time.perf_counter()
+phases = {}
+
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+phases["settings"] = time.perf_counter() - started
+
+mark = time.perf_counter()
+django.setup()
+phases["apps"] = time.perf_counter() - mark
+
+mark = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+phases["urls"] = time.perf_counter() - mark
+
+mark = time.perf_counter()
+from django.core.handlers.wsgi import WSGIHandler
+WSGIHandler()
+phases["middleware"] = time.perf_counter() - mark
+
+import sys
+phases["total"] = time.perf_counter() - started
+print(json.dumps({"phases": phases, "modules": sorted(sys.modules)}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Start a fresh worker process and report how long each startup phase "
+        "and the slowest imported packages take."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=15, help="packages to list")
+
+    def handle(self, *args, **options):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", STARTUP],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+        )
+        if process.returncode:
+            raise CommandError(f"The worker failed to start:\n{process.stderr[-2000:]}")
+        report = json.loads(process.stdout.strip().splitlines()[-1])
+
+        self.stdout.write("Startup phases:")
+        for phase, seconds in report["phases"].items():
+            self.stdout.write(f"  {phase:<12} {seconds * 1000:8.1f} ms")
+
+        # `import time: self [us] | cumulative | name`, self times add up per package.
+        packages = defaultdict(int)
+        for line in process.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            own, _, name = line[len("import time:") :].split("|")
+            if own.strip().isdigit():
+                packages[name.strip().split(".")[0]] += int(own)
+
+        self.stdout.write(f"Slowest packages to import (of {len(packages)}):")
+        for package, micros in sorted(packages.items(), key=lambda item: -item[1])[
+            : options["top"]
+        ]:
+            self.stdout.write(f"  {package:<24} {micros / 1000:8.1f} ms")
+
+        loaded = set(report["modules"])
+        self.stdout.write(
+            "API docs tooling (drf_yasg.openapi) imported at startup: "
+            f"{'yes' if 'drf_yasg.openapi' in loaded else 'no'}"
+        )
+        schema_file = settings.OPENAPI_SCHEMA_FILE
+        self.stdout.write(
+            f"Precomputed schema {schema_file}: "
+            f"{'present' if os.path.exists(schema_file) else 'missing, run generate_schema'}"
+        )
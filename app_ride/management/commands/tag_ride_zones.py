@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app_ride.models import ServiceZone
+from app_ride.sharding import ride_databases
+from app_ride.zones import Zone, clear_zones, tag_zone
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the service zones of live and archived rides from their pickup "
+        "point. Saving a zone already does it for that zone, this repairs zones "
+        "whose retagging failed or was skipped (e.g. loaded from fixtures)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--zone",
+            action="append",
+            dest="zones",
+            metavar="CODE",
+            help="only rebuild this zone, can be repeated (default: every zone)",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        clear_zones()
+        zones = ServiceZone.objects.order_by("code")
+        if options["zones"]:
+            zones = zones.filter(code__in=options["zones"])
+            missing = set(options["zones"]) - {zone.code for zone in zones}
+            if missing:
+                raise CommandError(f"Unknown zones: {', '.join(sorted(missing))}.")
+
+        for zone in zones:
+            zone = Zone.from_model(zone)
+            for alias in ride_databases():
+                tagged = tag_zone(zone, alias, options["batch_size"])
+                self.stdout.write(f"{zone.code} on {alias}: {tagged} rides.")
+        self.stdout.write(self.style.SUCCESS("Ride zones are up to date."))
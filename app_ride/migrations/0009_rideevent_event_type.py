@@ -0,0 +1,89 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:28
+
+from django.db import migrations, models
+from django.db.models import Q
+
+PROGRESSION = ["pending", "en-route", "pickup", "dropoff"]
+
+# Spellings found in historical descriptions, e.g. 'Status changed to drop-off.'
+SPELLINGS = {
+    "en-route": ["en-route", "enroute"],
+    "pickup": ["pickup", "pick-up"],
+    "dropoff": ["dropoff", "drop-off"],
+}
+
+
+def backfill_status_changes(apps, schema_editor):
+    """Derive the structured columns from the `Status changed to <status>.` descriptions."""
+    RideEvent = apps.get_model("app_ride", "RideEvent")
+    for from_status, to_status in zip(PROGRESSION, PROGRESSION[1:]):
+        # queryset.update() leaves the auto_now `created_at` untouched.
+        matches = Q()
+        for spelling in SPELLINGS[to_status]:
+            matches |= Q(description__istartswith=f"Status changed to {spelling}.")
+
+        RideEvent.objects.filter(matches).update(
+            event_type="status_change", from_status=from_status, to_status=to_status
+        )
+
+
+def clear_status_changes(apps, schema_editor):
+    RideEvent = apps.get_model("app_ride", "RideEvent")
+    RideEvent.objects.update(event_type="note", from_status=None, to_status=None)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app_ride", "0008_ride_created_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="rideevent",
+            name="event_type",
+            field=models.CharField(
+                choices=[("note", "Note"), ("status_change", "Status Change")],
+                db_index=True,
+                default="note",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="rideevent",
+            name="from_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("pending", "Pending"),
+                    ("en-route", "En Route"),
+                    ("pickup", "Pickup"),
+                    ("dropoff", "Dropoff"),
+                ],
+                max_length=20,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="rideevent",
+            name="to_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("pending", "Pending"),
+                    ("en-route", "En Route"),
+                    ("pickup", "Pickup"),
+                    ("dropoff", "Dropoff"),
+                ],
+                max_length=20,
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rideevent",
+            index=models.Index(
+                fields=["ride", "to_status", "created_at"],
+                name="rideevent_ride_to_status_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_status_changes, clear_status_changes),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app_ride", "0009_rideevent_event_type"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DriverDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("period", models.DateField()),
+                ("trips_completed", models.PositiveIntegerField(default=0)),
+                ("timed_trips", models.PositiveIntegerField(default=0)),
+                ("total_trip_seconds", models.FloatField(default=0)),
+                ("trips_over_1h", models.PositiveIntegerField(default=0)),
+                ("waited_trips", models.PositiveIntegerField(default=0)),
+                ("total_pickup_wait_seconds", models.FloatField(default=0)),
+                (
+                    "driver",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Driver Daily Stats",
+                "verbose_name_plural": "Driver Daily Stats",
+                "ordering": ["period", "driver"],
+                "abstract": False,
+                "indexes": [
+                    models.Index(fields=["period"], name="driver_daily_period_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("driver", "period"), name="driver_daily_stats_unique"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="DriverMonthlyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("period", models.DateField()),
+                ("trips_completed", models.PositiveIntegerField(default=0)),
+                ("timed_trips", models.PositiveIntegerField(default=0)),
+                ("total_trip_seconds", models.FloatField(default=0)),
+                ("trips_over_1h", models.PositiveIntegerField(default=0)),
+                ("waited_trips", models.PositiveIntegerField(default=0)),
+                ("total_pickup_wait_seconds", models.FloatField(default=0)),
+                (
+                    "driver",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Driver Monthly Stats",
+                "verbose_name_plural": "Driver Monthly Stats",
+                "ordering": ["period", "driver"],
+                "abstract": False,
+                "indexes": [
+                    models.Index(fields=["period"], name="driver_monthly_period_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("driver", "period"), name="driver_monthly_stats_unique"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:31
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def seed_counters(apps, schema_editor):
+    """Initial counters for existing rides, same as `reconcile_ride_counters`."""
+    Ride = apps.get_model("app_ride", "Ride")
+    RideCounter = apps.get_model("app_ride", "RideCounter")
+
+    counters = [
+        RideCounter(scope="status", key=row["status"], value=row["total"])
+        for row in Ride.objects.values("status").annotate(total=Count("pk"))
+    ]
+    counters += [
+        RideCounter(
+            scope="active_driver", key=str(row["driver_id"]), value=row["total"]
+        )
+        for row in Ride.objects.exclude(status="dropoff")
+        .values("driver_id")
+        .annotate(total=Count("pk"))
+    ]
+    counters += [
+        RideCounter(scope="created_day", key=row["day"].isoformat(), value=row["total"])
+        for row in Ride.objects.annotate(day=TruncDate("created_at"))
+        .values("day")
+        .annotate(total=Count("pk"))
+    ]
+    RideCounter.objects.bulk_create(counters)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app_ride", "0010_driver_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RideCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[
+                            ("status", "Rides per status"),
+                            ("active_driver", "Active rides per driver"),
+                            ("created_day", "Rides created per day"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("key", models.CharField(max_length=50)),
+                ("slot", models.PositiveSmallIntegerField(default=0)),
+                ("value", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Ride Counter",
+                "verbose_name_plural": "Ride Counters",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("scope", "key", "slot"), name="ride_counter_unique"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:33
+
+from django.db import migrations, models
+
+import app_ride.models.ride_change
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app_ride", "0011_ride_counter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RideChange",
+            fields=[
+                ("seq", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "txid",
+                    models.BigIntegerField(
+                        db_default=app_ride.models.ride_change.TransactionId()
+                    ),
+                ),
+                ("ride_id", models.BigIntegerField(db_index=True)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("created", "Created"),
+                            ("updated", "Updated"),
+                            ("transitioned", "Transitioned"),
+                            ("event", "Event Added"),
+                            ("deleted", "Deleted"),
+                            ("pruned", "Older Changes Pruned"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Ride Change",
+                "verbose_name_plural": "Ride Changes",
+                "indexes": [
+                    models.Index(
+                        fields=["txid", "seq"], name="ride_change_position_idx"
+                    ),
+                    models.Index(
+                        condition=models.Q(("kind", "pruned")),
+                        fields=["txid", "seq"],
+                        name="ride_change_pruned_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
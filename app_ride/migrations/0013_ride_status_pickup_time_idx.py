@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app_ride", "0012_ride_change"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ride",
+            index=models.Index(
+                fields=["status", "pickup_time"], name="ride_status_pickup_time_idx"
+            ),
+        ),
+    ]
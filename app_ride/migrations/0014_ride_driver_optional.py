@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app_ride", "0013_ride_status_pickup_time_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="ride",
+            name="driver",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="rides_as_driver",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app_ride", "0015_driver_location"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedRide",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("en-route", "En Route"),
+                            ("pickup", "Pickup"),
+                            ("dropoff", "Dropoff"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("pickup_latitude", models.FloatField()),
+                ("pickup_longitude", models.FloatField()),
+                ("dropoff_latitude", models.FloatField()),
+                ("dropoff_longitude", models.FloatField()),
+                ("pickup_time", models.DateTimeField()),
+                ("created_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "driver",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_rides_as_driver",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "rider",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_rides_as_rider",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Archived Ride",
+                "verbose_name_plural": "Archived Rides",
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedRideEvent",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("event_type", models.CharField(max_length=20)),
+                ("from_status", models.CharField(blank=True, max_length=20, null=True)),
+                ("to_status", models.CharField(blank=True, max_length=20, null=True)),
+                ("description", models.TextField()),
+                ("created_at", models.DateTimeField()),
+                (
+                    "ride",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ride_events",
+                        to="app_ride.archivedride",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Archived Ride Event",
+                "verbose_name_plural": "Archived Ride Events",
+                "indexes": [
+                    models.Index(
+                        fields=["ride", "to_status", "created_at"],
+                        name="archivedevent_ride_status_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,144 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:47
+
+from datetime import datetime, timezone
+
+from django.db import migrations, models, transaction
+
+TABLE = "app_ride_rideevent"
+LEGACY = "app_ride_rideevent_legacy"
+
+# Monthly partitions created past the legacy one, `create_event_partitions` keeps extending them.
+MONTHS_AHEAD = 3
+
+
+def month_start(moment, months=0):
+    index = moment.year * 12 + moment.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_events(apps, schema_editor):
+    """
+    Turn the event table into one range partitioned by month on `created_at`.
+
+    The existing table is not copied: it is renamed and attached as the
+    partition of everything before next month. The slow parts run first without
+    blocking writes: the `(id, created_at)` primary key index of the partition
+    is built concurrently and its CHECK constraint is validated, so the attach
+    under the table lock neither builds an index nor scans the rows.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    boundary = month_start(datetime.now(timezone.utc), 1)
+    with connection.cursor() as cursor:
+        # left behind invalid if an earlier run was interrupted
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {TABLE}_id_created_at")
+        cursor.execute(
+            f"CREATE UNIQUE INDEX CONCURRENTLY {TABLE}_id_created_at "
+            f"ON {TABLE} (id, created_at)"
+        )
+        cursor.execute(f"ALTER TABLE {TABLE} DROP CONSTRAINT IF EXISTS {TABLE}_bound")
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_bound "
+            f"CHECK (created_at < '{boundary.isoformat()}') NOT VALID"
+        )
+        cursor.execute(f"ALTER TABLE {TABLE} VALIDATE CONSTRAINT {TABLE}_bound")
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {LEGACY}")
+        cursor.execute(f"ALTER TABLE {LEGACY} DROP CONSTRAINT {TABLE}_pkey")
+        cursor.execute(
+            f"ALTER TABLE {LEGACY} ADD CONSTRAINT {LEGACY}_pkey "
+            f"PRIMARY KEY USING INDEX {TABLE}_id_created_at"
+        )
+        # Partitioned tables cannot own an identity column (before PostgreSQL 17),
+        # ids come from a plain sequence continuing after the current maximum.
+        cursor.execute(f"ALTER TABLE {LEGACY} ALTER COLUMN id DROP IDENTITY IF EXISTS")
+        cursor.execute(f"ALTER TABLE {LEGACY} ALTER COLUMN id DROP DEFAULT")
+        cursor.execute(f"DROP SEQUENCE IF EXISTS {TABLE}_id_seq")
+
+        # Secondary indexes are recreated on the parent under their original
+        # names, the legacy ones get attached to them instead of rebuilt.
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE tablename = %s AND indexname != %s",
+            [LEGACY, f"{LEGACY}_pkey"],
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f"ALTER INDEX {name} RENAME TO {name[:52]}_legacy")
+
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [LEGACY],
+        )
+        foreign_keys = cursor.fetchall()
+
+        cursor.execute(f"CREATE SEQUENCE {TABLE}_id_seq AS bigint")
+        cursor.execute(
+            f"SELECT setval('{TABLE}_id_seq', COALESCE(MAX(id), 0) + 1, false) FROM {LEGACY}"
+        )
+        cursor.execute(
+            f"""
+            CREATE TABLE {TABLE} (
+                id bigint NOT NULL DEFAULT nextval('{TABLE}_id_seq'),
+                ride_id bigint NOT NULL,
+                event_type varchar(20) NOT NULL,
+                from_status varchar(20) NULL,
+                to_status varchar(20) NULL,
+                description text NOT NULL,
+                created_at timestamp with time zone NOT NULL,
+                PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at)
+            """
+        )
+        cursor.execute(f"ALTER SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id")
+
+        for name, definition in indexes:
+            cursor.execute(
+                definition.replace(f".{LEGACY} ", f".{TABLE} ").replace(
+                    f" ON {LEGACY} ", f" ON {TABLE} "
+                )
+            )
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}")
+
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ATTACH PARTITION {LEGACY} "
+            f"FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat()}')"
+        )
+        cursor.execute(f"ALTER TABLE {LEGACY} DROP CONSTRAINT {TABLE}_bound")
+
+        for offset in range(MONTHS_AHEAD):
+            start = month_start(boundary, offset)
+            cursor.execute(
+                f"CREATE TABLE {TABLE}_p{start:%Y_%m} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{start.isoformat()}') "
+                f"TO ('{month_start(start, 1).isoformat()}')"
+            )
+        # catches events past the last monthly partition instead of failing the
+        # insert, `create_event_partitions` moves them out again
+        cursor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("app_ride", "0016_ride_archive"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="rideevent",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        # The partitioned table behaves like the plain one for Django, there is
+        # nothing to undo when migrating backwards.
+        migrations.RunPython(partition_events, migrations.RunPython.noop),
+    ]
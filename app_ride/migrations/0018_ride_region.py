@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app_ride", "0017_rideevent_partitioning"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedride",
+            name="region",
+            field=models.CharField(
+                blank=True, db_index=True, default="", max_length=32
+            ),
+        ),
+        migrations.AddField(
+            model_name="ride",
+            name="region",
+            field=models.CharField(
+                blank=True, db_index=True, default="", max_length=32
+            ),
+        ),
+    ]
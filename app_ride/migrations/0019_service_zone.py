@@ -0,0 +1,68 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app_ride", "0018_ride_region"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ServiceZone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("code", models.SlugField(max_length=64, unique=True)),
+                ("name", models.CharField(max_length=100)),
+                ("polygon", models.JSONField()),
+                ("min_latitude", models.FloatField(editable=False)),
+                ("max_latitude", models.FloatField(editable=False)),
+                ("min_longitude", models.FloatField(editable=False)),
+                ("max_longitude", models.FloatField(editable=False)),
+                ("is_active", models.BooleanField(default=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Service Zone",
+                "verbose_name_plural": "Service Zones",
+                "ordering": ["code"],
+            },
+        ),
+        migrations.CreateModel(
+            name="RideZone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("ride_id", models.BigIntegerField()),
+                ("zone_id", models.BigIntegerField()),
+            ],
+            options={
+                "verbose_name": "Ride Zone",
+                "verbose_name_plural": "Ride Zones",
+                "indexes": [
+                    models.Index(fields=["ride_id"], name="ride_zone_ride_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("zone_id", "ride_id"), name="ride_zone_unique"
+                    )
+                ],
+            },
+        ),
+    ]
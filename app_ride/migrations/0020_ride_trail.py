@@ -0,0 +1,58 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app_ride", "0019_service_zone"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RideTrail",
+            fields=[
+                ("ride_id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("point_count", models.PositiveIntegerField(default=0)),
+                ("distance_km", models.FloatField(default=0)),
+                ("last_latitude", models.FloatField(blank=True, null=True)),
+                ("last_longitude", models.FloatField(blank=True, null=True)),
+                ("last_time", models.DateTimeField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Ride Trail",
+                "verbose_name_plural": "Ride Trails",
+            },
+        ),
+        migrations.CreateModel(
+            name="RideTrailSegment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("ride_id", models.BigIntegerField()),
+                ("number", models.PositiveIntegerField()),
+                ("point_count", models.PositiveIntegerField()),
+                ("start_time", models.DateTimeField()),
+                ("end_time", models.DateTimeField()),
+                ("data", models.BinaryField()),
+            ],
+            options={
+                "verbose_name": "Ride Trail Segment",
+                "verbose_name_plural": "Ride Trail Segments",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("ride_id", "number"),
+                        name="ride_trail_segment_number_uniq",
+                    )
+                ],
+            },
+        ),
+    ]
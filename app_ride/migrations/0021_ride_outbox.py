@@ -0,0 +1,64 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app_ride", "0020_ride_trail"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RideOutbox",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("ride_id", models.BigIntegerField()),
+                ("handler", models.CharField(max_length=200)),
+                ("payload", models.JSONField(default=dict)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("pending", "Pending"), ("dead", "Dead")],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "available_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("last_error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Ride Outbox Message",
+                "verbose_name_plural": "Ride Outbox",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "available_at"], name="ride_outbox_due_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="CountedTrip",
+            fields=[
+                ("ride_id", models.BigIntegerField(primary_key=True, serialize=False)),
+            ],
+            options={
+                "verbose_name": "Counted Trip",
+                "verbose_name_plural": "Counted Trips",
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app_ride", "0021_ride_outbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportProgress",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source", models.CharField(max_length=500, unique=True)),
+                ("offset", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Import Progress",
+                "verbose_name_plural": "Import Progress",
+            },
+        ),
+    ]
@@ -1,4 +1,30 @@
+from .driver_location import DriverLocation
+from .driver_stats import CountedTrip, DriverDailyStats, DriverMonthlyStats
 from .ride import Ride
+from .ride_archive import ArchivedRide, ArchivedRideEvent
+from .ride_change import RideChange
+from .ride_counter import RideCounter
 from .ride_event import RideEvent
+from .ride_import import ImportProgress
+from .ride_outbox import RideOutbox
+from .ride_trail import RideTrail, RideTrailSegment
+from .service_zone import RideZone, ServiceZone
 
-__all__ = ["Ride", "RideEvent"]
+__all__ = [
+    "Ride",
+    "RideEvent",
+    "DriverLocation",
+    "DriverDailyStats",
+    "DriverMonthlyStats",
+    "CountedTrip",
+    "ArchivedRide",
+    "ArchivedRideEvent",
+    "RideChange",
+    "RideCounter",
+    "RideOutbox",
+    "RideTrail",
+    "RideTrailSegment",
+    "ServiceZone",
+    "RideZone",
+    "ImportProgress",
+]
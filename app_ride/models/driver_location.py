@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.db import models
+
+
+class DriverLocation(models.Model):
+    """Last reported position of a driver, used by the dispatch engine."""
+
+    driver = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="location",
+    )
+
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+
+    # The driver's own online toggle, busy drivers are excluded by their active rides.
+    is_available = models.BooleanField(default=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Driver Location"
+        verbose_name_plural = "Driver Locations"
+        indexes = [
+            models.Index(
+                fields=["is_available", "updated_at"],
+                name="driver_location_available_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.driver} ({self.latitude}, {self.longitude})"
@@ -0,0 +1,157 @@
+from django.conf import settings
+from django.db import models, router, transaction
+from django.db.models import F
+from django.utils.timezone import localdate
+
+
+def trip_metrics(enroute_at, pickup_at, dropoff_at):
+    """
+    Compute the rollup increments for one completed ride.
+
+    - trip duration: pickup -> dropoff
+    - pickup wait: en-route -> pickup (time the rider waited for the driver)
+    Missing transitions simply leave the related metric out.
+    """
+    metrics = {"trips_completed": 1}
+
+    if pickup_at and dropoff_at:
+        trip_seconds = (dropoff_at - pickup_at).total_seconds()
+        metrics.update(
+            timed_trips=1,
+            total_trip_seconds=trip_seconds,
+            trips_over_1h=int(trip_seconds > 3600),
+        )
+
+    if enroute_at and pickup_at:
+        metrics.update(
+            waited_trips=1,
+            total_pickup_wait_seconds=(pickup_at - enroute_at).total_seconds(),
+        )
+
+    return metrics
+
+
+class DriverStatsManager(models.Manager):
+    def record(self, driver_id, period, metrics):
+        """Atomically add `metrics` (see `trip_metrics`) to the driver's row for `period`."""
+        stats, _ = self.get_or_create(driver_id=driver_id, period=period)
+        self.filter(pk=stats.pk).update(
+            **{field: F(field) + value for field, value in metrics.items()}
+        )
+
+
+class DriverStats(models.Model):
+    """
+    Per-driver trip rollups, incremented by the ride outbox worker when a ride
+    reaches `dropoff` (see `app_ride.outbox`).
+
+    Rebuild from the ride events with `python manage.py rebuild_driver_stats`.
+    """
+
+    objects = DriverStatsManager()
+
+    driver = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    period = models.DateField()
+
+    trips_completed = models.PositiveIntegerField(default=0)
+    timed_trips = models.PositiveIntegerField(default=0)
+    total_trip_seconds = models.FloatField(default=0)
+    trips_over_1h = models.PositiveIntegerField(default=0)
+    waited_trips = models.PositiveIntegerField(default=0)
+    total_pickup_wait_seconds = models.FloatField(default=0)
+
+    class Meta:
+        abstract = True
+        ordering = ["period", "driver"]
+
+    @property
+    def avg_trip_seconds(self):
+        return self.total_trip_seconds / self.timed_trips if self.timed_trips else None
+
+    @property
+    def avg_pickup_wait_seconds(self):
+        if not self.waited_trips:
+            return None
+        return self.total_pickup_wait_seconds / self.waited_trips
+
+
+class DriverMonthlyStats(DriverStats):
+    """Rollups per driver and month, `period` is the first day of the month."""
+
+    class Meta(DriverStats.Meta):
+        verbose_name = "Driver Monthly Stats"
+        verbose_name_plural = "Driver Monthly Stats"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["driver", "period"], name="driver_monthly_stats_unique"
+            ),
+        ]
+        indexes = [models.Index(fields=["period"], name="driver_monthly_period_idx")]
+
+    def __str__(self):
+        return f"{self.driver} - {self.period:%Y-%m}"
+
+
+class DriverDailyStats(DriverStats):
+    """Rollups per driver and day."""
+
+    class Meta(DriverStats.Meta):
+        verbose_name = "Driver Daily Stats"
+        verbose_name_plural = "Driver Daily Stats"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["driver", "period"], name="driver_daily_stats_unique"
+            ),
+        ]
+        indexes = [models.Index(fields=["period"], name="driver_daily_period_idx")]
+
+    def __str__(self):
+        return f"{self.driver} - {self.period}"
+
+
+class CountedTrip(models.Model):
+    """
+    A ride added to the driver rollups, a ride reaches `dropoff` only once so
+    an outbox message delivered again (e.g. after its lease ran out) is skipped.
+
+    Stored with the rollups in `default`, `ride_id` is not a foreign key since
+    rides live in their own database.
+    """
+
+    ride_id = models.BigIntegerField(primary_key=True)
+
+    class Meta:
+        verbose_name = "Counted Trip"
+        verbose_name_plural = "Counted Trips"
+
+    def __str__(self):
+        return f"Trip of Ride #{self.ride_id}"
+
+
+def record_completed_ride(ride):
+    """Add a ride that just reached `dropoff` to the driver rollups, once."""
+    from app_ride.models import Ride
+
+    times = (
+        Ride.objects.using(ride._state.db)
+        .filter(pk=ride.pk)
+        .with_transition_time("en-route")
+        .with_transition_time("pickup")
+        .with_transition_time("dropoff")
+        .values("enroute_at", "pickup_at", "dropoff_at")
+        .get()
+    )
+    metrics = trip_metrics(times["enroute_at"], times["pickup_at"], times["dropoff_at"])
+
+    day = localdate(ride.pickup_time)
+    with transaction.atomic(using=router.db_for_write(CountedTrip)):
+        # waits for a concurrent delivery of the same ride to commit or roll back
+        _, created = CountedTrip.objects.get_or_create(ride_id=ride.pk)
+        if not created:
+            return
+        DriverMonthlyStats.objects.record(ride.driver_id, day.replace(day=1), metrics)
+        DriverDailyStats.objects.record(ride.driver_id, day, metrics)
@@ -1,8 +1,10 @@
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models import F, Value
+from django.db import models, router, transaction
+from django.db.models import F, OuterRef, Subquery, Value
+from django.utils.timezone import now, timedelta
 
+from app_ride.sharding import region_for_point
 from utils.model_query_funcs.distance import Haversine
 
 
@@ -30,6 +32,47 @@ class RideQuerySet(models.QuerySet):
             )
         )
 
+    def create(self, **kwargs):
+        # Without an explicit database, let the router place the new ride by its
+        # region (see app_ride.sharding) instead of the queryset's default one.
+        if self._db is not None:
+            return super().create(**kwargs)
+        ride = self.model(**kwargs)
+        ride.save(force_insert=True)
+        return ride
+
+    def upcoming(self, start=None, end=None):
+        """
+        Rides not yet picked up whose `pickup_time` falls in (start, end], soonest first.
+
+        Defaults to the next hour. Served by the (status, pickup_time) index.
+        """
+        start = start or now()
+        end = end or start + timedelta(hours=1)
+        return self.filter(
+            status__in=Ride.UPCOMING_STATUSES,
+            pickup_time__gt=start,
+            pickup_time__lte=end,
+        ).order_by("pickup_time")
+
+    def with_transition_time(self, status, name=None):
+        """
+        Annotate when the ride last transitioned into `status`.
+
+        The annotation defaults to `<status>_at` (e.g. `pickup_at`, `enroute_at`).
+        """
+        # RideEvent, or ArchivedRideEvent for the archive
+        events = self.model._meta.get_field("ride_events").related_model
+        last_transition = (
+            events.objects.transitions_to(status)
+            .filter(ride=OuterRef("pk"))
+            .order_by("-created_at")
+            .values("created_at")[:1]
+        )
+        return self.annotate(
+            **{name or f"{status.replace('-', '')}_at": Subquery(last_transition)}
+        )
+
 
 class RideManager(models.Manager.from_queryset(RideQuerySet)):
     """
@@ -49,18 +92,30 @@ class Ride(models.Model):
         ("dropoff", "Dropoff"),
     ]
 
+    # Valid status progression from pending -> en-route -> pickup -> dropoff.
+    STATUS_PROGRESSION = ["pending", "en-route", "pickup", "dropoff"]
+
+    # Statuses of rides that are still waiting for their pickup.
+    UPCOMING_STATUSES = ["pending", "en-route"]
+
     rider = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="rides_as_rider",
     )
+    # Empty while a pending ride waits for the dispatch engine to assign a driver.
     driver = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="rides_as_driver",
+        blank=True,
+        null=True,
     )
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    # `RIDE_REGIONS` key, decides the database holding the ride (see app_ride.sharding).
+    # Defaults to the region of the pickup point, empty outside every region.
+    region = models.CharField(max_length=32, blank=True, default="", db_index=True)
 
     pickup_latitude = models.FloatField()
     pickup_longitude = models.FloatField()
@@ -73,6 +128,11 @@ class Ride(models.Model):
     class Meta:
         verbose_name = "Ride"
         verbose_name_plural = "Rides"
+        indexes = [
+            models.Index(
+                fields=["status", "pickup_time"], name="ride_status_pickup_time_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Ride #{self.pk} - {self.rider} ({self.status})"
@@ -81,9 +141,38 @@ class Ride(models.Model):
         """Prevent admins from being assigned."""
         if self.rider.role == "admin":
             raise ValidationError("Rider must not be an admin user.")
-        if self.driver.role == "admin":
+        if self.driver_id and self.driver.role == "admin":
             raise ValidationError("Driver must not be an admin user.")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_state = instance.counter_state
+        instance._loaded_pickup = instance.pickup_point
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._loaded_state = self.counter_state
+        self._loaded_pickup = self.pickup_point
+
+    @property
+    def counter_state(self):
+        """The fields `RideCounter` aggregates over, used to diff saves."""
+        return (self.status, self.driver_id, self.created_at)
+
+    @property
+    def pickup_point(self):
+        """(latitude, longitude) the ride's `RideZone` rows are computed from."""
+        return (self.pickup_latitude, self.pickup_longitude)
+
     def save(self, *args, **kwargs):
+        if not self.region:
+            self.region = region_for_point(self.pickup_latitude, self.pickup_longitude)
         self.full_clean()
-        super().save(*args, **kwargs)
+        # atomic so the post_save counter updates commit together with the row
+        using = kwargs.pop("using", None) or router.db_for_write(
+            type(self), instance=self
+        )
+        with transaction.atomic(using=using):
+            super().save(*args, using=using, **kwargs)
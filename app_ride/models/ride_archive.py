@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.db import models
+
+from app_ride.models.ride import Ride, RideManager
+from app_ride.models.ride_event import RideEventManager
+
+
+class ArchivedRide(models.Model):
+    """
+    Completed rides moved out of the `Ride` table by `python manage.py archive_rides`.
+
+    Rows keep their original id and fields so they can be served next to live
+    rides (see `include_archived` on `RideView`). They are never written again.
+    """
+
+    objects = RideManager()
+
+    id = models.BigIntegerField(primary_key=True)
+
+    rider = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_rides_as_rider",
+    )
+    driver = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_rides_as_driver",
+        blank=True,
+        null=True,
+    )
+
+    status = models.CharField(max_length=20, choices=Ride.STATUS_CHOICES)
+    region = models.CharField(max_length=32, blank=True, default="", db_index=True)
+
+    pickup_latitude = models.FloatField()
+    pickup_longitude = models.FloatField()
+    dropoff_latitude = models.FloatField()
+    dropoff_longitude = models.FloatField()
+
+    pickup_time = models.DateTimeField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Archived Ride"
+        verbose_name_plural = "Archived Rides"
+
+    def __str__(self):
+        return f"Archived Ride #{self.pk} - {self.rider} ({self.status})"
+
+
+class ArchivedRideEvent(models.Model):
+    """`RideEvent` rows archived together with their ride."""
+
+    objects = RideEventManager()
+
+    id = models.BigIntegerField(primary_key=True)
+
+    ride = models.ForeignKey(
+        ArchivedRide,
+        on_delete=models.CASCADE,
+        related_name="ride_events",
+    )
+
+    event_type = models.CharField(max_length=20)
+    from_status = models.CharField(max_length=20, blank=True, null=True)
+    to_status = models.CharField(max_length=20, blank=True, null=True)
+
+    description = models.TextField()
+
+    created_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Archived Ride Event"
+        verbose_name_plural = "Archived Ride Events"
+        indexes = [
+            models.Index(
+                fields=["ride", "to_status", "created_at"],
+                name="archivedevent_ride_status_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Archived Ride Event #{self.pk} - {self.description}"
@@ -0,0 +1,181 @@
+import base64
+
+from django.db import connections, models
+from django.db.models import Q
+
+
+class TransactionId(models.Func):
+    """
+    Id of the writing transaction on PostgreSQL, 0 elsewhere.
+
+    SQLite has a single writer holding its lock until commit, so change rows
+    are committed in sequence order there and need no transaction id.
+    """
+
+    output_field = models.BigIntegerField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        return "0", []
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return "(pg_current_xact_id()::text::bigint)", []
+
+
+def visibility_horizon(using):
+    """
+    Oldest transaction id still running on PostgreSQL, None elsewhere.
+
+    Every change with a lower `txid` is committed (or rolled back), so the
+    changes below the horizon are final and no later commit can appear among
+    them.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+        return cursor.fetchone()[0]
+
+
+class RideChangeQuerySet(models.QuerySet):
+    def settled(self):
+        """Changes of finished transactions only, see `visibility_horizon`."""
+        horizon = visibility_horizon(self.db)
+        return self if horizon is None else self.filter(txid__lt=horizon)
+
+    def after(self, position):
+        """Changes after the `(txid, seq)` position, in feed order."""
+        txid, seq = position
+        return self.filter(Q(txid__gt=txid) | Q(txid=txid, seq__gt=seq)).order_by(
+            "txid", "seq"
+        )
+
+    def head(self):
+        """Position of the latest change, (0, 0) when the feed is empty."""
+        last = self.order_by("-txid", "-seq").values_list("txid", "seq").first()
+        return last or (0, 0)
+
+    def pruned_until(self):
+        """Position of the newest prune marker, None when nothing was pruned."""
+        return (
+            self.filter(kind=RideChange.PRUNED)
+            .order_by("-txid", "-seq")
+            .values_list("txid", "seq")
+            .first()
+        )
+
+
+class RideChangeManager(models.Manager.from_queryset(RideChangeQuerySet)):
+    """
+    Appends change feed helpers to the default model manager.
+    """
+
+    def record(self, ride_id, kind, using=None):
+        return self.db_manager(using).create(ride_id=ride_id, kind=kind)
+
+    def prune(self, before, batch_size=10000, using=None):
+        """
+        Delete the settled changes created before `before`, the newest of them
+        turns into a `pruned` marker so older cursors are detected. Returns the
+        number of deleted changes.
+        """
+        changes = self.db_manager(using).settled()
+        last = (
+            changes.filter(created_at__lt=before)
+            .order_by("-txid", "-seq")
+            .values_list("txid", "seq")
+            .first()
+        )
+        if last is None:
+            return 0
+
+        txid, seq = last
+        changes.filter(seq=seq).update(kind=RideChange.PRUNED)
+        older = changes.filter(Q(txid__lt=txid) | Q(txid=txid, seq__lt=seq))
+        deleted = 0
+        while batch := list(older.values_list("seq", flat=True)[:batch_size]):
+            deleted += self.db_manager(using).filter(seq__in=batch).delete()[0]
+        return deleted
+
+
+class RideChange(models.Model):
+    """
+    Append-only change feed over `Ride`, one row per write.
+
+    Rows are written in the same transaction as the ride write (see
+    `app_ride.signals`). `ride_id` is not a foreign key so tombstones of
+    deleted rides are kept.
+
+    The feed is ordered by `(txid, seq)` and only serves changes of finished
+    transactions (see `RideChangeQuerySet.settled`), so a long transaction
+    committing an old sequence number is still delivered, after the changes
+    that committed before it. `python manage.py prune_ride_changes` deletes old
+    changes and leaves a `pruned` marker in place of the newest one.
+    """
+
+    objects = RideChangeManager()
+
+    CREATED = "created"
+    UPDATED = "updated"
+    TRANSITIONED = "transitioned"
+    EVENT = "event"
+    DELETED = "deleted"
+    PRUNED = "pruned"
+    KIND_CHOICES = [
+        (CREATED, "Created"),
+        (UPDATED, "Updated"),
+        (TRANSITIONED, "Transitioned"),
+        (EVENT, "Event Added"),
+        (DELETED, "Deleted"),
+        (PRUNED, "Older Changes Pruned"),
+    ]
+
+    seq = models.BigAutoField(primary_key=True)
+    # Writing transaction, set by the database on insert.
+    txid = models.BigIntegerField(db_default=TransactionId())
+    ride_id = models.BigIntegerField(db_index=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Ride Change"
+        verbose_name_plural = "Ride Changes"
+        indexes = [
+            models.Index(fields=["txid", "seq"], name="ride_change_position_idx"),
+            models.Index(
+                fields=["txid", "seq"],
+                condition=Q(kind="pruned"),
+                name="ride_change_pruned_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Ride Change #{self.seq} - Ride #{self.ride_id} {self.kind}"
+
+
+def encode_cursor(positions):
+    """
+    Opaque cursor for the `(txid, seq)` position reached on each ride database,
+    `{alias: (txid, seq)}` (see app_ride.sharding).
+    """
+    value = "v1:" + ",".join(
+        f"{alias}={txid}.{seq}" for alias, (txid, seq) in sorted(positions.items())
+    )
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """`{alias: (txid, seq)}` of a cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        version, value = base64.urlsafe_b64decode(padded).decode().split(":", 1)
+        if version != "v1":
+            raise ValueError
+        positions = {}
+        for part in value.split(","):
+            alias, position = part.split("=")
+            txid, seq = position.split(".")
+            positions[alias] = (int(txid), int(seq))
+        return positions
+    except ValueError:
+        raise ValueError("Invalid cursor.")
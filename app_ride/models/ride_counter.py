@@ -0,0 +1,101 @@
+import random
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Sum
+from django.utils.timezone import localdate
+
+
+class RideCounterQuerySet(models.QuerySet):
+    def totals(self):
+        """Values grouped by counter with their slots summed, as `total`."""
+        return self.order_by().values("scope", "key").annotate(total=Sum("value"))
+
+
+class RideCounterManager(models.Manager.from_queryset(RideCounterQuerySet)):
+    def apply(self, deltas, slot=None):
+        """
+        Atomically add each `(scope, key) -> delta` to one slot row of its counter.
+
+        `slot` defaults to a random one. Rows are updated in key order so two
+        writes sharing slots lock them in the same order.
+        """
+        if slot is None:
+            slot = random.randrange(settings.RIDE_COUNTER_SLOTS)
+        for (scope, key), delta in sorted(deltas.items()):
+            if not delta:
+                continue
+            row = self.filter(scope=scope, key=key, slot=slot)
+            if row.update(value=F("value") + delta):
+                continue
+            try:
+                with transaction.atomic(using=self.db):
+                    self.create(scope=scope, key=key, slot=slot, value=delta)
+            except IntegrityError:
+                # created by a concurrent write meanwhile
+                row.update(value=F("value") + delta)
+
+
+class RideCounter(models.Model):
+    """
+    Dashboard counters over `Ride`, maintained in the same transaction as every
+    ride create, delete and status/driver change (see `app_ride.signals`).
+
+    A counter is the sum of its `RIDE_COUNTER_SLOTS` slot rows (read them with
+    `totals()`), each write adds to a single slot so rides written at the same
+    time rarely wait on the same row lock. Recompute them with
+    `python manage.py reconcile_ride_counters`.
+    """
+
+    objects = RideCounterManager()
+
+    STATUS = "status"
+    ACTIVE_DRIVER = "active_driver"
+    CREATED_DAY = "created_day"
+    SCOPE_CHOICES = [
+        (STATUS, "Rides per status"),
+        (ACTIVE_DRIVER, "Active rides per driver"),
+        (CREATED_DAY, "Rides created per day"),
+    ]
+
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    key = models.CharField(max_length=50)
+    # the row of the counter this one is, see RIDE_COUNTER_SLOTS
+    slot = models.PositiveSmallIntegerField(default=0)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Ride Counter"
+        verbose_name_plural = "Ride Counters"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "key", "slot"], name="ride_counter_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.key}[{self.slot}] = {self.value}"
+
+
+def ride_counter_keys(status, driver_id, created_at):
+    """Counter keys a ride with the given state contributes 1 to."""
+    keys = [
+        (RideCounter.STATUS, status),
+        (RideCounter.CREATED_DAY, localdate(created_at).isoformat()),
+    ]
+    if status != "dropoff" and driver_id is not None:
+        keys.append((RideCounter.ACTIVE_DRIVER, str(driver_id)))
+    return keys
+
+
+def ride_counter_deltas(before, after):
+    """
+    Diff two ride states, each `(status, driver_id, created_at)` or None.
+    """
+    deltas = Counter()
+    if before:
+        deltas.subtract(ride_counter_keys(*before))
+    if after:
+        deltas.update(ride_counter_keys(*after))
+    return deltas
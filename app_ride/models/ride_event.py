@@ -3,20 +3,64 @@ from django.db import models
 from app_ride.models import Ride
 
 
+class RideEventQuerySet(models.QuerySet):
+    def status_changes(self):
+        """Only events recorded by a status transition."""
+        return self.filter(event_type=RideEvent.STATUS_CHANGE)
+
+    def transitions_to(self, status):
+        """Status change events into `status`, served by the (ride, to_status, created_at) index."""
+        return self.filter(to_status=status)
+
+
+class RideEventManager(models.Manager.from_queryset(RideEventQuerySet)):
+    """
+    Appends event type helpers to the default model manager.
+    """
+
+    pass
+
+
 class RideEvent(models.Model):
+    objects = RideEventManager()
+
+    NOTE = "note"
+    STATUS_CHANGE = "status_change"
+    EVENT_TYPE_CHOICES = [
+        (NOTE, "Note"),
+        (STATUS_CHANGE, "Status Change"),
+    ]
+
     ride = models.ForeignKey(
         Ride,
         on_delete=models.CASCADE,
         related_name="ride_events",
     )
 
+    event_type = models.CharField(
+        max_length=20, choices=EVENT_TYPE_CHOICES, default=NOTE, db_index=True
+    )
+    from_status = models.CharField(
+        max_length=20, choices=Ride.STATUS_CHOICES, blank=True, null=True
+    )
+    to_status = models.CharField(
+        max_length=20, choices=Ride.STATUS_CHOICES, blank=True, null=True
+    )
+
     description = models.TextField()
 
-    created_at = models.DateTimeField(auto_now=True)
+    # Partition key on PostgreSQL (see app_ride.partitions), so never rewritten on save.
+    created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         verbose_name = "Ride Event"
         verbose_name_plural = "Ride Events"
+        indexes = [
+            models.Index(
+                fields=["ride", "to_status", "created_at"],
+                name="rideevent_ride_to_status_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Ride Event #{self.pk} - {self.description}"
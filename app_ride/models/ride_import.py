@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class ImportProgress(models.Model):
+    """
+    Byte offset of an import file committed on one ride database.
+
+    Written in the transaction inserting each batch, on every database the
+    batch has rows for, so a resumed `import_rides` skips the records already
+    committed there even when the checkpoint file was not saved after them.
+    """
+
+    # model label and absolute path of the input file
+    source = models.CharField(max_length=500, unique=True)
+    offset = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Import Progress"
+        verbose_name_plural = "Import Progress"
+
+    def __str__(self):
+        return f"{self.source} @ {self.offset}"
@@ -0,0 +1,43 @@
+from django.db import models
+from django.utils.timezone import now
+
+
+class RideOutbox(models.Model):
+    """
+    Side effect of a ride write waiting to run, one row per handler.
+
+    Rows are written in the same transaction as the ride write, on the ride's
+    own database, and drained by `python manage.py run_ride_outbox` (see
+    `app_ride.outbox`). `ride_id` is not a foreign key so messages outlive
+    their ride.
+    """
+
+    PENDING = "pending"
+    DEAD = "dead"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (DEAD, "Dead"),
+    ]
+
+    ride_id = models.BigIntegerField()
+    # Dotted path of the handler, see `RIDE_OUTBOX_HANDLERS`.
+    handler = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Not claimed before this time: the retry backoff, or the lease of a claimed row.
+    available_at = models.DateTimeField(default=now)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Ride Outbox Message"
+        verbose_name_plural = "Ride Outbox"
+        indexes = [
+            models.Index(fields=["status", "available_at"], name="ride_outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"Ride Outbox #{self.pk} - Ride #{self.ride_id} {self.handler}"
@@ -0,0 +1,56 @@
+from django.db import models
+
+
+class RideTrail(models.Model):
+    """
+    GPS breadcrumb trail of a ride: running totals and the last point.
+
+    The points themselves are stored in `RideTrailSegment` blobs (see
+    `app_ride.trails`). `ride_id` is not a foreign key so trails are kept when
+    their ride is archived.
+    """
+
+    ride_id = models.BigIntegerField(primary_key=True)
+
+    point_count = models.PositiveIntegerField(default=0)
+    # Length of the path through every point, maintained on append.
+    distance_km = models.FloatField(default=0)
+
+    last_latitude = models.FloatField(null=True, blank=True)
+    last_longitude = models.FloatField(null=True, blank=True)
+    last_time = models.DateTimeField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Ride Trail"
+        verbose_name_plural = "Ride Trails"
+
+    def __str__(self):
+        return f"Trail of Ride #{self.ride_id} ({self.point_count} points)"
+
+
+class RideTrailSegment(models.Model):
+    """Up to `TRAIL_SEGMENT_POINTS` consecutive points of a trail, delta encoded in `data`."""
+
+    ride_id = models.BigIntegerField()
+    number = models.PositiveIntegerField()
+
+    point_count = models.PositiveIntegerField()
+    # Time span of the points, segments are picked by it before decoding.
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+
+    data = models.BinaryField()
+
+    class Meta:
+        verbose_name = "Ride Trail Segment"
+        verbose_name_plural = "Ride Trail Segments"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ride_id", "number"], name="ride_trail_segment_number_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Trail of Ride #{self.ride_id}, segment {self.number}"
@@ -0,0 +1,81 @@
+from django.core.exceptions import ValidationError
+from django.db import models
+
+
+class ServiceZone(models.Model):
+    """A service area, rides are tagged with every zone containing their pickup point."""
+
+    code = models.SlugField(max_length=64, unique=True)
+    name = models.CharField(max_length=100)
+
+    # [[latitude, longitude], ...] vertices in order, the last one connects back to the first.
+    polygon = models.JSONField()
+
+    # Bounding box of `polygon`, set on save: rides are prefiltered on it in SQL.
+    min_latitude = models.FloatField(editable=False)
+    max_latitude = models.FloatField(editable=False)
+    min_longitude = models.FloatField(editable=False)
+    max_longitude = models.FloatField(editable=False)
+
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Service Zone"
+        verbose_name_plural = "Service Zones"
+        ordering = ["code"]
+
+    def __str__(self):
+        return f"{self.name} ({self.code})"
+
+    def clean(self):
+        """Require at least 3 valid [latitude, longitude] vertices."""
+        polygon = self.polygon
+        if not isinstance(polygon, list) or len(polygon) < 3:
+            raise ValidationError({"polygon": "A polygon needs at least 3 vertices."})
+        for vertex in polygon:
+            if (
+                not isinstance(vertex, (list, tuple))
+                or len(vertex) != 2
+                or not all(isinstance(value, (int, float)) for value in vertex)
+                or not -90 <= vertex[0] <= 90
+                or not -180 <= vertex[1] <= 180
+            ):
+                raise ValidationError(
+                    {"polygon": f"{vertex!r} is not a [latitude, longitude] pair."}
+                )
+
+    def save(self, *args, **kwargs):
+        self.full_clean(
+            exclude=["min_latitude", "max_latitude", "min_longitude", "max_longitude"]
+        )
+        latitudes = [vertex[0] for vertex in self.polygon]
+        longitudes = [vertex[1] for vertex in self.polygon]
+        self.min_latitude, self.max_latitude = min(latitudes), max(latitudes)
+        self.min_longitude, self.max_longitude = min(longitudes), max(longitudes)
+        super().save(*args, **kwargs)
+
+
+class RideZone(models.Model):
+    """
+    A service zone containing the pickup point of a ride, one row per zone.
+
+    Stored in the ride's database (see app_ride.sharding) while zones live in
+    `default`, and kept when the ride is archived, so neither id is a foreign key.
+    """
+
+    ride_id = models.BigIntegerField()
+    zone_id = models.BigIntegerField()
+
+    class Meta:
+        verbose_name = "Ride Zone"
+        verbose_name_plural = "Ride Zones"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["zone_id", "ride_id"], name="ride_zone_unique"
+            )
+        ]
+        indexes = [models.Index(fields=["ride_id"], name="ride_zone_ride_idx")]
+
+    def __str__(self):
+        return f"Ride #{self.ride_id} in Zone #{self.zone_id}"
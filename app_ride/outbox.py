@@ -0,0 +1,190 @@
+"""
+Transactional outbox for side effects of ride status changes.
+
+A status change writes one `RideOutbox` row per handler of
+`RIDE_OUTBOX_HANDLERS` interested in the new status, in the same transaction
+and database as the ride, so the request only pays for an insert however many
+side effects there are. `python manage.py run_ride_outbox` drains the rows:
+each worker claims a batch of due rows with `SELECT ... FOR UPDATE SKIP LOCKED`
+and hides them from other workers for `RIDE_OUTBOX_LEASE_SECONDS`, then runs
+every handler in a transaction that also deletes its row.
+
+Handlers run at least once: a handler writing to the ride's database commits
+with the delete, anything else may run again after a crash. Failures are
+retried with exponential backoff and marked dead after `RIDE_OUTBOX_MAX_ATTEMPTS`.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils.module_loading import import_string
+from django.utils.timezone import now
+
+from app_ride.models import Ride, RideOutbox
+from app_ride.models.driver_stats import record_completed_ride
+from app_ride.sharding import database_for_instance, ride_databases
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_side_effects(ride, event) -> None:
+    """Write the outbox rows of a status change `event`, in the caller's transaction."""
+    messages = [
+        RideOutbox(
+            ride_id=ride.pk,
+            handler=path,
+            payload={
+                "event": event.pk,
+                "from_status": event.from_status,
+                "to_status": event.to_status,
+            },
+        )
+        for path, statuses in settings.RIDE_OUTBOX_HANDLERS.items()
+        if event.to_status in statuses
+    ]
+    if messages:
+        RideOutbox.objects.using(database_for_instance(ride)).bulk_create(messages)
+
+
+@functools.lru_cache(maxsize=None)
+def get_handler(path: str) -> Callable[[RideOutbox], None]:
+    return import_string(path)
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before the next attempt, doubling per attempt with up to 10% jitter."""
+    delay = min(
+        settings.RIDE_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.RIDE_OUTBOX_RETRY_MAX_SECONDS,
+    )
+    return delay * random.uniform(1, 1.1)
+
+
+class OutboxWorker:
+    """Claims and handles due outbox rows on every ride database."""
+
+    def __init__(
+        self, batch_size: Optional[int] = None, clock: Callable[[], datetime] = now
+    ):
+        self.batch_size = batch_size or settings.RIDE_OUTBOX_BATCH_SIZE
+        self.clock = clock
+
+    def claim(self, using: str) -> list[RideOutbox]:
+        """Lease up to `batch_size` due rows, skipping the ones other workers hold."""
+        current = self.clock()
+        rows = RideOutbox.objects.using(using)
+        with transaction.atomic(using=using):
+            ids = list(
+                rows.select_for_update(skip_locked=True)
+                .filter(status=RideOutbox.PENDING, available_at__lte=current)
+                .order_by("available_at")
+                .values_list("pk", flat=True)[: self.batch_size]
+            )
+            if not ids:
+                return []
+            rows.filter(pk__in=ids).update(
+                available_at=current
+                + timedelta(seconds=settings.RIDE_OUTBOX_LEASE_SECONDS),
+                attempts=F("attempts") + 1,
+            )
+            return list(rows.filter(pk__in=ids).order_by("pk"))
+
+    def leased(self, message: RideOutbox):
+        """The message's row while this worker's lease on it still holds."""
+        return RideOutbox.objects.using(message._state.db).filter(
+            pk=message.pk, status=RideOutbox.PENDING, available_at=message.available_at
+        )
+
+    def handle(self, message: RideOutbox) -> bool:
+        """
+        Run the message's handler and delete it, or schedule its retry.
+
+        A message whose lease ran out and was claimed again by another worker
+        (or was already handled) is skipped.
+        """
+        using = message._state.db
+        started = time.perf_counter()
+        try:
+            with transaction.atomic(using=using):
+                # the row lock keeps other workers from claiming it meanwhile
+                if not self.leased(message).select_for_update().exists():
+                    metrics.OUTBOX_MESSAGES.labels(message.handler, "skipped").inc()
+                    return False
+                get_handler(message.handler)(message)
+                RideOutbox.objects.using(using).filter(pk=message.pk).delete()
+        except Exception as ex:
+            logger.exception(
+                "Outbox handler %s failed for ride %s.",
+                message.handler,
+                message.ride_id,
+            )
+            self.fail(message, ex)
+            return False
+        finally:
+            metrics.OUTBOX_HANDLER_TIME.labels(message.handler).observe(
+                time.perf_counter() - started
+            )
+
+        metrics.OUTBOX_MESSAGES.labels(message.handler, "done").inc()
+        metrics.OUTBOX_LAG.labels(message.handler).observe(
+            (self.clock() - message.created_at).total_seconds()
+        )
+        return True
+
+    def fail(self, message: RideOutbox, error: Exception) -> None:
+        changes = {"last_error": f"{type(error).__name__}: {error}"}
+        if message.attempts >= settings.RIDE_OUTBOX_MAX_ATTEMPTS:
+            changes["status"] = RideOutbox.DEAD
+            outcome = "dead"
+        else:
+            changes["available_at"] = self.clock() + timedelta(
+                seconds=retry_delay(message.attempts)
+            )
+            outcome = "retried"
+        if not self.leased(message).update(**changes):
+            return
+        metrics.OUTBOX_MESSAGES.labels(message.handler, outcome).inc()
+
+    def run_once(self) -> int:
+        """Handle one batch per ride database, returns the number of rows claimed."""
+        claimed = 0
+        for alias in ride_databases():
+            messages = self.claim(alias)
+            for message in messages:
+                self.handle(message)
+            claimed += len(messages)
+        return claimed
+
+    def run_forever(
+        self, poll_interval: float = 1.0, stop: Optional[threading.Event] = None
+    ):
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            # keep draining while there is a backlog, poll once it is empty
+            if not self.run_once():
+                stop.wait(poll_interval)
+
+
+def record_driver_stats(message: RideOutbox) -> None:
+    """
+    Add a ride that reached `dropoff` to the driver trip rollups.
+
+    The rollups live in `default`, not always the ride's database, so the
+    message may be delivered again after they committed: `record_completed_ride`
+    counts each ride once.
+    """
+    ride = Ride.objects.using(message._state.db).filter(pk=message.ride_id).first()
+    # deleted before the worker got to it, nothing left to count
+    if ride is not None:
+        record_completed_ride(ride)
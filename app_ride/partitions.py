@@ -0,0 +1,156 @@
+"""
+Monthly range partitions of the `RideEvent` table on PostgreSQL.
+
+Migration 0017 turns the event table into a table partitioned by `created_at`:
+the existing rows stay where they are and become the `_legacy` partition, new
+events go to one partition per month and the `_default` partition takes events
+past the last one rather than failing their insert. Partitions are created ahead of time with
+`python manage.py create_event_partitions` and expired ones are dropped (or
+detached) with `python manage.py prune_event_partitions`.
+
+Queries filtering on `created_at`, like the `todays_ride_events` prefetch of
+`RideView`, only read the partitions covering that range. On other databases
+the table is a plain table and these helpers do nothing.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from django.db import connections, transaction
+
+from app_ride.models import RideEvent
+
+logger = logging.getLogger(__name__)
+
+PARENT = RideEvent._meta.db_table
+
+UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    # exclusive, None for a partition without upper bound
+    upper: Optional[datetime]
+    default: bool = False
+
+
+def month_start(moment: datetime, months: int = 0) -> datetime:
+    """Midnight UTC of the first day of the month `months` after `moment`'s."""
+    index = moment.year * 12 + moment.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{PARENT}_p{month:%Y_%m}"
+
+
+def is_partitioned(using: str = "default") -> bool:
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass",
+            [PARENT],
+        )
+        return cursor.fetchone() is not None
+
+
+def partitions(using: str = "default") -> list[Partition]:
+    """Partitions of the event table, oldest first."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %s::regclass
+            """,
+            [PARENT],
+        )
+        rows = cursor.fetchall()
+
+    result = []
+    for name, bound in rows:
+        match = UPPER_BOUND.search(bound)
+        upper = datetime.fromisoformat(match.group(1)) if match else None
+        result.append(Partition(name, upper, default=bound == "DEFAULT"))
+    return sorted(
+        result, key=lambda p: p.upper or datetime.max.replace(tzinfo=timezone.utc)
+    )
+
+
+def create_partitions(
+    months_ahead: int, now: datetime, using: str = "default"
+) -> list[str]:
+    """
+    Make sure monthly partitions exist up to `months_ahead` months after `now`.
+
+    Months already covered by an existing partition (e.g. the legacy one) are
+    skipped, returns the names of the partitions created. Events of a new month
+    that already landed in the default partition are moved into it.
+    """
+    existing = partitions(using)
+    covered_until = max((p.upper for p in existing if p.upper), default=None)
+    default = next((p.name for p in existing if p.default), None)
+
+    created = []
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            start = month_start(now, offset)
+            if covered_until and start < covered_until:
+                continue
+            name = partition_name(start)
+            # DDL takes no query parameters, the bounds are generated timestamps
+            lower, upper = start.isoformat(), month_start(start, 1).isoformat()
+            in_month = f"created_at >= '{lower}' AND created_at < '{upper}'"
+
+            moved = 0
+            if default:
+                cursor.execute(f'SELECT COUNT(*) FROM "{default}" WHERE {in_month}')
+                (moved,) = cursor.fetchone()
+            if moved:
+                # the new bound would overlap rows of the default partition
+                cursor.execute(f'ALTER TABLE "{PARENT}" DETACH PARTITION "{default}"')
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{PARENT}" '
+                f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+            )
+            if moved:
+                cursor.execute(
+                    f'INSERT INTO "{name}" SELECT * FROM "{default}" WHERE {in_month}'
+                )
+                cursor.execute(f'DELETE FROM "{default}" WHERE {in_month}')
+                cursor.execute(
+                    f'ALTER TABLE "{PARENT}" ATTACH PARTITION "{default}" DEFAULT'
+                )
+                logger.warning(
+                    "Moved %d events from %s to %s, partitions should be created "
+                    "further ahead.",
+                    moved,
+                    default,
+                    name,
+                )
+            created.append(name)
+    return created
+
+
+def expired_partitions(cutoff: datetime, using: str = "default") -> list[Partition]:
+    """Partitions only holding events older than `cutoff`."""
+    return [p for p in partitions(using) if p.upper and p.upper <= cutoff]
+
+
+def remove_partition(
+    name: str, detach_only: bool = False, using: str = "default"
+) -> None:
+    """Detach a partition from the event table and drop it unless `detach_only`."""
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{PARENT}" DETACH PARTITION "{name}"')
+        if not detach_only:
+            cursor.execute(f'DROP TABLE "{name}"')
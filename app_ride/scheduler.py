@@ -0,0 +1,212 @@
+"""
+In-process scheduler firing callbacks ahead of ride pickups.
+
+Upcoming rides are loaded once per time window through the
+`(status, pickup_time)` index, kept in sync by tailing the `RideChange` feed,
+and fired from a heap ordered by due time. Run it with
+`python manage.py run_pickup_scheduler`.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from django.utils.timezone import now
+
+from app_ride.models import Ride, RideChange
+from app_ride.sharding import ride_databases
+from app_ride.streams import ride_topics
+from utils.pubsub import get_broker
+
+logger = logging.getLogger(__name__)
+
+UPCOMING_FIELDS = ["id", "status", "pickup_time", "rider_id", "driver_id"]
+
+
+@dataclass(frozen=True)
+class Job:
+    name: str
+    lead: timedelta
+    callback: Callable[[dict], None]
+
+
+class PickupScheduler:
+    """
+    Fires every job `lead` before each upcoming ride's `pickup_time`.
+
+    Heap entries are never removed in place: a changed ride gets new entries and
+    the stale ones are skipped when popped because the ride's state no longer
+    matches.
+    """
+
+    def __init__(
+        self,
+        jobs: list[Job],
+        horizon: timedelta = timedelta(hours=1),
+        clock: Callable[[], datetime] = now,
+    ):
+        self.jobs = {job.name: job for job in jobs}
+        self.horizon = horizon
+        self.lookahead = horizon + max((job.lead for job in jobs), default=timedelta())
+        self.clock = clock
+
+        self._heap: list = []
+        self._counter = itertools.count()
+        self._rides: dict[int, dict] = {}
+        self._fired: set = set()
+        self._loaded_until: Optional[datetime] = None
+        self._cursors: dict[str, tuple[int, int]] = {}
+
+    def start(self) -> None:
+        """Remember the change feed heads, then load the first window."""
+        self._cursors = {
+            alias: RideChange.objects.using(alias).settled().head()
+            for alias in ride_databases()
+        }
+        self._loaded_until = self.clock()
+        self.extend_window()
+
+    def extend_window(self) -> None:
+        """Load rides whose pickup entered the look-ahead window since the last load."""
+        until = self.clock() + self.lookahead
+        if until <= self._loaded_until:
+            return
+
+        for alias in ride_databases():
+            rides = Ride.objects.using(alias).upcoming(
+                start=self._loaded_until, end=until
+            )
+            for ride in rides.values(*UPCOMING_FIELDS).iterator():
+                self.schedule(ride)
+        self._loaded_until = until
+
+    def sync(self) -> int:
+        """Apply rides created, updated, transitioned or deleted since the last sync."""
+        synced = 0
+        for alias in ride_databases():
+            changes = list(
+                RideChange.objects.using(alias)
+                .settled()
+                .after(self._cursors.get(alias, (0, 0)))
+                .values_list("txid", "seq", "ride_id", "kind")[:1000]
+            )
+            if not changes:
+                continue
+
+            self._cursors[alias] = changes[-1][:2]
+            ride_ids = {
+                ride_id for _, _, ride_id, kind in changes if kind != RideChange.PRUNED
+            }
+            current = {
+                ride["id"]: ride
+                for ride in Ride.objects.using(alias)
+                .filter(pk__in=ride_ids)
+                .values(*UPCOMING_FIELDS)
+            }
+            for ride_id in ride_ids:
+                ride = current.get(ride_id)
+                if ride and self._in_window(ride):
+                    self.schedule(ride)
+                else:
+                    self._rides.pop(ride_id, None)
+            synced += len(changes)
+        return synced
+
+    def schedule(self, ride: dict) -> None:
+        self._rides[ride["id"]] = ride
+        for job in self.jobs.values():
+            due = ride["pickup_time"] - job.lead
+            heapq.heappush(
+                self._heap, (due, next(self._counter), ride["id"], job.name, ride)
+            )
+
+    def run_due(self) -> int:
+        """Fire every job that is due, returns the number of callbacks run."""
+        current = self.clock()
+        fired = 0
+        while self._heap and self._heap[0][0] <= current:
+            _, _, ride_id, job_name, ride = heapq.heappop(self._heap)
+
+            # stale entry: the ride changed, left the window or was deleted
+            if self._rides.get(ride_id) is not ride:
+                continue
+            if ride["pickup_time"] < current:
+                continue
+
+            key = (ride_id, job_name, ride["pickup_time"])
+            if key in self._fired:
+                continue
+            self._fired.add(key)
+
+            try:
+                self.jobs[job_name].callback(ride)
+                fired += 1
+            except Exception:
+                logger.exception("Pickup job %s failed for ride %s.", job_name, ride_id)
+
+        self._forget_past(current)
+        return fired
+
+    def next_due(self) -> Optional[datetime]:
+        return self._heap[0][0] if self._heap else None
+
+    def run_forever(
+        self, poll_interval: float = 1.0, stop: Optional[threading.Event] = None
+    ):
+        stop = stop or threading.Event()
+        self.start()
+        while not stop.is_set():
+            self.sync()
+            self.extend_window()
+            self.run_due()
+
+            wait = poll_interval
+            next_due = self.next_due()
+            if next_due is not None:
+                wait = max(0.0, min(wait, (next_due - self.clock()).total_seconds()))
+            stop.wait(wait)
+
+    def _in_window(self, ride: dict) -> bool:
+        return (
+            ride["status"] in Ride.UPCOMING_STATUSES
+            and ride["pickup_time"] <= self._loaded_until
+        )
+
+    def _forget_past(self, current: datetime) -> None:
+        """Drop rides whose pickup passed so memory only holds the window."""
+        for ride_id in [
+            k for k, ride in self._rides.items() if ride["pickup_time"] < current
+        ]:
+            del self._rides[ride_id]
+        self._fired = {key for key in self._fired if key[2] >= current}
+
+
+def send_pickup_reminder(ride: dict) -> None:
+    """Push a `reminder` message to the ride's streaming clients."""
+    get_broker().publish(
+        ride_topics(ride["id"], ride["driver_id"]),
+        {
+            "type": "reminder",
+            "ride": ride["id"],
+            "rider": ride["rider_id"],
+            "driver": ride["driver_id"],
+            "status": ride["status"],
+            "pickup_time": ride["pickup_time"].isoformat(),
+        },
+    )
+
+
+def configured_jobs() -> list[Job]:
+    """Jobs from `settings.PICKUP_SCHEDULER_JOBS`, `{callback path: lead seconds}`."""
+    return [
+        Job(name=path, lead=timedelta(seconds=lead), callback=import_string(path))
+        for path, lead in settings.PICKUP_SCHEDULER_JOBS.items()
+    ]
@@ -0,0 +1,25 @@
+from rest_framework import serializers
+
+from app_ride.models import DriverLocation
+
+
+class DriverLocationSerializer(serializers.ModelSerializer):
+    """Driver location serializer, the driver's row is created on first report."""
+
+    class Meta:
+        model = DriverLocation
+        fields = ["driver", "latitude", "longitude", "is_available", "updated_at"]
+        read_only_fields = ["updated_at"]
+        # one row per driver, upserted in create()
+        extra_kwargs = {"driver": {"validators": []}}
+
+    def validate_driver(self, driver):
+        if driver.role == "admin":
+            raise serializers.ValidationError("Admin users cannot be drivers.")
+        return driver
+
+    def create(self, validated_data):
+        location, _ = DriverLocation.objects.update_or_create(
+            driver=validated_data.pop("driver"), defaults=validated_data
+        )
+        return location
@@ -0,0 +1,23 @@
+from rest_framework import serializers
+
+from app_ride.models import DriverDailyStats, DriverMonthlyStats
+from app_user.serializer import UserDefaultSerializer
+
+
+class DriverMonthlyStatsSerializer(serializers.ModelSerializer):
+    """Driver monthly rollup serializer."""
+
+    driver = UserDefaultSerializer()
+    avg_trip_seconds = serializers.FloatField(read_only=True)
+    avg_pickup_wait_seconds = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = DriverMonthlyStats
+        exclude = ["id"]
+
+
+class DriverDailyStatsSerializer(DriverMonthlyStatsSerializer):
+    """Driver daily rollup serializer."""
+
+    class Meta(DriverMonthlyStatsSerializer.Meta):
+        model = DriverDailyStats
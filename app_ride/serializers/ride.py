@@ -1,15 +1,20 @@
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
 
-from app_ride.models import Ride, RideEvent
+from app_ride.models import ArchivedRide, Ride, RideEvent
+from app_ride.outbox import enqueue_side_effects
 from app_ride.serializers.ride_event import RideEventDefaultSerializer
+from app_ride.streams import publish_ride_change
 from app_user.serializer import UserDefaultSerializer
+from utils.mixins.timed_serializer_mixin import TimedSerializerMixin
 
 
-class RideDefaultSerializer(serializers.ModelSerializer):
+class RideDefaultSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Ride default serializer."""
 
     rider = UserDefaultSerializer()
-    driver = UserDefaultSerializer()
+    driver = UserDefaultSerializer(allow_null=True)
 
     # this will show if .with_distance() from RideManager is used.
     distance = serializers.FloatField(read_only=True)
@@ -23,6 +28,13 @@ class RideDefaultSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class ArchivedRideSerializer(RideDefaultSerializer):
+    """Archived ride serializer, the Ride fields plus `archived_at`."""
+
+    class Meta(RideDefaultSerializer.Meta):
+        model = ArchivedRide
+
+
 class RideCreateSerializer(serializers.ModelSerializer):
     """Ride create serializer."""
 
@@ -30,13 +42,47 @@ class RideCreateSerializer(serializers.ModelSerializer):
         model = Ride
         exclude = ["status"]
 
+    def validate_region(self, value):
+        if value and value not in settings.RIDE_REGIONS:
+            raise serializers.ValidationError(
+                f"Unknown region, expected one of {', '.join(settings.RIDE_REGIONS)}."
+            )
+        return value
+
+
+def lock_ride(ride):
+    """
+    The ride re-read with its row locked until the transaction ends.
+
+    Concurrent writes to the same ride wait for each other and see each other's
+    changes, so the counter diffs of `app_ride.signals` start from the stored
+    state rather than from what the request read before.
+    """
+    return Ride.objects.using(ride._state.db).select_for_update().get(pk=ride.pk)
+
 
 class RideUpdateSerializer(serializers.ModelSerializer):
     """Ride update serializer. Updates basic Ride detail."""
 
     class Meta:
         model = Ride
-        exclude = ["rider", "status"]
+        # the region is fixed once the ride is stored in its database
+        exclude = ["rider", "status", "region"]
+
+    def validate_driver(self, value):
+        # a ride on its way or underway cannot go back to waiting for dispatch
+        if value is None and self.instance and self.instance.status != "pending":
+            raise serializers.ValidationError(
+                f"Cannot remove the driver of a {self.instance.status} ride."
+            )
+        return value
+
+    def update(self, instance, validated_data):
+        with transaction.atomic(using=instance._state.db):
+            self.instance = instance = lock_ride(instance)
+            if "driver" in validated_data:
+                self.validate_driver(validated_data["driver"])
+            return super().update(instance, validated_data)
 
 
 class RideStatusUpdateSerializer(serializers.ModelSerializer):
@@ -47,28 +93,49 @@ class RideStatusUpdateSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         new_status = self.context.get("status")
+        self.check_transition(self.instance, new_status)
+
+        # store internally for update()
+        attrs["_status"] = new_status
+        return attrs
 
-        # Defines valid status progression from pending -> en-route -> pickup -> dropoff.
-        progression = ["pending", "en-route", "pickup", "dropoff"]
-        current_index = progression.index(self.instance.status)
+    def check_transition(self, ride, new_status):
+        progression = Ride.STATUS_PROGRESSION
+        current_index = progression.index(ride.status)
         new_index = progression.index(new_status)
 
         if new_index != current_index + 1:
             raise serializers.ValidationError(
-                f"Cannot set status from {self.instance.status} to {new_status}."
+                f"Cannot set status from {ride.status} to {new_status}."
             )
 
-        # store internally for update()
-        attrs["_status"] = new_status
-        return attrs
+        if ride.driver_id is None:
+            raise serializers.ValidationError("Ride has no driver assigned yet.")
 
     def update(self, instance, validated_data):
         new_status = validated_data.pop("_status")
-        instance.status = new_status
-        instance.save()
-
-        # create RideEvent
-        RideEvent.objects.create(
-            ride=instance, description=f"Status changed to {new_status}."
-        )
-        return instance
+        # the ride's own database, see app_ride.sharding
+        with transaction.atomic(using=instance._state.db):
+            # a concurrent transition of the same ride waits for the lock, then
+            # fails the check against the status this one stored
+            instance = lock_ride(instance)
+            self.check_transition(instance, new_status)
+
+            old_status = instance.status
+            instance.status = new_status
+            instance.save()
+
+            # create RideEvent
+            event = instance.ride_events.create(
+                event_type=RideEvent.STATUS_CHANGE,
+                from_status=old_status,
+                to_status=new_status,
+                description=f"Status changed to {new_status}.",
+            )
+
+            # driver trip rollups and other side effects run in the outbox worker
+            enqueue_side_effects(instance, event)
+
+            # notify streaming clients once committed
+            publish_ride_change(instance, event)
+            return instance
@@ -0,0 +1,43 @@
+from django.conf import settings
+from rest_framework import serializers
+
+from app_ride.models import RideTrail
+
+
+class RideTrailSerializer(serializers.ModelSerializer):
+    """Trail totals, the points are added by the view."""
+
+    class Meta:
+        model = RideTrail
+        fields = [
+            "ride_id",
+            "point_count",
+            "distance_km",
+            "last_latitude",
+            "last_longitude",
+            "last_time",
+        ]
+
+
+class RideTrailAppendSerializer(serializers.Serializer):
+    """A batch of `[latitude, longitude, unix seconds]` points."""
+
+    points = serializers.ListField(
+        child=serializers.ListField(
+            child=serializers.FloatField(), min_length=3, max_length=3
+        ),
+        allow_empty=False,
+        max_length=settings.TRAIL_MAX_BATCH_POINTS,
+    )
+
+    def validate_points(self, points):
+        for latitude, longitude, timestamp in points:
+            if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+                raise serializers.ValidationError(
+                    f"[{latitude}, {longitude}] is not a valid coordinate."
+                )
+            if timestamp <= 0:
+                raise serializers.ValidationError(
+                    f"{timestamp} is not a unix timestamp."
+                )
+        return points
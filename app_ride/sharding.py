@@ -0,0 +1,215 @@
+"""
+Region sharding of rides across several databases.
+
+Every ride belongs to a region, given explicitly or taken from the first
+`RIDE_REGIONS` bounding box containing its pickup point, and is stored in that
+region's database with its events, archive rows, dashboard counters, change
+feed, GPS trail, outbox and zone memberships, so the signals still write those
+in the ride's own transaction. Rides outside every region are stored in
+`default`. Each database of `RIDE_SHARDS` allocates ride and event ids from its
+own range of `RIDE_SHARD_ID_SPAN` ids, so the database holding a ride is known
+from its id alone.
+
+All databases share the full schema and users are replicated from `default` to
+the other ones, so foreign keys and joins on riders and drivers keep working.
+Prepare new databases with `python manage.py setup_ride_shards`.
+"""
+
+from __future__ import annotations
+
+import functools
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Stored in the ride's database, everything else lives in `default`.
+SHARDED_MODELS = {
+    "app_ride.ride",
+    "app_ride.rideevent",
+    "app_ride.archivedride",
+    "app_ride.archivedrideevent",
+    "app_ride.ridechange",
+    "app_ride.ridecounter",
+    "app_ride.rideoutbox",
+    "app_ride.ridetrail",
+    "app_ride.ridetrailsegment",
+    "app_ride.ridezone",
+    "app_ride.importprogress",
+}
+
+
+def ride_databases() -> list[str]:
+    """Aliases of the databases holding rides, by shard number."""
+    return sorted(settings.RIDE_SHARDS, key=settings.RIDE_SHARDS.get)
+
+
+def is_sharded() -> bool:
+    return ride_databases() != [DEFAULT_DB_ALIAS]
+
+
+def region_for_point(lat: float, lng: float) -> str:
+    """The first region whose bounds contain the point, "" outside every region."""
+    for region, config in settings.RIDE_REGIONS.items():
+        south, west, north, east = config["bounds"]
+        if south <= lat <= north and west <= lng <= east:
+            return region
+    return ""
+
+
+def database_for_region(region: str) -> str:
+    config = settings.RIDE_REGIONS.get(region)
+    return config["database"] if config else DEFAULT_DB_ALIAS
+
+
+def database_for_id(pk) -> str:
+    """The database whose id range holds a ride or ride event id."""
+    try:
+        number = int(pk) // settings.RIDE_SHARD_ID_SPAN
+    except (TypeError, ValueError):
+        return DEFAULT_DB_ALIAS
+    for alias, shard in settings.RIDE_SHARDS.items():
+        if shard == number:
+            return alias
+    return DEFAULT_DB_ALIAS
+
+
+def first_id(alias: str) -> int:
+    """Start of the database's id range."""
+    return max(settings.RIDE_SHARDS[alias] * settings.RIDE_SHARD_ID_SPAN, 1)
+
+
+def database_for_instance(instance) -> str:
+    label = instance._meta.label_lower
+    # assigning a rider or driver to a new ride sets its database to the user's
+    if instance._state.db and not (label == "app_ride.ride" and instance._state.adding):
+        return instance._state.db
+
+    if label in ("app_ride.ride", "app_ride.archivedride") and instance.pk is not None:
+        return database_for_id(instance.pk)
+    if label == "app_ride.ride":
+        region = instance.region or region_for_point(
+            instance.pickup_latitude, instance.pickup_longitude
+        )
+        return database_for_region(region)
+    if hasattr(instance, "ride_id"):
+        return database_for_id(instance.ride_id)
+    return DEFAULT_DB_ALIAS
+
+
+class RideShardRouter:
+    """
+    Routes rides and their related tables to the ride's database.
+
+    Without an instance to route on (e.g. `Ride.objects.filter(...)`) reads and
+    writes go to `default`: code working on every ride loops over
+    `ride_databases()` with `.using(alias)`.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.label_lower not in SHARDED_MODELS:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get("instance")
+        return database_for_instance(instance) if instance is not None else None
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        sharded = [
+            obj for obj in (obj1, obj2) if obj._meta.label_lower in SHARDED_MODELS
+        ]
+        if len(sharded) == 2:
+            return database_for_instance(obj1) == database_for_instance(obj2)
+        # users are replicated to every ride database
+        return True if sharded else None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # every database has the full schema
+        return None
+
+
+def replicate_user(user) -> None:
+    """Copy a user saved in `default` to the other ride databases."""
+    fields = {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields
+        if not field.primary_key
+    }
+    for alias in ride_databases():
+        if alias != DEFAULT_DB_ALIAS:
+            type(user)._base_manager.using(alias).update_or_create(
+                pk=user.pk, defaults=fields
+            )
+
+
+def delete_user_replicas(user) -> None:
+    """Delete a user's replicas, with their rides on those databases."""
+    for alias in ride_databases():
+        if alias != DEFAULT_DB_ALIAS:
+            type(user)._base_manager.using(alias).filter(pk=user.pk).delete()
+
+
+@functools.total_ordering
+class Descending:
+    __slots__ = ["value"]
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+class ShardedRides:
+    """
+    Rides of several databases as one ordered, sliceable sequence for pagination.
+
+    `parts` are `CombinedRides`, one per database. Each database returns the
+    keys of its first rows up to the end of the requested page, the keys are
+    merged in the requested order and only the rows of the page are loaded.
+    """
+
+    def __init__(self, parts):
+        self.parts = parts
+        key_fields = parts[0].key_fields
+        self.order = [
+            (key_fields.index(field.lstrip("-")), field.startswith("-"))
+            for field in parts[0].ordering
+        ]
+
+    def sort_key(self, row):
+        return tuple(
+            Descending(row[index]) if descending else row[index]
+            for index, descending in self.order
+        )
+
+    def count(self):
+        return sum(part.count() for part in self.parts)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index : index + 1][0]
+
+        start, stop = index.start or 0, index.stop
+        merged = heapq.merge(
+            *(
+                [(row, number) for row in part.rows(slice(0, stop))]
+                for number, part in enumerate(self.parts)
+            ),
+            key=lambda item: self.sort_key(item[0]),
+        )
+        page = list(islice(merged, start, stop))
+
+        loaded = {}
+        for number, part in enumerate(self.parts):
+            rows = [row for row, part_number in page if part_number == number]
+            if rows:
+                loaded[number] = iter(part.load(rows))
+        return [next(loaded[number]) for _, number in page]
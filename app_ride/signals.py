@@ -0,0 +1,159 @@
+"""
+Side effects of Ride and RideEvent writes that must stay in the same
+transaction as the write itself: dashboard counters, the change feed and zone
+memberships. They are written to the ride's own database (see
+app_ride.sharding), which users are replicated to. Saving or deleting a
+ServiceZone drops the zone cache and rebuilds or removes its memberships once
+committed.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app_ride.models import (
+    Ride,
+    RideChange,
+    RideCounter,
+    RideEvent,
+    RideTrail,
+    RideTrailSegment,
+    RideZone,
+    ServiceZone,
+)
+from app_ride.models.ride_counter import ride_counter_deltas
+from app_ride.sharding import (
+    delete_user_replicas,
+    is_sharded,
+    replicate_user,
+    ride_databases,
+)
+from app_ride.streams import publish_ride_change
+from app_ride.zones import clear_zones, retag_zone, tag_rides, untag_zone
+
+_archiving = ContextVar("archiving", default=False)
+
+
+@contextmanager
+def archiving_rides():
+    """
+    Ride deletes within the block move rides to the archive (see
+    app_ride.archive): an archived ride is not a deleted one, its counters stay,
+    no change feed tombstone is written and its trail is kept.
+    """
+    token = _archiving.set(True)
+    try:
+        yield
+    finally:
+        _archiving.reset(token)
+
+
+def counter_slot(ride):
+    """Every write of a ride adds to the same counter slot, rides spread over all."""
+    return ride.pk % settings.RIDE_COUNTER_SLOTS
+
+
+@receiver(post_save, sender=Ride)
+def record_ride_save(sender, instance, created, **kwargs):
+    using = kwargs.get("using")
+    after = instance.counter_state
+
+    if created:
+        before = None
+    elif hasattr(instance, "_loaded_state"):
+        before = instance._loaded_state
+    else:
+        # Previous state unknown (instance not loaded from the database),
+        # leave it to `reconcile_ride_counters` rather than double count.
+        before = after
+
+    if before != after:
+        RideCounter.objects.db_manager(using).apply(
+            ride_counter_deltas(before, after), slot=counter_slot(instance)
+        )
+
+    if created:
+        kind = RideChange.CREATED
+    elif before[0] != after[0]:
+        kind = RideChange.TRANSITIONED
+    else:
+        kind = RideChange.UPDATED
+    RideChange.objects.record(instance.pk, kind, using=using)
+
+    if created or getattr(instance, "_loaded_pickup", None) != instance.pickup_point:
+        tag_rides(
+            [instance.pk],
+            [instance.pickup_latitude],
+            [instance.pickup_longitude],
+            using=using,
+        )
+
+    instance._loaded_state = after
+    instance._loaded_pickup = instance.pickup_point
+
+
+@receiver(post_delete, sender=Ride)
+def record_ride_delete(sender, instance, **kwargs):
+    if _archiving.get():
+        return
+    using = kwargs.get("using")
+    before = getattr(instance, "_loaded_state", instance.counter_state)
+    RideCounter.objects.db_manager(using).apply(
+        ride_counter_deltas(before, None), slot=counter_slot(instance)
+    )
+    RideChange.objects.record(instance.pk, RideChange.DELETED, using=using)
+    # trails and zone rows are not foreign keys to the ride (they outlive archiving)
+    RideTrailSegment.objects.using(using).filter(ride_id=instance.pk).delete()
+    RideTrail.objects.using(using).filter(ride_id=instance.pk).delete()
+    RideZone.objects.using(using).filter(ride_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=RideEvent)
+def record_ride_event(sender, instance, created, raw=False, **kwargs):
+    if not created:
+        return
+
+    RideChange.objects.record(
+        instance.ride_id, RideChange.EVENT, using=kwargs.get("using")
+    )
+
+    # status changes are published by RideStatusUpdateSerializer with the new status
+    if not raw and instance.event_type != RideEvent.STATUS_CHANGE:
+        publish_ride_change(instance.ride, instance, type="event")
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def replicate_saved_user(sender, instance, using=None, **kwargs):
+    if using == DEFAULT_DB_ALIAS and is_sharded():
+        replicate_user(instance)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def delete_replicated_user(sender, instance, using=None, **kwargs):
+    if using == DEFAULT_DB_ALIAS and is_sharded():
+        delete_user_replicas(instance)
+
+
+@receiver(post_save, sender=ServiceZone)
+def retag_service_zone(sender, instance, using=None, raw=False, **kwargs):
+    transaction.on_commit(clear_zones, using=using)
+    if not raw:
+        # rides created before the zone or its last edit match it right away
+        transaction.on_commit(lambda: retag_zone(instance), using=using)
+
+
+@receiver(post_delete, sender=ServiceZone)
+def untag_service_zone(sender, instance, using=None, **kwargs):
+    # the instance's pk is cleared once the delete returns
+    zone_id = instance.pk
+
+    def untag():
+        clear_zones()
+        for alias in ride_databases():
+            untag_zone(zone_id, alias)
+
+    transaction.on_commit(untag, using=using)
@@ -0,0 +1,99 @@
+"""
+Push ride status changes and new RideEvents to streaming clients.
+
+Writers publish through `utils.pubsub` once their transaction commits; the
+`RideView.stream` action turns a subscription into a Server-Sent Events stream.
+"""
+
+import time
+
+import orjson
+from django.db import transaction
+
+from app_ride.serializers.ride_event import RideEventDefaultSerializer
+from app_ride.sharding import database_for_instance
+from utils.pubsub import get_broker
+
+
+def ride_topic(ride_id):
+    return f"ride:{ride_id}"
+
+
+def driver_topic(driver_id):
+    return f"driver:{driver_id}"
+
+
+def ride_topics(ride_id, driver_id):
+    """Topics a ride's messages go to, unassigned rides have no driver topic."""
+    topics = [ride_topic(ride_id)]
+    if driver_id is not None:
+        topics.append(driver_topic(driver_id))
+    return topics
+
+
+def ride_message(ride, event=None, type="status"):
+    return {
+        "type": type,
+        "ride": ride.pk,
+        "rider": ride.rider_id,
+        "driver": ride.driver_id,
+        "status": ride.status,
+        "event": RideEventDefaultSerializer(event).data if event else None,
+    }
+
+
+def publish_ride_change(ride, event=None, type="status"):
+    """Publish the ride's change to its ride and driver topics after commit."""
+    topics = ride_topics(ride.pk, ride.driver_id)
+    message = ride_message(ride, event, type)
+    # robust: a broker failure must not fail a write that already committed
+    transaction.on_commit(
+        lambda: get_broker().publish(topics, message),
+        using=database_for_instance(ride),
+        robust=True,
+    )
+
+
+def format_sse(message):
+    return (
+        b"event: "
+        + message["type"].encode()
+        + b"\ndata: "
+        + orjson.dumps(message)
+        + b"\n\n"
+    )
+
+
+def event_stream(subscription, initial=(), heartbeat=15, max_duration=300):
+    """
+    Yield SSE frames for `subscription` until `max_duration` seconds passed.
+
+    Comments are sent as heartbeats so proxies keep the connection open, and the
+    `retry` hint makes clients reconnect shortly after the stream ends.
+    """
+    try:
+        yield b"retry: 3000\n\n"
+        for message in initial:
+            yield format_sse(message)
+
+        deadline = time.monotonic() + max_duration
+        while (remaining := deadline - time.monotonic()) > 0:
+            message = subscription.get(timeout=min(heartbeat, remaining))
+            yield format_sse(message) if message else b": keep-alive\n\n"
+    finally:
+        subscription.close()
+
+
+def poll(subscription, timeout):
+    """Long-poll: wait up to `timeout` seconds for a message, then drain the queue."""
+    try:
+        message = subscription.get(timeout=timeout)
+        if message is None:
+            return []
+
+        messages = [message]
+        while (message := subscription.get(timeout=0)) is not None:
+            messages.append(message)
+        return messages
+    finally:
+        subscription.close()
@@ -0,0 +1,64 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from app_ride.admin.search import search_by_id_or_user
+from app_ride.models import Ride, RideEvent
+from app_user.models import User
+from utils.paginators import EstimatedCountPaginator
+
+from .utils import make_ride, make_user
+
+
+class AdminSearchTests(TestCase):
+    def setUp(self):
+        self.alice = make_user("alice@example.com")
+        self.bob = make_user("bob@example.com")
+        self.first = make_ride(self.alice, self.bob)
+        self.second = make_ride(self.bob)
+
+    def search(self, term):
+        return set(search_by_id_or_user(Ride.objects.all(), term, ["rider", "driver"]))
+
+    def test_digits_match_the_id_only(self):
+        self.assertEqual(self.search(f" {self.second.pk} "), {self.second})
+
+    def test_email_prefix_matches_rider_or_driver(self):
+        self.assertEqual(self.search("BOB@"), {self.first, self.second})
+        self.assertEqual(self.search("alice"), {self.first})
+        self.assertEqual(self.search("example.com"), set())
+
+    def test_blank_term_keeps_the_queryset(self):
+        self.assertEqual(self.search("  "), {self.first, self.second})
+
+
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        self.superuser = User.objects.create_superuser("root@example.com", "password")
+        self.client.force_login(self.superuser)
+        rider = make_user("rider@example.com")
+        for _ in range(3):
+            ride = make_ride(rider, make_user(f"driver{_}@example.com"))
+            RideEvent.objects.create(ride=ride, description="Created")
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelists_do_not_query_per_row(self):
+        urls = ["/admin/app_ride/ride/", "/admin/app_ride/rideevent/"]
+        before = [self.changelist_queries(url) for url in urls]
+        ride = make_ride(make_user("late@example.com"), self.superuser)
+        RideEvent.objects.create(ride=ride, description="Created")
+        self.assertEqual([self.changelist_queries(url) for url in urls], before)
+
+    def test_search(self):
+        response = self.client.get("/admin/app_ride/ride/", {"q": "driver1@"})
+        self.assertEqual(len(response.context["cl"].result_list), 1)
+
+    def test_paginator_counts_exactly_off_postgresql(self):
+        paginator = EstimatedCountPaginator(Ride.objects.all(), 2)
+        self.assertEqual(paginator.count, 3)
+        self.assertEqual(paginator.num_pages, 2)
@@ -0,0 +1,91 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils.timezone import now, timedelta
+
+from app_ride.archive import archive_batch
+from app_ride.models import (
+    ArchivedRide,
+    ArchivedRideEvent,
+    Ride,
+    RideChange,
+    RideCounter,
+    RideEvent,
+    RideTrail,
+)
+
+from .utils import RideAPITestCase, make_ride
+
+
+class ArchiveTests(RideAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.old = make_ride(self.rider, self.driver)
+        self.transition(self.old, "en-route", "pickup", "dropoff")
+        Ride.objects.filter(pk=self.old.pk).update(
+            pickup_time=now() - timedelta(days=120)
+        )
+        RideTrail.objects.create(ride_id=self.old.pk)
+        # recent or unfinished rides stay
+        self.recent = make_ride(self.rider, self.driver)
+        self.transition(self.recent, "en-route", "pickup", "dropoff")
+        self.pending = make_ride(self.rider, pickup_time=now() - timedelta(days=120))
+
+    def test_moves_old_completed_rides_and_their_events(self):
+        counters = list(RideCounter.objects.values_list("scope", "key", "value"))
+        changes = RideChange.objects.count()
+
+        self.assertEqual(archive_batch(now() - timedelta(days=90)), 1)
+
+        self.assertFalse(Ride.objects.filter(pk=self.old.pk).exists())
+        self.assertFalse(RideEvent.objects.filter(ride_id=self.old.pk).exists())
+        archived = ArchivedRide.objects.get(pk=self.old.pk)
+        self.assertEqual(archived.status, "dropoff")
+        self.assertEqual(
+            ArchivedRideEvent.objects.filter(ride_id=self.old.pk).count(), 3
+        )
+        self.assertEqual(
+            set(Ride.objects.values_list("pk", flat=True)),
+            {self.recent.pk, self.pending.pk},
+        )
+
+        # archiving is not deleting: counters, feed and trail are untouched
+        self.assertEqual(
+            list(RideCounter.objects.values_list("scope", "key", "value")), counters
+        )
+        self.assertEqual(RideChange.objects.count(), changes)
+        self.assertTrue(RideTrail.objects.filter(ride_id=self.old.pk).exists())
+
+        self.assertEqual(archive_batch(now() - timedelta(days=90)), 0)
+
+    def test_deleting_a_ride_still_records_it(self):
+        archive_batch(now() - timedelta(days=90))
+        Ride.objects.get(pk=self.recent.pk).delete()
+        self.assertEqual(
+            RideChange.objects.filter(ride_id=self.recent.pk).last().kind,
+            RideChange.DELETED,
+        )
+
+    def test_archived_rides_are_listed_on_request(self):
+        call_command("archive_rides", pause=0, stdout=StringIO())
+
+        ids = [
+            ride["id"] for ride in self.client.get("/ride/").json()["data"]["results"]
+        ]
+        self.assertNotIn(self.old.pk, ids)
+        response = self.client.get("/ride/", {"include_archived": "true"})
+        rides = {ride["id"]: ride for ride in response.json()["data"]["results"]}
+        self.assertEqual(set(rides), {self.old.pk, self.recent.pk, self.pending.pk})
+        self.assertIsNotNone(rides[self.old.pk]["archived_at"])
+
+        self.assertEqual(self.client.get(f"/ride/{self.old.pk}/").status_code, 400)
+        response = self.client.get(
+            f"/ride/{self.old.pk}/", {"include_archived": "true"}
+        )
+        self.assertEqual(response.json()["data"]["id"], self.old.pk)
+
+    def test_dry_run_only_counts(self):
+        out = StringIO()
+        call_command("archive_rides", dry_run=True, stdout=out)
+        self.assertIn("1 rides", out.getvalue())
+        self.assertTrue(Ride.objects.filter(pk=self.old.pk).exists())
@@ -0,0 +1,159 @@
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from app_ride.dispatch import (
+    dispatch_pending,
+    distance_matrix,
+    solve_greedy,
+    solve_optimal,
+)
+from app_ride.models import DriverLocation, RideChange, RideCounter
+
+from .utils import RideAPITestCase, make_ride, make_user
+
+# Davao City, one degree of latitude is ~111.2 km
+CENTER = (7.0731, 125.6128)
+
+
+def random_points(rng, count, spread=0.05):
+    return np.array(CENTER) + rng.uniform(-spread, spread, size=(count, 2))
+
+
+def greedy_reference(cost, max_distance):
+    """Every pair in distance order, taken when both sides are still free."""
+    rides, drivers, pairs = set(), set(), set()
+    for index in np.argsort(cost, axis=None, kind="stable"):
+        row, col = divmod(int(index), cost.shape[1])
+        if cost[row, col] > max_distance:
+            break
+        if row not in rides and col not in drivers:
+            rides.add(row)
+            drivers.add(col)
+            pairs.add((row, col))
+    return pairs
+
+
+class SolverTests(SimpleTestCase):
+    def test_distance_matrix(self):
+        cost = distance_matrix([CENTER], [CENTER, (CENTER[0] + 1, CENTER[1])])
+        np.testing.assert_allclose(cost, [[0, 111.19]], atol=0.01)
+
+    def test_optimal_minimizes_the_total_distance_within_range(self):
+        # the greedy pick of the closest pair (0, 0) forces a long second pickup
+        cost = np.array([[1.0, 2.0], [1.5, 9.0]])
+        rows, cols = solve_optimal(cost, max_distance=5)
+        self.assertEqual(sorted(zip(rows.tolist(), cols.tolist())), [(0, 1), (1, 0)])
+
+        rows, cols = solve_optimal(np.array([[6.0, 7.0], [1.0, 8.0]]), max_distance=5)
+        self.assertEqual(list(zip(rows.tolist(), cols.tolist())), [(1, 0)])
+
+    def test_greedy_assigns_close_pairs_until_nobody_is_left_in_range(self):
+        rng = np.random.default_rng(0)
+        for rides, drivers, spread in [(300, 200, 0.05), (200, 300, 0.2)]:
+            pickups = random_points(rng, rides, spread)
+            # drivers crowding around a few pickups make the candidates run out
+            crowd = drivers - drivers // 2
+            positions = np.concatenate(
+                [
+                    random_points(rng, drivers // 2, spread),
+                    pickups[rng.integers(3, size=crowd)]
+                    + rng.normal(0, 0.001, size=(crowd, 2)),
+                ]
+            )
+            rows, cols, distances = solve_greedy(pickups, positions, 5, k=4)
+
+            cost = distance_matrix(pickups, positions, dtype=np.float64)
+            np.testing.assert_allclose(distances, cost[rows, cols], atol=1e-5)
+            self.assertEqual(len(set(rows.tolist())), len(rows))
+            self.assertEqual(len(set(cols.tolist())), len(cols))
+            self.assertTrue((distances <= 5).all())
+            # no free ride and free driver left within range of each other
+            free = cost[np.setdiff1d(np.arange(rides), rows)][
+                :, np.setdiff1d(np.arange(drivers), cols)
+            ]
+            self.assertFalse((free <= 5).any())
+
+            # as good as sweeping every pair of the matrix
+            reference = greedy_reference(cost, 5)
+            reference_mean = np.mean([cost[row, col] for row, col in reference])
+            self.assertGreaterEqual(len(rows), len(reference) * 0.98)
+            self.assertLess(distances.mean(), reference_mean * 1.02)
+
+    def test_greedy_with_nobody_in_range(self):
+        far = (CENTER[0] + 1, CENTER[1])
+        rows, cols, distances = solve_greedy([CENTER], [far], 5)
+        self.assertEqual((rows.size, cols.size, distances.size), (0, 0, 0))
+
+
+class DispatchTests(RideAPITestCase):
+    def add_driver(self, email, latitude, longitude, **fields):
+        driver = make_user(email)
+        DriverLocation.objects.create(
+            driver=driver, latitude=latitude, longitude=longitude, **fields
+        )
+        return driver
+
+    def test_assigns_the_nearest_free_drivers(self):
+        near = self.add_driver("near@example.com", 7.071, 125.611)
+        far = self.add_driver("far@example.com", 7.2, 125.611)
+        self.add_driver("offline@example.com", 7.07, 125.61, is_available=False)
+        busy = self.add_driver("busy@example.com", 7.07, 125.61)
+        make_ride(self.rider, busy)
+        ride = make_ride(self.rider)
+
+        for optimal_max in [1000, 0]:  # both solvers
+            with self.subTest(optimal_max=optimal_max):
+                ride.driver = None
+                ride.save()
+                with override_settings(DISPATCH_OPTIMAL_MAX=optimal_max):
+                    result = dispatch_pending(max_distance=5)
+
+                ride.refresh_from_db()
+                self.assertEqual(ride.driver, near)
+                self.assertEqual((result.rides, result.drivers), (1, 2))
+                self.assertEqual(result.assigned, 1)
+                self.assertAlmostEqual(result.total_distance, 0.16, places=2)
+        self.assertNotEqual(ride.driver, far)
+
+        self.assertEqual(
+            RideCounter.objects.filter(
+                scope=RideCounter.ACTIVE_DRIVER, key=str(near.pk)
+            )
+            .totals()
+            .get()["total"],
+            1,
+        )
+        self.assertEqual(
+            RideChange.objects.filter(ride_id=ride.pk).last().kind,
+            RideChange.UPDATED,
+        )
+
+    def test_drivers_out_of_range_are_not_assigned(self):
+        self.add_driver("far@example.com", 7.2, 125.611)
+        ride = make_ride(self.rider)
+        self.assertEqual(dispatch_pending(max_distance=5).assigned, 0)
+        ride.refresh_from_db()
+        self.assertIsNone(ride.driver)
+
+
+class DriverUpdateTests(RideAPITestCase):
+    def test_driver_can_only_be_removed_while_pending(self):
+        ride = make_ride(self.rider, self.driver)
+        response = self.client.patch(
+            f"/ride/{ride.pk}/", {"driver": None}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        ride = make_ride(self.rider, self.driver)
+        self.transition(ride, "en-route")
+        response = self.client.patch(
+            f"/ride/{ride.pk}/", {"driver": None}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        ride.refresh_from_db()
+        self.assertEqual(ride.driver, self.driver)
+
+    def test_rides_without_a_driver_cannot_start(self):
+        ride = make_ride(self.rider)
+        response = self.client.post(f"/ride/{ride.pk}/set/en-route/")
+        self.assertEqual(response.status_code, 400)
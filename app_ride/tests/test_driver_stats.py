@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.utils.timezone import localdate
+
+from app_ride.models import DriverDailyStats, DriverMonthlyStats, RideEvent
+from app_ride.models.driver_stats import record_completed_ride, trip_metrics
+
+from .utils import RideAPITestCase, make_ride
+
+
+def at(hour, minute=0):
+    return datetime(2026, 3, 10, hour, minute, tzinfo=timezone.utc)
+
+
+class TripMetricsTests(SimpleTestCase):
+    def test_complete_trip(self):
+        self.assertEqual(
+            trip_metrics(at(9), at(9, 15), at(10, 30)),
+            {
+                "trips_completed": 1,
+                "timed_trips": 1,
+                "total_trip_seconds": 4500.0,
+                "trips_over_1h": 1,
+                "waited_trips": 1,
+                "total_pickup_wait_seconds": 900.0,
+            },
+        )
+
+    def test_missing_transitions_leave_their_metric_out(self):
+        self.assertEqual(trip_metrics(None, None, at(10)), {"trips_completed": 1})
+        self.assertNotIn("waited_trips", trip_metrics(None, at(9), at(10)))
+
+
+class DriverRollupTests(RideAPITestCase):
+    def completed_ride(self, start):
+        ride = make_ride(self.rider, self.driver, pickup_time=start, status="dropoff")
+        for from_status, to_status, minutes in [
+            ("pending", "en-route", 0),
+            ("en-route", "pickup", 10),
+            ("pickup", "dropoff", 40),
+        ]:
+            event = RideEvent.objects.create(
+                ride=ride,
+                event_type=RideEvent.STATUS_CHANGE,
+                from_status=from_status,
+                to_status=to_status,
+                description=f"Status changed to {to_status}.",
+            )
+            # created_at is auto_now_add, place the transitions in time
+            RideEvent.objects.filter(pk=event.pk).update(
+                created_at=start.replace(minute=minutes)
+            )
+        return ride
+
+    def test_completed_rides_are_added_to_both_rollups(self):
+        for hour in (8, 9):
+            record_completed_ride(self.completed_ride(at(hour)))
+
+        day = localdate(at(8))
+        daily = DriverDailyStats.objects.get(driver=self.driver, period=day)
+        monthly = DriverMonthlyStats.objects.get(
+            driver=self.driver, period=day.replace(day=1)
+        )
+        for stats in (daily, monthly):
+            self.assertEqual(stats.trips_completed, 2)
+            self.assertEqual(stats.avg_trip_seconds, 1800)
+            self.assertEqual(stats.avg_pickup_wait_seconds, 600)
+
+    def test_rebuild_matches_the_incremental_rollups(self):
+        for hour in (8, 9):
+            record_completed_ride(self.completed_ride(at(hour)))
+        incremental = list(DriverDailyStats.objects.values())
+
+        DriverDailyStats.objects.update(trips_completed=0)
+        call_command("rebuild_driver_stats", stdout=StringIO())
+
+        rebuilt = list(DriverDailyStats.objects.values())
+        for row in incremental + rebuilt:
+            del row["id"]
+        self.assertEqual(rebuilt, incremental)
+
+    def test_report_endpoint(self):
+        record_completed_ride(self.completed_ride(at(8)))
+
+        response = self.client.get("/report/driver-daily/", {"driver": self.driver.pk})
+
+        self.assertEqual(response.status_code, 200)
+        [row] = response.json()["data"]["results"]
+        self.assertEqual(row["trips_completed"], 1)
+        self.assertEqual(row["avg_trip_seconds"], 1800)
+
+    def test_report_is_admin_only(self):
+        self.client.force_authenticate(self.rider)
+        response = self.client.get("/report/driver-daily/")
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,117 @@
+import math
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.utils.timezone import now, timedelta
+
+from app_ride.heatmap import Heatmap, snap_window
+
+from .utils import RideAPITestCase, make_ride
+
+
+def cell_id(latitude, longitude, size):
+    return (
+        f"{math.floor((longitude + 180) / size)}:{math.floor((latitude + 90) / size)}"
+    )
+
+
+class GridTests(SimpleTestCase):
+    def heatmap(self, zoom):
+        start = datetime(2026, 10, 19, tzinfo=timezone.utc)
+        return Heatmap(zoom=zoom, point="pickup", start=start, end=start)
+
+    def test_tiles_covering_a_bounding_box(self):
+        self.assertEqual(self.heatmap(0).tiles(-90, -180, 90, 180), [(0, 0)])
+        self.assertEqual(self.heatmap(1).tiles(-90, -180, 90, 180), [(0, 0), (1, 0)])
+        # a point-sized box still covers its tile
+        self.assertEqual(len(self.heatmap(12).tiles(7.07, 125.61, 7.07, 125.61)), 1)
+        self.assertEqual(self.heatmap(4).cell_size, 22.5 / 16)
+
+    def test_too_many_tiles_are_rejected(self):
+        with self.assertRaisesMessage(ValueError, "zoom out or narrow bbox"):
+            self.heatmap(12).tiles(0, 0, 10, 10)
+
+    def test_window_is_widened_to_whole_steps(self):
+        start = datetime(2026, 10, 19, 8, 3, 20, tzinfo=timezone.utc)
+        end = datetime(2026, 10, 19, 9, 0, 1, tzinfo=timezone.utc)
+        self.assertEqual(
+            snap_window(start, end),
+            (start.replace(minute=0, second=0), end.replace(minute=5, second=0)),
+        )
+
+
+class HeatmapTests(RideAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.start = now() - timedelta(hours=1)
+        self.near = [
+            make_ride(self.rider, pickup_latitude=7.0701, pickup_longitude=125.6101),
+            make_ride(self.rider, pickup_latitude=7.0703, pickup_longitude=125.6103),
+        ]
+        self.far = make_ride(
+            self.rider, self.driver, pickup_latitude=7.3, pickup_longitude=125.9
+        )
+        self.transition(self.far, "en-route")
+        # outside the requested window
+        make_ride(
+            self.rider,
+            pickup_latitude=7.0701,
+            pickup_longitude=125.6101,
+            pickup_time=now() - timedelta(days=3),
+        )
+
+    def get(self, **params):
+        params = {
+            "zoom": 10,
+            "bbox": "7,125.5,7.4,126",
+            "start": self.start.isoformat(),
+            "end": (self.start + timedelta(hours=3)).isoformat(),
+            **params,
+        }
+        return self.client.get("/ride/heatmap/", params)
+
+    def test_counts_and_centroids_per_cell(self):
+        data = self.get().json()["data"]
+        size = data["cell_size"]
+        cells = {cell[0]: cell[1:] for cell in data["cells"]}
+        self.assertEqual(
+            cells,
+            {
+                cell_id(7.0701, 125.6101, size): [2, 7.0702, 125.6102],
+                cell_id(7.3, 125.9, size): [1, 7.3, 125.9],
+            },
+        )
+
+    def test_status_and_dropoff_points(self):
+        cells = self.get(status="en-route").json()["data"]["cells"]
+        self.assertEqual([cell[1] for cell in cells], [1])
+
+        # every ride drops off at make_ride's 7.19, 125.45, in another tile
+        cells = self.get(point="dropoff", bbox="7.3,125.9,7.31,125.91").json()
+        self.assertEqual(cells["data"]["cells"], [])
+        cells = self.get(point="dropoff", bbox="7,125.3,7.4,125.6").json()["data"]
+        self.assertEqual([cell[1] for cell in cells["cells"]], [3])
+
+    def test_tiles_are_cached(self):
+        self.get()
+        make_ride(self.rider, pickup_latitude=7.0701, pickup_longitude=125.6101)
+        # the new ride only shows up once the tiles expire
+        cells = self.get().json()["data"]["cells"]
+        self.assertEqual(sorted(cell[1] for cell in cells), [1, 2])
+        cache.clear()
+        cells = self.get().json()["data"]["cells"]
+        self.assertEqual(sorted(cell[1] for cell in cells), [1, 3])
+
+    def test_invalid_parameters(self):
+        for params in [
+            {"zoom": ""},
+            {"zoom": 99},
+            {"point": "midway"},
+            {"status": "lost"},
+            {"bbox": "1,2,3"},
+            {"start": "yesterday"},
+            {"zoom": 16, "bbox": "0,0,10,10"},
+        ]:
+            with self.subTest(params=params):
+                self.assertEqual(self.get(**params).status_code, 400)
@@ -0,0 +1,146 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+import orjson
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+
+from app_ride.importer import Checkpoint, RideEventImporter
+from app_ride.models import (
+    ImportProgress,
+    Ride,
+    RideChange,
+    RideEvent,
+    RideZone,
+    ServiceZone,
+)
+from app_ride.zones import clear_zones
+
+from .utils import RideAPITestCase, make_ride
+
+
+class ImportRidesTests(RideAPITestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "rides.ndjson")
+        with open(self.path, "wb") as file:
+            for hour in range(5):
+                file.write(
+                    orjson.dumps(
+                        {
+                            "rider": self.rider.pk,
+                            "pickup_latitude": 7.07,
+                            "pickup_longitude": 125.61,
+                            "dropoff_latitude": 7.19,
+                            "dropoff_longitude": 125.45,
+                            "pickup_time": f"2026-10-19T{hour:02d}:00:00+00:00",
+                        }
+                    )
+                    + b"\n"
+                )
+
+    def run_import(self, **options):
+        out = StringIO()
+        call_command(
+            "import_rides",
+            rides=self.path,
+            batch_size=2,
+            no_rebuild=True,
+            stdout=out,
+            stderr=StringIO(),
+            **options,
+        )
+        return out.getvalue()
+
+    def test_imports_every_record(self):
+        self.run_import()
+        self.assertEqual(Ride.objects.count(), 5)
+        # progress is only kept while the file is being imported
+        self.assertFalse(ImportProgress.objects.exists())
+
+    def test_imported_rides_are_in_the_change_feed(self):
+        self.run_import()
+        self.assertEqual(
+            sorted(RideChange.objects.values_list("ride_id", "kind")),
+            sorted(
+                (pk, RideChange.CREATED)
+                for pk in Ride.objects.values_list("pk", flat=True)
+            ),
+        )
+
+        ride = Ride.objects.first()
+        events = os.path.join(os.path.dirname(self.path), "events.ndjson")
+        with open(events, "wb") as file:
+            for _ in range(2):
+                file.write(orjson.dumps({"ride": ride.pk, "description": "Note."}))
+                file.write(b"\n")
+        call_command("import_rides", events=events, no_rebuild=True, stdout=StringIO())
+        self.assertEqual(
+            RideChange.objects.filter(ride_id=ride.pk, kind=RideChange.EVENT).count(),
+            1,
+        )
+
+    def test_imported_rides_are_tagged_with_their_zone(self):
+        polygon = [[7.0, 125.5], [7.2, 125.5], [7.2, 125.7], [7.0, 125.7]]
+        zone = ServiceZone.objects.create(
+            code="downtown", name="Downtown", polygon=polygon
+        )
+        clear_zones()
+        self.run_import()
+        self.assertEqual(
+            set(RideZone.objects.values_list("ride_id", "zone_id")),
+            {(pk, zone.pk) for pk in Ride.objects.values_list("pk", flat=True)},
+        )
+
+    def test_batch_committed_before_its_checkpoint_is_not_imported_again(self):
+        with mock.patch.object(Checkpoint, "save", side_effect=RuntimeError("killed")):
+            with self.assertRaises(RuntimeError):
+                self.run_import()
+        self.assertEqual(Ride.objects.count(), 2)
+        self.assertFalse(os.path.exists(f"{self.path}.checkpoint"))
+
+        # the skipped batch is not counted as imported by this run
+        self.assertIn("Imported 3 rides", self.run_import())
+        self.assertEqual(
+            sorted(Ride.objects.values_list("pickup_time__hour", flat=True)),
+            [0, 1, 2, 3, 4],
+        )
+
+    def test_restart_imports_the_file_again(self):
+        with mock.patch.object(Checkpoint, "save", side_effect=RuntimeError("killed")):
+            with self.assertRaises(RuntimeError):
+                self.run_import()
+        self.run_import(restart=True)
+        self.assertEqual(Ride.objects.count(), 7)
+
+    def test_invalid_record_stops_the_import(self):
+        with open(self.path, "ab") as file:
+            file.write(b'{"rider": 999999}\n')
+        with self.assertRaises(CommandError):
+            self.run_import()
+        self.assertEqual(Ride.objects.count(), 4)
+
+
+@override_settings(RIDE_SHARDS={"default": 0, "north": 1})
+class EventImporterTests(RideAPITestCase):
+    databases = {"default", "north"}
+
+    def test_event_ids_must_be_in_their_ride_database_range(self):
+        ride = make_ride(self.rider)
+        rows, errors = RideEventImporter().clean(
+            [
+                {"ride": ride.pk, "id": 5, "description": "Imported."},
+                {"ride": ride.pk, "id": 10**12 + 5, "description": "Imported."},
+            ]
+        )
+        self.assertEqual([row["id"] for row in rows], [5])
+        self.assertEqual(
+            errors,
+            [(1, f"id {10**12 + 5} is outside the id range of the default database.")],
+        )
+        self.assertFalse(RideEvent.objects.exists())
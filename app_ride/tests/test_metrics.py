@@ -0,0 +1,44 @@
+from utils import metrics
+
+from .utils import RideAPITestCase
+
+
+def sample(metric, **labels):
+    for family in metric.collect():
+        for item in family.samples:
+            if item.name.endswith(("_total", "_count")) and item.labels == labels:
+                return item.value
+    return 0
+
+
+class RequestMetricsTests(RideAPITestCase):
+    def test_responses_are_counted_per_action_and_status(self):
+        labels = {"view": "RideView", "action": "list", "method": "GET"}
+        before = sample(metrics.RESPONSES, **labels, status="200")
+        latency_before = sample(metrics.REQUEST_LATENCY, **labels)
+
+        self.client.get("/ride/")
+
+        self.assertEqual(sample(metrics.RESPONSES, **labels, status="200"), before + 1)
+        self.assertEqual(sample(metrics.REQUEST_LATENCY, **labels), latency_before + 1)
+
+    def test_client_errors_are_counted_with_their_status(self):
+        labels = {"view": "RideView", "action": "retrieve", "method": "GET"}
+        before = sample(metrics.RESPONSES, **labels, status="400")
+
+        self.client.get("/ride/999999/")
+
+        self.assertEqual(sample(metrics.RESPONSES, **labels, status="400"), before + 1)
+
+    def test_database_queries_are_tracked(self):
+        with metrics.track_request() as tracker:
+            self.assertEqual(self.client.get("/ride/").status_code, 200)
+        self.assertGreater(tracker.db_queries, 0)
+
+    def test_metrics_endpoint_exposes_the_prometheus_format(self):
+        self.client.get("/ride/")
+        response = self.client.get("/metrics/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"rider_request_latency_seconds_bucket", response.content)
+        self.assertIn(b"rider_responses_total", response.content)
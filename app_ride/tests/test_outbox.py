@@ -0,0 +1,172 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.utils.timezone import now, timedelta
+
+from app_ride.models import DriverDailyStats, RideOutbox
+from app_ride.outbox import OutboxWorker, retry_delay
+
+from .utils import RideAPITestCase, make_ride
+
+handled = []
+
+
+def remember(message):
+    handled.append(message.pk)
+
+
+def explode(message):
+    raise RuntimeError("handler failed")
+
+
+class Clock:
+    def __init__(self):
+        self.current = now()
+
+    def __call__(self):
+        return self.current
+
+    def advance(self, seconds):
+        self.current += timedelta(seconds=seconds)
+
+
+class RetryDelayTests(SimpleTestCase):
+    @override_settings(
+        RIDE_OUTBOX_RETRY_BASE_SECONDS=5, RIDE_OUTBOX_RETRY_MAX_SECONDS=60
+    )
+    def test_doubles_with_jitter_up_to_the_maximum(self):
+        for attempts, base in [(1, 5), (2, 10), (4, 40), (5, 60), (20, 60)]:
+            delay = retry_delay(attempts)
+            self.assertGreaterEqual(delay, base)
+            self.assertLessEqual(delay, base * 1.1)
+
+
+class OutboxTests(RideAPITestCase):
+    def setUp(self):
+        super().setUp()
+        handled.clear()
+        self.clock = Clock()
+        self.ride = make_ride(self.rider, self.driver)
+
+    def enqueue(self, handler="app_ride.tests.test_outbox.remember", count=1):
+        return [
+            RideOutbox.objects.create(
+                ride_id=self.ride.pk, handler=handler, available_at=self.clock()
+            )
+            for _ in range(count)
+        ]
+
+    def worker(self, batch_size=None):
+        return OutboxWorker(batch_size=batch_size, clock=self.clock)
+
+    def test_dropoff_enqueues_the_driver_rollups(self):
+        self.transition(self.ride, "en-route", "pickup")
+        self.assertFalse(RideOutbox.objects.exists())
+        self.transition(self.ride, "dropoff")
+        message = RideOutbox.objects.get()
+        self.assertEqual(message.handler, "app_ride.outbox.record_driver_stats")
+        self.assertEqual(message.payload["to_status"], "dropoff")
+        # the request does not update the rollups itself
+        self.assertFalse(DriverDailyStats.objects.exists())
+
+        call_command("run_ride_outbox", once=True, stdout=StringIO())
+        self.assertFalse(RideOutbox.objects.exists())
+        self.assertEqual(
+            DriverDailyStats.objects.get(driver=self.driver).trips_completed, 1
+        )
+
+    def test_driver_rollups_count_a_redelivered_ride_once(self):
+        self.transition(self.ride, "en-route", "pickup", "dropoff")
+        message = RideOutbox.objects.get()
+        # delivered again, e.g. its lease ran out after the rollups committed
+        RideOutbox.objects.create(
+            ride_id=message.ride_id, handler=message.handler, payload=message.payload
+        )
+        call_command("run_ride_outbox", once=True, stdout=StringIO())
+        self.assertFalse(RideOutbox.objects.exists())
+        self.assertEqual(
+            DriverDailyStats.objects.get(driver=self.driver).trips_completed, 1
+        )
+
+        # nor does a message still pending when the rollups are rebuilt
+        RideOutbox.objects.create(
+            ride_id=message.ride_id, handler=message.handler, payload=message.payload
+        )
+        call_command("rebuild_driver_stats", stdout=StringIO())
+        call_command("run_ride_outbox", once=True, stdout=StringIO())
+        self.assertFalse(RideOutbox.objects.exists())
+        self.assertEqual(
+            DriverDailyStats.objects.get(driver=self.driver).trips_completed, 1
+        )
+
+    def test_claimed_rows_are_leased(self):
+        first, second, third = self.enqueue(count=3)
+        worker = self.worker(batch_size=2)
+
+        claimed = worker.claim("default")
+        self.assertEqual([message.pk for message in claimed], [first.pk, second.pk])
+        self.assertEqual([message.attempts for message in claimed], [1, 1])
+        self.assertEqual(
+            [message.pk for message in worker.claim("default")], [third.pk]
+        )
+        self.assertEqual(worker.claim("default"), [])
+
+        # unhandled rows come back once their lease runs out
+        self.clock.advance(61)
+        claimed = worker.claim("default")
+        self.assertEqual([message.attempts for message in claimed], [2, 2])
+
+    def test_handled_rows_are_deleted(self):
+        self.enqueue(count=3)
+        self.assertEqual(self.worker().run_once(), 3)
+        self.assertEqual(len(handled), 3)
+        self.assertFalse(RideOutbox.objects.exists())
+        self.assertEqual(self.worker().run_once(), 0)
+
+    @override_settings(RIDE_OUTBOX_MAX_ATTEMPTS=2)
+    def test_failures_are_retried_then_marked_dead(self):
+        (message,) = self.enqueue("app_ride.tests.test_outbox.explode")
+        worker = self.worker()
+
+        with self.assertLogs("app_ride.outbox", "ERROR"):
+            worker.run_once()
+        message.refresh_from_db()
+        self.assertEqual(message.status, RideOutbox.PENDING)
+        self.assertEqual(message.last_error, "RuntimeError: handler failed")
+        self.assertGreaterEqual(
+            message.available_at, self.clock() + timedelta(seconds=5)
+        )
+        # not due before the backoff
+        self.assertEqual(worker.run_once(), 0)
+
+        self.clock.advance(6)
+        with self.assertLogs("app_ride.outbox", "ERROR"):
+            worker.run_once()
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), (RideOutbox.DEAD, 2))
+        self.clock.advance(3600)
+        self.assertEqual(worker.run_once(), 0)
+
+    def test_expired_lease_claimed_by_another_worker_is_skipped(self):
+        self.enqueue()
+        slow, other = self.worker(), self.worker()
+        (message,) = slow.claim("default")
+
+        self.clock.advance(61)
+        (reclaimed,) = other.claim("default")
+        self.assertFalse(slow.handle(message))
+        self.assertEqual(handled, [])
+        self.assertTrue(other.handle(reclaimed))
+        self.assertEqual(handled, [message.pk])
+
+        # nor is a failure of the slow worker recorded over the new lease
+        (message,) = self.enqueue("app_ride.tests.test_outbox.explode")
+        (stale,) = slow.claim("default")
+        self.clock.advance(61)
+        other.claim("default")
+        leased = RideOutbox.objects.get(pk=message.pk)
+        slow.fail(stale, RuntimeError("late"))
+        message.refresh_from_db()
+        self.assertEqual(message.available_at, leased.available_at)
+        self.assertEqual(message.last_error, "")
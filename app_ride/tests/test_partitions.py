@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import SimpleTestCase
+
+from app_ride.models import RideEvent
+from app_ride.partitions import (
+    create_partitions,
+    expired_partitions,
+    month_start,
+    partition_name,
+    partitions,
+)
+from utils.paginators import EstimatedCountPaginator
+
+from .utils import RideAPITestCase, make_ride
+
+
+class MonthTests(SimpleTestCase):
+    def test_month_start_crosses_years(self):
+        moment = datetime(2026, 11, 19, 15, 30, tzinfo=timezone.utc)
+        self.assertEqual(
+            month_start(moment), datetime(2026, 11, 1, tzinfo=timezone.utc)
+        )
+        self.assertEqual(
+            month_start(moment, 2), datetime(2027, 1, 1, tzinfo=timezone.utc)
+        )
+        self.assertEqual(
+            month_start(moment, -11), datetime(2025, 12, 1, tzinfo=timezone.utc)
+        )
+        self.assertEqual(partition_name(moment), "app_ride_rideevent_p2026_11")
+
+
+@skipUnless(connection.vendor == "postgresql", "RideEvent is partitioned on PostgreSQL")
+class PartitionTests(RideAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.ride = make_ride(self.rider)
+
+    def event_at(self, moment):
+        event = RideEvent.objects.create(ride=self.ride, description="Note.")
+        RideEvent.objects.filter(pk=event.pk).update(created_at=moment)
+        return event
+
+    def partition_of(self, event):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT tableoid::regclass::text FROM app_ride_rideevent WHERE id = %s",
+                [event.pk],
+            )
+            return cursor.fetchone()[0]
+
+    def test_events_past_the_last_partition_are_moved_out_of_the_default(self):
+        last = [p for p in partitions() if not p.default][-1]
+        later = month_start(last.upper, 2)
+        event = self.event_at(later.replace(day=15))
+        self.assertEqual(self.partition_of(event), "app_ride_rideevent_default")
+
+        with self.assertLogs("app_ride.partitions", "WARNING"):
+            created = create_partitions(0, later)
+
+        self.assertEqual(created, [partition_name(later)])
+        self.assertEqual(self.partition_of(event), partition_name(later))
+        self.assertTrue(partitions()[-1].default)
+        self.assertNotIn(
+            "app_ride_rideevent_default", [p.name for p in expired_partitions(later)]
+        )
+
+    def test_estimated_count_sums_the_partitions(self):
+        for month in range(3):
+            self.event_at(month_start(datetime.now(timezone.utc), month))
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE app_ride_rideevent")
+
+        paginator = EstimatedCountPaginator(RideEvent.objects.order_by("pk"), 10)
+        paginator.estimate_threshold = 1
+        self.assertEqual(paginator.count, 3)
@@ -0,0 +1,78 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils.timezone import now, timedelta
+
+from app_ride.archive import archive_batch
+from app_ride.models import Ride
+
+from .utils import RideAPITestCase, make_ride
+
+
+class BatchTests(RideAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.rides = [make_ride(self.rider, self.driver) for _ in range(3)]
+
+    def test_rides_are_returned_by_id_in_the_order_given(self):
+        first, second, third = (ride.pk for ride in self.rides)
+        response = self.client.get(
+            "/ride/batch/", {"ids": f"{third},{first},{third},999999"}
+        )
+        data = response.json()["data"]
+        self.assertEqual(list(data["results"]), [str(third), str(first), "999999"])
+        self.assertEqual(data["results"][str(first)]["id"], first)
+        self.assertEqual(data["results"][str(first)]["rider"]["id"], self.rider.pk)
+        self.assertEqual(data["results"]["999999"], {"id": 999999, "not_found": True})
+        self.assertEqual(data["not_found"], [999999])
+
+    def test_ids_can_be_posted(self):
+        ids = [ride.pk for ride in self.rides]
+        response = self.client.post("/ride/batch/", {"ids": ids}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.json()["data"]["results"]), list(map(str, ids)))
+
+    def test_archived_rides_on_request(self):
+        ride = self.rides[0]
+        self.transition(ride, "en-route", "pickup", "dropoff")
+        Ride.objects.filter(pk=ride.pk).update(pickup_time=now() - timedelta(days=120))
+        archive_batch(now() - timedelta(days=90))
+
+        response = self.client.get("/ride/batch/", {"ids": ride.pk})
+        self.assertEqual(response.json()["data"]["not_found"], [ride.pk])
+        response = self.client.get(
+            "/ride/batch/", {"ids": ride.pk, "include_archived": "true"}
+        )
+        result = response.json()["data"]["results"][str(ride.pk)]
+        self.assertEqual(result["status"], "dropoff")
+        self.assertIsNotNone(result["archived_at"])
+
+    @override_settings(RIDE_BATCH_MAX_IDS=3)
+    def test_invalid_ids(self):
+        for params in [{}, {"ids": ""}, {"ids": "1,x"}, {"ids": "1,2,3,4"}]:
+            with self.subTest(params=params):
+                response = self.client.get("/ride/batch/", params)
+                self.assertEqual(response.status_code, 400)
+        response = self.client.post("/ride/batch/", {"ids": "1"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(
+    RIDE_SHARDS={"default": 0, "north": 1},
+    RIDE_REGIONS={"north": {"database": "north", "bounds": (8.0, 125.0, 9.0, 126.0)}},
+)
+class ShardedBatchTests(RideAPITestCase):
+    databases = {"default", "north"}
+
+    def test_rides_are_read_from_every_database(self):
+        call_command("setup_ride_shards", skip_migrate=True, stdout=StringIO())
+        south = make_ride(self.rider)
+        north = make_ride(self.rider, pickup_latitude=8.5, pickup_longitude=125.5)
+
+        response = self.client.get("/ride/batch/", {"ids": f"{north.pk},{south.pk}"})
+        data = response.json()["data"]
+        self.assertEqual(data["not_found"], [])
+        self.assertEqual(
+            [ride["id"] for ride in data["results"].values()], [north.pk, south.pk]
+        )
@@ -0,0 +1,94 @@
+import base64
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.utils.timezone import now, timedelta
+
+from app_ride.models import Ride, RideChange
+from app_ride.models.ride_change import decode_cursor, encode_cursor
+
+from .utils import RideAPITestCase, make_ride
+
+
+def raw_cursor(value):
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        positions = {"default": (0, 12), "north": (731, 4)}
+        self.assertEqual(decode_cursor(encode_cursor(positions)), positions)
+
+    def test_invalid_cursor(self):
+        for value in ["v1:x", "v1:default=3", "v2:default=3,north=9", "v9:1"]:
+            with self.assertRaisesMessage(ValueError, "Invalid cursor."):
+                decode_cursor(raw_cursor(value))
+        for cursor in ["", "garbage"]:
+            with self.assertRaisesMessage(ValueError, "Invalid cursor."):
+                decode_cursor(cursor)
+
+
+class ChangeFeedTests(RideAPITestCase):
+    def changes(self, cursor=None, **params):
+        if cursor:
+            params["cursor"] = cursor
+        return self.client.get("/ride/changes/", params)
+
+    def test_feed_returns_the_rides_changed_since_the_cursor(self):
+        make_ride(self.rider)
+        cursor = self.changes().json()["data"]["cursor"]
+
+        ride = make_ride(self.rider, self.driver)
+        self.transition(ride, "en-route")
+        data = self.changes(cursor).json()["data"]
+        # both changes of the ride collapse into its current state
+        self.assertEqual([row["id"] for row in data["results"]], [ride.pk])
+        self.assertEqual(data["results"][0]["status"], "en-route")
+        self.assertFalse(data["has_more"])
+
+        # nothing new: the cursor is handed back unchanged
+        again = self.changes(data["cursor"]).json()["data"]
+        self.assertEqual(again["results"], [])
+        self.assertEqual(again["cursor"], data["cursor"])
+
+    def test_deleted_rides_come_back_as_tombstones(self):
+        ride = make_ride(self.rider)
+        cursor = self.changes().json()["data"]["cursor"]
+        Ride.objects.get(pk=ride.pk).delete()
+
+        results = self.changes(cursor).json()["data"]["results"]
+        self.assertEqual(results, [{"id": ride.pk, "deleted": True}])
+
+    def test_paging_with_limit(self):
+        cursor = self.changes().json()["data"]["cursor"]
+        rides = [make_ride(self.rider) for _ in range(3)]
+
+        seen = []
+        has_more = True
+        while has_more:
+            data = self.changes(cursor, limit=2).json()["data"]
+            seen += [row["id"] for row in data["results"]]
+            cursor, has_more = data["cursor"], data["has_more"]
+        self.assertEqual(seen, [ride.pk for ride in rides])
+
+    def test_pruned_cursor_is_gone(self):
+        make_ride(self.rider)
+        old_cursor = self.changes().json()["data"]["cursor"]
+        make_ride(self.rider)
+        RideChange.objects.update(created_at=now() - timedelta(days=30))
+        latest = self.changes().json()["data"]["cursor"]
+        ride = make_ride(self.rider)
+
+        out = StringIO()
+        call_command("prune_ride_changes", days=7, stdout=out)
+        self.assertIn("Deleted 1 ride changes", out.getvalue())
+        self.assertEqual(
+            list(RideChange.objects.values_list("kind", flat=True)),
+            [RideChange.PRUNED, RideChange.CREATED],
+        )
+
+        self.assertEqual(self.changes(old_cursor).status_code, 410)
+        # a cursor at the marker only misses the marker itself
+        results = self.changes(latest).json()["data"]["results"]
+        self.assertEqual([row["id"] for row in results], [ride.pk])
@@ -0,0 +1,159 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.utils.timezone import now
+from rest_framework.exceptions import ValidationError
+
+from app_ride.models import Ride, RideCounter, RideEvent
+from app_ride.models.ride_counter import ride_counter_deltas
+from app_ride.serializers.ride import (
+    RideStatusUpdateSerializer,
+    RideUpdateSerializer,
+)
+
+from .utils import RideAPITestCase, make_ride, make_user
+
+
+def counters():
+    return {
+        (row["scope"], row["key"]): row["total"]
+        for row in RideCounter.objects.totals().filter(total__gt=0)
+    }
+
+
+class CounterDeltaTests(SimpleTestCase):
+    def test_a_transition_moves_one_ride_between_statuses(self):
+        created = now()
+        deltas = ride_counter_deltas(("pickup", 7, created), ("dropoff", 7, created))
+        self.assertEqual(deltas[(RideCounter.STATUS, "pickup")], -1)
+        self.assertEqual(deltas[(RideCounter.STATUS, "dropoff")], 1)
+        # dropped off rides are no longer active for their driver
+        self.assertEqual(deltas[(RideCounter.ACTIVE_DRIVER, "7")], -1)
+        self.assertEqual(
+            deltas[(RideCounter.CREATED_DAY, created.date().isoformat())], 0
+        )
+
+
+class RideCounterTests(RideAPITestCase):
+    def test_counters_follow_creates_transitions_and_deletes(self):
+        ride = make_ride(self.rider, self.driver)
+        make_ride(self.rider)
+        self.assertEqual(counters()[(RideCounter.STATUS, "pending")], 2)
+        self.assertEqual(
+            counters()[(RideCounter.ACTIVE_DRIVER, str(self.driver.pk))], 1
+        )
+
+        self.transition(ride, "en-route", "pickup", "dropoff")
+        self.assertEqual(counters()[(RideCounter.STATUS, "pending")], 1)
+        self.assertEqual(counters()[(RideCounter.STATUS, "dropoff")], 1)
+        self.assertNotIn((RideCounter.ACTIVE_DRIVER, str(self.driver.pk)), counters())
+
+        Ride.objects.get(pk=ride.pk).delete()
+        self.assertNotIn((RideCounter.STATUS, "dropoff"), counters())
+
+    def test_reassigning_the_driver_moves_the_active_ride(self):
+        ride = make_ride(self.rider, self.driver)
+        other = make_user("other@example.com")
+
+        response = self.client.patch(f"/ride/{ride.pk}/", {"driver": other.pk})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn((RideCounter.ACTIVE_DRIVER, str(self.driver.pk)), counters())
+        self.assertEqual(counters()[(RideCounter.ACTIVE_DRIVER, str(other.pk))], 1)
+
+    def test_saving_a_refreshed_ride_diffs_against_the_database(self):
+        ride = make_ride(self.rider)
+        Ride.objects.filter(pk=ride.pk).update(driver=self.driver)
+        ride.refresh_from_db()
+        RideCounter.objects.create(
+            scope=RideCounter.ACTIVE_DRIVER, key=str(self.driver.pk), value=1
+        )
+
+        ride.driver = None
+        ride.save()
+        self.assertNotIn((RideCounter.ACTIVE_DRIVER, str(self.driver.pk)), counters())
+
+    def test_concurrent_transitions_are_applied_once(self):
+        ride = self.transition(make_ride(self.rider, self.driver), "en-route")
+        # both requests read the ride before either one saved
+        requests = [
+            RideStatusUpdateSerializer(
+                Ride.objects.get(pk=ride.pk),
+                data={},
+                partial=True,
+                context={"status": "pickup"},
+            )
+            for _ in range(2)
+        ]
+        self.assertTrue(all(request.is_valid() for request in requests))
+
+        requests[0].save()
+        with self.assertRaisesMessage(ValidationError, "from pickup to pickup"):
+            requests[1].save()
+
+        self.assertEqual(counters()[(RideCounter.STATUS, "pickup")], 1)
+        self.assertNotIn((RideCounter.STATUS, "en-route"), counters())
+        self.assertEqual(RideEvent.objects.filter(to_status="pickup").count(), 1)
+
+    def test_driver_removal_is_checked_against_the_stored_status(self):
+        ride = make_ride(self.rider, self.driver)
+        request = RideUpdateSerializer(
+            Ride.objects.get(pk=ride.pk), data={"driver": None}, partial=True
+        )
+        self.assertTrue(request.is_valid())
+        self.transition(ride, "en-route")
+
+        with self.assertRaisesMessage(ValidationError, "en-route ride"):
+            request.save()
+        self.assertEqual(
+            counters()[(RideCounter.ACTIVE_DRIVER, str(self.driver.pk))], 1
+        )
+
+    @override_settings(RIDE_COUNTER_SLOTS=4)
+    def test_counters_are_spread_over_slots(self):
+        rides = [make_ride(self.rider) for _ in range(8)]
+        self.assertEqual(counters()[(RideCounter.STATUS, "pending")], 8)
+        slots = RideCounter.objects.filter(scope=RideCounter.STATUS, key="pending")
+        self.assertEqual(
+            sorted(slots.values_list("slot", "value")), [(0, 2), (1, 2), (2, 2), (3, 2)]
+        )
+
+        # a ride moves its count out of the slot it added it to
+        Ride.objects.get(pk=rides[0].pk).delete()
+        self.assertEqual(slots.get(slot=rides[0].pk % 4).value, 1)
+
+        RideCounter.objects.apply({(RideCounter.STATUS, "pending"): -3})
+        self.assertEqual(counters()[(RideCounter.STATUS, "pending")], 4)
+
+    def test_summary_endpoint(self):
+        ride = make_ride(self.rider, self.driver)
+        make_ride(self.rider, self.driver)
+        self.transition(ride, "en-route")
+
+        response = self.client.get("/ride/summary/")
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual(
+            data["status"], {"pending": 1, "en-route": 1, "pickup": 0, "dropoff": 0}
+        )
+        self.assertEqual(data["active_rides_per_driver"], {str(self.driver.pk): 2})
+        self.assertEqual(data["created_today"], 2)
+
+    def test_reconcile_repairs_drift(self):
+        make_ride(self.rider, self.driver)
+        expected = counters()
+        RideCounter.objects.filter(scope=RideCounter.STATUS).update(value=5)
+
+        out = StringIO()
+        call_command("reconcile_ride_counters", "--dry-run", stdout=out)
+        self.assertNotEqual(counters(), expected)
+
+        call_command("reconcile_ride_counters", stdout=out)
+        self.assertEqual(counters(), expected)
+        self.assertIn("Fixed 1 counters.", out.getvalue())
+
+        out = StringIO()
+        call_command("reconcile_ride_counters", stdout=out)
+        self.assertIn("Counters are in sync.", out.getvalue())
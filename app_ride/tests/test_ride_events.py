@@ -0,0 +1,74 @@
+from importlib import import_module
+
+from django.apps import apps
+
+from app_ride.models import Ride, RideEvent
+
+from .utils import RideAPITestCase, make_ride
+
+backfill = import_module("app_ride.migrations.0009_rideevent_event_type")
+
+
+class StatusChangeEventTests(RideAPITestCase):
+    def test_transitions_record_structured_events(self):
+        ride = make_ride(self.rider, self.driver)
+        self.transition(ride, "en-route", "pickup")
+
+        events = ride.ride_events.status_changes().order_by("pk")
+        self.assertEqual(
+            list(events.values_list("from_status", "to_status")),
+            [("pending", "en-route"), ("en-route", "pickup")],
+        )
+        self.assertEqual(ride.ride_events.transitions_to("pickup").count(), 1)
+
+    def test_skipping_a_status_is_rejected(self):
+        ride = make_ride(self.rider, self.driver)
+
+        response = self.client.post(f"/ride/{ride.pk}/set/pickup/")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ride.ride_events.exists())
+
+    def test_notes_are_not_status_changes(self):
+        ride = make_ride(self.rider, self.driver)
+        RideEvent.objects.create(ride=ride, description="Rider called.")
+
+        self.assertFalse(RideEvent.objects.status_changes().exists())
+
+    def test_transition_time_annotation(self):
+        ride = make_ride(self.rider, self.driver)
+        self.transition(ride, "en-route", "pickup")
+        pickup = ride.ride_events.get(to_status="pickup")
+
+        annotated = Ride.objects.with_transition_time("pickup").get(pk=ride.pk)
+        self.assertEqual(annotated.pickup_at, pickup.created_at)
+        annotated = Ride.objects.with_transition_time("dropoff").get(pk=ride.pk)
+        self.assertIsNone(annotated.dropoff_at)
+
+
+class BackfillTests(RideAPITestCase):
+    def test_descriptions_are_parsed_in_every_spelling(self):
+        ride = make_ride(self.rider, self.driver)
+        for description in [
+            "Status changed to en-route.",
+            "Status changed to pick-up.",
+            "Status changed to drop-off.",
+            "Picked up a parcel.",
+        ]:
+            RideEvent.objects.create(ride=ride, description=description)
+
+        backfill.backfill_status_changes(apps, None)
+
+        self.assertEqual(
+            list(
+                RideEvent.objects.order_by("pk").values_list(
+                    "event_type", "from_status", "to_status"
+                )
+            ),
+            [
+                ("status_change", "pending", "en-route"),
+                ("status_change", "en-route", "pickup"),
+                ("status_change", "pickup", "dropoff"),
+                ("note", None, None),
+            ],
+        )
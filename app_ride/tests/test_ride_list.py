@@ -0,0 +1,64 @@
+import msgpack
+from django.test import override_settings
+
+from .utils import RideAPITestCase, make_ride
+
+
+class CoalescedListTests(RideAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.rides = [make_ride(self.rider) for _ in range(3)]
+
+    def get(self, latitude, **extra):
+        params = {"current_latitude": latitude, "current_longitude": "125.61"}
+        return self.client.get(
+            "/ride/", {**params, "limit": 1, "ordering": "pk"}, **extra
+        ).json()["data"]
+
+    @override_settings(ALLOWED_HOSTS=["testserver", "api.example.com"])
+    def test_shared_page_gets_the_links_of_each_request(self):
+        first = self.get("7.07001")
+        # rounds to the same query, answered from the first request's rows
+        make_ride(self.rider)
+        second = self.get("7.07002", SERVER_NAME="api.example.com")
+
+        self.assertEqual(second["count"], 3)
+        self.assertEqual(second["results"], first["results"])
+        self.assertIn("http://testserver/", first["next"])
+        self.assertIn("current_latitude=7.07001", first["next"])
+        self.assertIn("http://api.example.com/", second["next"])
+        self.assertIn("current_latitude=7.07002", second["next"])
+        self.assertIsNone(second["previous"])
+
+    def test_last_page_has_no_next_link(self):
+        data = self.client.get("/ride/", {"limit": 2, "page": 2}).json()["data"]
+        self.assertEqual((data["count"], data["page"], data["limit"]), (3, 2, 2))
+        self.assertEqual(len(data["results"]), 1)
+        self.assertIsNone(data["next"])
+        self.assertIn("limit=2", data["previous"])
+
+
+class MessagePackListTests(RideAPITestCase):
+    def test_list_page_in_columns(self):
+        rides = [make_ride(self.rider, self.driver) for _ in range(2)]
+        response = self.client.get(
+            "/ride/",
+            {"ordering": "pk", "layout": "columnar"},
+            HTTP_ACCEPT="application/msgpack",
+        )
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        page = msgpack.unpackb(response.content, strict_map_key=False)["data"]
+        results = page["results"]
+        self.assertEqual(results["columns"]["id"], [ride.pk for ride in rides])
+        self.assertEqual(results["columns"]["rider"], [self.rider.pk] * 2)
+        self.assertEqual(results["columns"]["pickup_latitude"], [7_070_000] * 2)
+        self.assertEqual(
+            sorted(user["id"] for user in results["tables"]["users"]),
+            [self.rider.pk, self.driver.pk],
+        )
+
+    def test_detail_without_layout(self):
+        ride = make_ride(self.rider)
+        response = self.client.get(f"/ride/{ride.pk}/", {"format": "msgpack"})
+        data = msgpack.unpackb(response.content, strict_map_key=False)["data"]
+        self.assertEqual((data["id"], data["pickup_latitude"]), (ride.pk, 7.07))
@@ -0,0 +1,107 @@
+from django.utils.timezone import now, timedelta
+
+from app_ride.models import Ride
+from app_ride.scheduler import Job, PickupScheduler
+
+from .utils import RideAPITestCase, make_ride
+
+
+class PickupSchedulerTests(RideAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.current = now()
+        self.fired = []
+        self.scheduler = PickupScheduler(
+            [Job("remind", timedelta(minutes=15), self.fired.append)],
+            horizon=timedelta(hours=1),
+            clock=lambda: self.current,
+        )
+
+    def test_fires_each_job_once_ahead_of_pickup(self):
+        ride = make_ride(self.rider, pickup_time=self.current + timedelta(minutes=30))
+        self.scheduler.start()
+
+        self.scheduler.run_due()
+        self.assertEqual(self.fired, [])
+        self.current += timedelta(minutes=16)
+        self.assertEqual(self.scheduler.run_due(), 1)
+        self.assertEqual(self.fired[0]["id"], ride.pk)
+        self.assertEqual(self.scheduler.run_due(), 0)
+
+    def test_follows_rides_created_moved_and_cancelled_after_start(self):
+        self.scheduler.start()
+        created = make_ride(
+            self.rider, pickup_time=self.current + timedelta(minutes=20)
+        )
+        moved = make_ride(self.rider, pickup_time=self.current + timedelta(minutes=20))
+        cancelled = make_ride(
+            self.rider, pickup_time=self.current + timedelta(minutes=20)
+        )
+        self.scheduler.sync()
+
+        moved.pickup_time = self.current + timedelta(minutes=50)
+        moved.save()
+        Ride.objects.get(pk=cancelled.pk).delete()
+        self.scheduler.sync()
+
+        self.current += timedelta(minutes=6)
+        self.scheduler.run_due()
+        self.assertEqual([ride["id"] for ride in self.fired], [created.pk])
+
+        self.current += timedelta(minutes=30)
+        self.scheduler.run_due()
+        self.assertEqual([ride["id"] for ride in self.fired], [created.pk, moved.pk])
+
+    def test_window_loads_rides_as_their_pickup_approaches(self):
+        later = make_ride(self.rider, pickup_time=self.current + timedelta(hours=3))
+        self.scheduler.start()
+        self.assertNotIn(later.pk, self.scheduler._rides)
+
+        self.current += timedelta(hours=2)
+        self.scheduler.extend_window()
+        self.assertIn(later.pk, self.scheduler._rides)
+
+    def test_picked_up_rides_are_not_reminded(self):
+        ride = make_ride(
+            self.rider, self.driver, pickup_time=self.current + timedelta(minutes=20)
+        )
+        self.scheduler.start()
+        self.transition(ride, "en-route", "pickup")
+        self.scheduler.sync()
+
+        self.current += timedelta(minutes=10)
+        self.assertEqual(self.scheduler.run_due(), 0)
+
+    def test_failing_job_does_not_stop_the_others(self):
+        def broken(ride):
+            raise RuntimeError("boom")
+
+        self.scheduler = PickupScheduler(
+            [
+                Job("broken", timedelta(minutes=15), broken),
+                Job("remind", timedelta(minutes=15), self.fired.append),
+            ],
+            clock=lambda: self.current,
+        )
+        make_ride(self.rider, pickup_time=self.current + timedelta(minutes=20))
+        self.scheduler.start()
+
+        self.current += timedelta(minutes=10)
+        with self.assertLogs("app_ride.scheduler", "ERROR"):
+            self.assertEqual(self.scheduler.run_due(), 1)
+        self.assertEqual(len(self.fired), 1)
+
+
+class UpcomingTests(RideAPITestCase):
+    def test_lists_rides_not_yet_picked_up_soonest_first(self):
+        later = make_ride(self.rider, pickup_time=now() + timedelta(minutes=50))
+        soon = make_ride(self.rider, pickup_time=now() + timedelta(minutes=10))
+        make_ride(self.rider, pickup_time=now() + timedelta(hours=3))
+        picked_up = make_ride(
+            self.rider, self.driver, pickup_time=now() + timedelta(minutes=5)
+        )
+        self.transition(picked_up, "en-route", "pickup")
+
+        response = self.client.get("/ride/upcoming/", {"within": 60})
+        ids = [ride["id"] for ride in response.json()["data"]["results"]]
+        self.assertEqual(ids, [soon.pk, later.pk])
@@ -0,0 +1,90 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from app_ride.models import Ride, RideEvent
+from app_ride.sharding import (
+    database_for_id,
+    database_for_region,
+    first_id,
+    region_for_point,
+)
+
+from .utils import RideAPITestCase, make_ride
+
+SPAN = 10**12
+
+
+@override_settings(
+    RIDE_SHARDS={"default": 0, "north": 1},
+    RIDE_SHARD_ID_SPAN=SPAN,
+    RIDE_REGIONS={"north": {"database": "north", "bounds": (8.0, 125.0, 9.0, 126.0)}},
+)
+class ShardingTests(RideAPITestCase):
+    databases = {"default", "north"}
+
+    def setUp(self):
+        super().setUp()
+        call_command("setup_ride_shards", skip_migrate=True, stdout=StringIO())
+        self.south = make_ride(self.rider, self.driver)
+        self.north = make_ride(
+            self.rider, self.driver, pickup_latitude=8.5, pickup_longitude=125.5
+        )
+
+    def ids(self, **params):
+        response = self.client.get("/ride/", {"ordering": "pk", **params})
+        return [ride["id"] for ride in response.json()["data"]["results"]]
+
+    def test_routing_helpers(self):
+        self.assertEqual(region_for_point(8.5, 125.5), "north")
+        self.assertEqual(region_for_point(7.07, 125.61), "")
+        self.assertEqual(database_for_region("north"), "north")
+        self.assertEqual(database_for_region(""), "default")
+        self.assertEqual(database_for_id(SPAN + 3), "north")
+        self.assertEqual(database_for_id(3), "default")
+        self.assertEqual(database_for_id("x"), "default")
+        self.assertEqual((first_id("default"), first_id("north")), (1, SPAN))
+
+    def test_rides_are_stored_in_their_region_database(self):
+        self.assertEqual(self.north.region, "north")
+        self.assertGreaterEqual(self.north.pk, SPAN)
+        self.assertTrue(Ride.objects.using("north").filter(pk=self.north.pk).exists())
+        self.assertFalse(Ride.objects.filter(pk=self.north.pk).exists())
+
+        response = self.client.post(
+            "/ride/", self.ride_payload(pickup_latitude=8.2, pickup_longitude=125.3)
+        )
+        created = response.json()["data"]["id"]
+        self.assertEqual(database_for_id(created), "north")
+
+    def test_retrieve_and_transitions_use_the_ride_database(self):
+        response = self.client.get(f"/ride/{self.north.pk}/")
+        self.assertEqual(response.json()["data"]["region"], "north")
+
+        self.transition(self.north, "en-route")
+        self.assertEqual(
+            RideEvent.objects.using("north").filter(ride_id=self.north.pk).count(), 1
+        )
+        self.assertFalse(RideEvent.objects.exists())
+
+    def test_lists_are_merged_across_databases(self):
+        self.assertEqual(self.ids(), [self.south.pk, self.north.pk])
+        self.assertEqual(self.ids(ordering="-pk"), [self.north.pk, self.south.pk])
+        self.assertEqual(self.ids(limit=1, page=2), [self.north.pk])
+
+        response = self.client.get("/ride/", {"limit": 1})
+        self.assertEqual(response.json()["data"]["count"], 2)
+
+    def test_only_the_region_filter_reads_a_single_database(self):
+        self.assertEqual(self.ids(region="north"), [self.north.pk])
+        # coordinates rank rides of every database, nearest first
+        point = {"current_latitude": 8.5, "current_longitude": 125.5}
+        self.assertEqual(
+            self.ids(**point, ordering="pickup_distance"),
+            [self.north.pk, self.south.pk],
+        )
+        self.assertEqual(
+            self.ids(current_latitude=7.07, current_longitude=125.61),
+            [self.south.pk, self.north.pk],
+        )
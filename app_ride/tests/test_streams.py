@@ -0,0 +1,84 @@
+import json
+from unittest import mock
+
+from django.db import DEFAULT_DB_ALIAS
+
+from app_ride.streams import ride_topic
+from utils.pubsub import get_broker
+
+from .utils import RideAPITestCase, make_ride
+
+
+def sse_messages(response, count):
+    """The first `count` messages of an SSE response, skipping the retry hint."""
+    frames = iter(response.streaming_content)
+    next(frames)
+    messages = []
+    for frame in frames:
+        data = frame.split(b"data: ", 1)[1]
+        messages.append(json.loads(data))
+        if len(messages) == count:
+            break
+    response.close()
+    return messages
+
+
+class RideStreamTests(RideAPITestCase):
+    def test_stream_starts_with_the_current_status(self):
+        ride = make_ride(self.rider, self.driver)
+
+        response = self.client.get("/ride/stream/", {"ride": ride.pk})
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        [message] = sse_messages(response, 1)
+        self.assertEqual(message["type"], "status")
+        self.assertEqual(message["status"], "pending")
+
+    def test_a_change_between_subscribing_and_reading_is_not_lost(self):
+        ride = make_ride(self.rider, self.driver)
+
+        def change_meanwhile(ride_id):
+            get_broker().publish(
+                [ride_topic(ride_id)], {"type": "status", "status": "en-route"}
+            )
+            return DEFAULT_DB_ALIAS
+
+        with mock.patch("app_ride.views.database_for_id", change_meanwhile):
+            response = self.client.get("/ride/stream/", {"ride": ride.pk})
+            messages = sse_messages(response, 2)
+
+        self.assertEqual([m["status"] for m in messages], ["pending", "en-route"])
+
+    def test_long_poll_returns_published_transitions(self):
+        ride = make_ride(self.rider, self.driver)
+        broker = get_broker()
+        subscribe = broker.subscribe
+
+        def subscribe_and_transition(*topics):
+            subscription = subscribe(*topics)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.transition(ride, "en-route")
+            return subscription
+
+        with mock.patch.object(broker, "subscribe", subscribe_and_transition):
+            response = self.client.get(
+                "/ride/stream/", {"driver": self.driver.pk, "mode": "poll"}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        [message] = response.json()["data"]
+        self.assertEqual(message["ride"], ride.pk)
+        self.assertEqual(message["status"], "en-route")
+        self.assertEqual(message["event"]["to_status"], "en-route")
+
+    def test_unknown_ride_is_rejected_and_unsubscribed(self):
+        broker = get_broker()
+
+        response = self.client.get("/ride/stream/", {"ride": 999999})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(broker._subscriptions.get(ride_topic(999999)))
+
+    def test_ride_or_driver_is_required(self):
+        response = self.client.get("/ride/stream/")
+        self.assertEqual(response.status_code, 400)
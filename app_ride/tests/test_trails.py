@@ -0,0 +1,162 @@
+from unittest import mock
+
+import numpy as np
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, override_settings
+
+from app_ride.models import RideTrail, RideTrailSegment
+from app_ride.trails import (
+    append_points,
+    decode_segment,
+    douglas_peucker,
+    encode_segment,
+    from_fixed_point,
+    iter_points,
+    path_length,
+    to_fixed_point,
+)
+
+from .utils import RideAPITestCase, make_ride
+
+START = 1_790_000_000
+
+
+def straight_points(count, start=START):
+    """One point a second heading north, ~11 m apart."""
+    return [
+        [round(7.07 + index * 0.0001, 6), 125.61, start + index]
+        for index in range(count)
+    ]
+
+
+class SegmentTests(SimpleTestCase):
+    def test_encode_decode_round_trip(self):
+        points = to_fixed_point(
+            [
+                [7.070001, 125.610002, START],
+                [-33.8, -70.6, START + 0.25],
+                [90, 180, START + 3600],
+            ]
+        )
+        np.testing.assert_array_equal(decode_segment(encode_segment(points)), points)
+        np.testing.assert_array_equal(
+            decode_segment(encode_segment(points[:1])), points[:1]
+        )
+        self.assertEqual(
+            from_fixed_point(points[:1]), [[7.070001, 125.610002, float(START)]]
+        )
+
+    def test_points_too_far_apart_are_rejected(self):
+        points = to_fixed_point([[7, 125, START], [7, 125, START + 30 * 86400]])
+        with self.assertRaises(ValueError):
+            encode_segment(points)
+
+    def test_path_length(self):
+        points = to_fixed_point([[7, 125, START], [8, 125, START + 1]])
+        self.assertAlmostEqual(path_length(points), 111.19, places=2)
+        self.assertEqual(path_length(points[:1]), 0)
+
+    def test_douglas_peucker_keeps_the_corners(self):
+        # north, then east, with a few meters of noise along each leg
+        points = to_fixed_point(
+            [
+                [7.0000, 125.0000, START],
+                [7.0010, 125.00001, START + 1],
+                [7.0020, 125.0000, START + 2],
+                [7.0020, 125.0010, START + 3],
+                [7.00201, 125.0020, START + 4],
+            ]
+        )
+        self.assertEqual(
+            douglas_peucker(points, 5).tolist(), [True, False, True, False, True]
+        )
+        self.assertTrue(douglas_peucker(points, 0.1).all())
+
+
+@override_settings(TRAIL_SEGMENT_POINTS=4)
+class AppendTests(RideAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.ride = make_ride(self.rider)
+
+    def test_points_are_appended_across_segments(self):
+        points = straight_points(10)
+        _, appended = append_points(self.ride.pk, points[:3], "default")
+        trail, appended_again = append_points(self.ride.pk, points[3:], "default")
+
+        self.assertEqual((appended, appended_again, trail.point_count), (3, 7, 10))
+        self.assertEqual(
+            list(
+                RideTrailSegment.objects.order_by("number").values_list(
+                    "number", "point_count"
+                )
+            ),
+            [(0, 4), (1, 4), (2, 2)],
+        )
+        self.assertAlmostEqual(
+            trail.distance_km, path_length(to_fixed_point(points)), places=6
+        )
+        self.assertEqual(trail.last_time.timestamp(), START + 9)
+        stored = np.concatenate(list(iter_points(self.ride.pk, "default")))
+        np.testing.assert_array_equal(stored, to_fixed_point(points))
+
+    def test_retried_and_unordered_points(self):
+        points = straight_points(5)
+        append_points(self.ride.pk, points[::-1], "default")
+        trail, appended = append_points(self.ride.pk, points, "default")
+        self.assertEqual((appended, trail.point_count), (0, 5))
+
+    def test_time_span_reads_only_overlapping_segments(self):
+        append_points(self.ride.pk, straight_points(10), "default")
+        start, end = (
+            RideTrailSegment.objects.get(number=1).start_time,
+            RideTrailSegment.objects.get(number=1).end_time,
+        )
+        chunks = list(iter_points(self.ride.pk, "default", start, end))
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(
+            chunks[0][:, 2].tolist(), [(START + i) * 1000 for i in range(4, 8)]
+        )
+
+    def test_first_appends_racing_for_the_trail_row(self):
+        get = QuerySet.get
+        raced = []
+
+        def racing_get(queryset, *args, **kwargs):
+            if queryset.model is RideTrail and not raced:
+                # another first append inserts the trail after this lookup
+                raced.append(True)
+                RideTrail.objects.create(ride_id=self.ride.pk, point_count=0)
+                raise RideTrail.DoesNotExist
+            return get(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, "get", racing_get):
+            trail, appended = append_points(self.ride.pk, straight_points(2), "default")
+        self.assertEqual(raced, [True])
+        self.assertEqual((appended, trail.point_count), (2, 2))
+        self.assertEqual(RideTrail.objects.get().point_count, 2)
+
+
+class TrailViewTests(RideAPITestCase):
+    def test_append_and_read(self):
+        ride = make_ride(self.rider)
+        url = f"/ride/{ride.pk}/trail/"
+        response = self.client.post(url, {"points": straight_points(3)}, format="json")
+        self.assertEqual(response.json()["data"]["appended"], 3)
+
+        data = self.client.get(url).json()["data"]
+        self.assertEqual(data["point_count"], 3)
+        self.assertEqual(data["points"], straight_points(3))
+        # a straight line simplifies to its ends
+        data = self.client.get(url, {"tolerance": 1}).json()["data"]
+        self.assertEqual(len(data["points"]), 2)
+
+    def test_invalid_points(self):
+        ride = make_ride(self.rider)
+        for points in [[[91, 125, START]], [[7, 125]], [[7, 125, -1]], []]:
+            with self.subTest(points=points):
+                response = self.client.post(
+                    f"/ride/{ride.pk}/trail/", {"points": points}, format="json"
+                )
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get("/ride/999999/trail/").status_code, 400)
@@ -0,0 +1,144 @@
+from io import StringIO
+
+import numpy as np
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+from django.utils.timezone import now, timedelta
+
+from app_ride.models import Ride, RideZone, ServiceZone
+from app_ride.zones import clear_zones, points_in_polygon, rides_in_zone
+
+from .utils import RideAPITestCase, make_ride
+
+# an L shape: the square (7.0, 125.5)-(7.2, 125.7) without its north-east quarter
+L_SHAPE = [
+    [7.0, 125.5],
+    [7.2, 125.5],
+    [7.2, 125.6],
+    [7.1, 125.6],
+    [7.1, 125.7],
+    [7.0, 125.7],
+]
+
+
+class PolygonTests(SimpleTestCase):
+    def test_points_in_a_concave_polygon(self):
+        latitudes = [7.05, 7.15, 7.15, 7.05, 7.3]
+        longitudes = [125.55, 125.55, 125.65, 125.65, 125.55]
+        inside = points_in_polygon(
+            np.array(latitudes), np.array(longitudes), np.array(L_SHAPE)
+        )
+        self.assertEqual(inside.tolist(), [True, True, False, True, False])
+
+
+class ServiceZoneTests(RideAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.zone = self.create_zone("downtown", L_SHAPE)
+
+    def create_zone(self, code, polygon):
+        with self.captureOnCommitCallbacks(execute=True):
+            zone = ServiceZone.objects.create(code=code, name=code, polygon=polygon)
+        return zone
+
+    def settle(self):
+        """Move the zones' last change out of the window rides are tested exactly in."""
+        ServiceZone.objects.update(updated_at=now() - timedelta(days=1))
+        clear_zones()
+
+    def zoned(self, code="downtown"):
+        return set(rides_in_zone(Ride.objects.all(), code))
+
+    def tags(self, ride):
+        return set(
+            RideZone.objects.filter(ride_id=ride.pk).values_list("zone_id", flat=True)
+        )
+
+    def test_rides_are_tagged_on_save(self):
+        inside = make_ride(self.rider, pickup_latitude=7.05, pickup_longitude=125.65)
+        notch = make_ride(self.rider, pickup_latitude=7.15, pickup_longitude=125.65)
+        self.assertEqual((self.tags(inside), self.tags(notch)), ({self.zone.pk}, set()))
+        self.settle()
+        self.assertEqual(self.zoned(), {inside})
+
+        response = self.client.get("/ride/", {"zone": "downtown"})
+        ids = [ride["id"] for ride in response.json()["data"]["results"]]
+        self.assertEqual(ids, [inside.pk])
+
+    def test_rides_in_overlapping_zones_match_each_zone(self):
+        north = self.create_zone(
+            "north", [[7.1, 125.5], [7.3, 125.5], [7.3, 125.7], [7.1, 125.7]]
+        )
+        both = make_ride(self.rider, pickup_latitude=7.15, pickup_longitude=125.55)
+        notch = make_ride(self.rider, pickup_latitude=7.15, pickup_longitude=125.65)
+        self.assertEqual(self.tags(both), {self.zone.pk, north.pk})
+        self.settle()
+        self.assertEqual(self.zoned("downtown"), {both})
+        self.assertEqual(self.zoned("north"), {both, notch})
+
+    def test_saving_a_zone_retags_older_rides(self):
+        ride = make_ride(self.rider, pickup_latitude=7.25, pickup_longitude=125.55)
+        Ride.objects.update(created_at=now() - timedelta(days=30))
+        self.assertEqual(self.zoned(), set())
+
+        # grown to the north, then shrunk back
+        self.zone.polygon = [[7.0, 125.5], [7.3, 125.5], [7.3, 125.7], [7.0, 125.7]]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.zone.save()
+        self.settle()
+        self.assertEqual(self.zoned(), {ride})
+
+        self.zone.polygon = L_SHAPE
+        with self.captureOnCommitCallbacks(execute=True):
+            self.zone.save()
+        self.settle()
+        self.assertEqual(self.zoned(), set())
+
+    def test_moving_the_pickup_point_retags_the_ride(self):
+        ride = make_ride(self.rider, pickup_latitude=7.15, pickup_longitude=125.65)
+        ride.pickup_latitude = 7.05
+        ride.save()
+        self.assertEqual(self.tags(ride), {self.zone.pk})
+
+        ride.delete()
+        self.assertEqual(self.tags(ride), set())
+
+    def test_rides_of_the_stale_window_are_tested_exactly(self):
+        inside = make_ride(self.rider, pickup_latitude=7.05, pickup_longitude=125.65)
+        notch = make_ride(self.rider, pickup_latitude=7.15, pickup_longitude=125.65)
+        # tagged by a worker still holding the polygons from before the zone's edit
+        RideZone.objects.all().delete()
+        RideZone.objects.create(ride_id=notch.pk, zone_id=self.zone.pk)
+        self.assertEqual(self.zoned(), {inside})
+
+    def test_deleting_a_zone_removes_its_tags(self):
+        make_ride(self.rider, pickup_latitude=7.05, pickup_longitude=125.65)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.zone.delete()
+        self.assertFalse(RideZone.objects.exists())
+
+    def test_tag_ride_zones_rebuilds_the_tags(self):
+        ride = make_ride(self.rider, pickup_latitude=7.05, pickup_longitude=125.65)
+        RideZone.objects.all().delete()
+
+        out = StringIO()
+        call_command("tag_ride_zones", zones=["downtown"], stdout=out)
+        self.assertIn("downtown on default: 1 rides.", out.getvalue())
+        self.assertEqual(self.tags(ride), {self.zone.pk})
+
+        with self.assertRaises(CommandError):
+            call_command("tag_ride_zones", zones=["uptown"], stdout=StringIO())
+
+    def test_unknown_or_inactive_zone_matches_nothing(self):
+        make_ride(self.rider, pickup_latitude=7.05, pickup_longitude=125.65)
+        self.assertEqual(self.zoned("uptown"), set())
+
+        ServiceZone.objects.filter(pk=self.zone.pk).update(is_active=False)
+        clear_zones()
+        self.assertEqual(self.zoned(), set())
+
+    def test_invalid_polygons_are_rejected(self):
+        with self.assertRaises(ValidationError):
+            ServiceZone.objects.create(code="line", name="Line", polygon=L_SHAPE[:2])
@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.utils.timezone import now, timedelta
+from rest_framework.test import APITestCase
+
+from app_ride.models import Ride
+from app_ride.views import ride_list_flight
+from app_user.models import User
+
+
+def make_user(email, role="basic"):
+    return User.objects.create_user(email, "password", role=role)
+
+
+def make_ride(rider, driver=None, **fields):
+    fields = {
+        "pickup_latitude": 7.07,
+        "pickup_longitude": 125.61,
+        "dropoff_latitude": 7.19,
+        "dropoff_longitude": 125.45,
+        "pickup_time": now() + timedelta(hours=1),
+        **fields,
+    }
+    return Ride.objects.create(rider=rider, driver=driver, **fields)
+
+
+class RideAPITestCase(APITestCase):
+    """An admin client with a rider and a driver, and a clean cache per test."""
+
+    def setUp(self):
+        cache.clear()
+        ride_list_flight.clear()
+        self.admin = make_user("admin@example.com", role="admin")
+        self.rider = make_user("rider@example.com")
+        self.driver = make_user("driver@example.com")
+        self.client.force_authenticate(self.admin)
+
+    def ride_payload(self, **fields):
+        return {
+            "rider": self.rider.pk,
+            "driver": self.driver.pk,
+            "pickup_latitude": 7.07,
+            "pickup_longitude": 125.61,
+            "dropoff_latitude": 7.19,
+            "dropoff_longitude": 125.45,
+            "pickup_time": (now() + timedelta(hours=1)).isoformat(),
+            **fields,
+        }
+
+    def transition(self, ride, *statuses):
+        for status in statuses:
+            response = self.client.post(f"/ride/{ride.pk}/set/{status}/")
+            self.assertEqual(response.status_code, 200, response.json())
+        ride.refresh_from_db()
+        return ride
@@ -0,0 +1,238 @@
+"""
+GPS breadcrumb trails of rides.
+
+Points are appended in batches and stored in segments of up to
+`TRAIL_SEGMENT_POINTS` points. A segment is one compressed blob: its point
+count and first point as int64, then the deltas from point to point of the
+latitude and longitude (fixed-point, 1e-6 degrees) and of the time
+(milliseconds) as int32 arrays. The traveled distance is added to the trail's
+total on every append, so reading it never decodes a segment.
+
+Reading decodes one segment at a time, only the segments overlapping the
+requested time span, and can simplify each one with Douglas-Peucker for maps.
+"""
+
+from __future__ import annotations
+
+import zlib
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from app_ride.models import RideTrail, RideTrailSegment
+
+EARTH_RADIUS_KM = 6371.0
+COORDINATE_SCALE = 1_000_000
+
+HEADER = np.dtype("<i8")
+DELTA = np.dtype("<i4")
+
+
+def encode_segment(points: np.ndarray) -> bytes:
+    """(n, 3) int64 array of fixed-point latitude, longitude and time ms to a blob."""
+    deltas = np.diff(points, axis=0)
+    if deltas.size and np.abs(deltas).max() > np.iinfo(DELTA).max:
+        raise ValueError("Consecutive trail points are too far apart in time.")
+    header = np.array([len(points), *points[0]], dtype=HEADER)
+    return zlib.compress(header.tobytes() + deltas.T.astype(DELTA).tobytes(), 1)
+
+
+def decode_segment(blob: bytes) -> np.ndarray:
+    raw = zlib.decompress(bytes(blob))
+    count, *first = np.frombuffer(raw, dtype=HEADER, count=4)
+    deltas = np.frombuffer(raw, dtype=DELTA, offset=4 * HEADER.itemsize)
+    points = np.empty((count, 3), dtype=np.int64)
+    points[0] = first
+    points[1:] = deltas.reshape(3, count - 1).T
+    return np.cumsum(points, axis=0)
+
+
+def to_fixed_point(points) -> np.ndarray:
+    """`[latitude, longitude, unix seconds]` rows to the stored int64 representation."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    fixed = np.empty(points.shape, dtype=np.int64)
+    fixed[:, :2] = np.round(points[:, :2] * COORDINATE_SCALE)
+    fixed[:, 2] = np.round(points[:, 2] * 1000)
+    return fixed
+
+
+def from_fixed_point(points: np.ndarray) -> list[list[float]]:
+    """Stored points back to `[latitude, longitude, unix seconds]` rows."""
+    return np.column_stack(
+        [points[:, :2] / COORDINATE_SCALE, points[:, 2] / 1000]
+    ).tolist()
+
+
+def path_length(points: np.ndarray) -> float:
+    """Great-circle length in km of the path through the fixed-point points."""
+    if len(points) < 2:
+        return 0.0
+    lat, lng = (
+        np.radians(points[:, 0] / COORDINATE_SCALE),
+        np.radians(points[:, 1] / COORDINATE_SCALE),
+    )
+    a = (
+        np.sin(np.diff(lat) / 2) ** 2
+        + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lng) / 2) ** 2
+    )
+    return float(2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1))).sum())
+
+
+def to_datetime(milliseconds) -> datetime:
+    return datetime.fromtimestamp(int(milliseconds) / 1000, tz=timezone.utc)
+
+
+def append_points(ride_id: int, points, using: str) -> tuple[RideTrail, int]:
+    """
+    Append `[latitude, longitude, unix seconds]` points to a ride's trail.
+
+    Points are sorted by time, points not after the trail's last one are
+    skipped so a retried batch is not stored twice. Returns the trail and the
+    number of points appended.
+    """
+    points = to_fixed_point(points)
+    points = points[np.argsort(points[:, 2], kind="stable")]
+
+    with transaction.atomic(using=using):
+        trail = lock_trail(ride_id, using)
+        previous = None
+        if trail.last_time is not None:
+            previous = to_fixed_point(
+                [trail.last_latitude, trail.last_longitude, trail.last_time.timestamp()]
+            )
+            points = points[points[:, 2] > previous[0, 2]]
+        if not len(points):
+            return trail, 0
+
+        last_segment = (
+            RideTrailSegment.objects.using(using)
+            .filter(ride_id=ride_id)
+            .order_by("-number")
+            .first()
+        )
+        size = settings.TRAIL_SEGMENT_POINTS
+        remaining = points
+        if last_segment is not None and last_segment.point_count < size:
+            room = size - last_segment.point_count
+            stored = np.concatenate(
+                [decode_segment(last_segment.data), remaining[:room]]
+            )
+            write_segment(last_segment, stored)
+            last_segment.save(using=using)
+            remaining = remaining[room:]
+
+        number = last_segment.number + 1 if last_segment is not None else 0
+        segments = []
+        for start in range(0, len(remaining), size):
+            segment = RideTrailSegment(ride_id=ride_id, number=number)
+            write_segment(segment, remaining[start : start + size])
+            segments.append(segment)
+            number += 1
+        RideTrailSegment.objects.using(using).bulk_create(segments)
+
+        path = np.concatenate([previous, points]) if previous is not None else points
+        last = points[-1]
+        trail.point_count += len(points)
+        trail.distance_km += path_length(path)
+        trail.last_latitude = last[0] / COORDINATE_SCALE
+        trail.last_longitude = last[1] / COORDINATE_SCALE
+        trail.last_time = to_datetime(last[2])
+        trail.save(using=using)
+
+    return trail, len(points)
+
+
+def lock_trail(ride_id: int, using: str) -> RideTrail:
+    """
+    The ride's trail row, created on the first append, locked until the transaction ends.
+
+    The lock serializes appends to the same ride. When two first appends race,
+    the one losing the insert waits for the other to commit and locks its row.
+    """
+    trails = RideTrail.objects.using(using)
+    try:
+        return trails.select_for_update().get(ride_id=ride_id)
+    except RideTrail.DoesNotExist:
+        pass
+    try:
+        with transaction.atomic(using=using):
+            return trails.create(ride_id=ride_id)
+    except IntegrityError:
+        return trails.select_for_update().get(ride_id=ride_id)
+
+
+def write_segment(segment: RideTrailSegment, points: np.ndarray) -> None:
+    segment.point_count = len(points)
+    segment.start_time = to_datetime(points[0, 2])
+    segment.end_time = to_datetime(points[-1, 2])
+    segment.data = encode_segment(points)
+
+
+def iter_points(
+    ride_id: int,
+    using: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    tolerance: float = 0,
+) -> Iterator[np.ndarray]:
+    """
+    Fixed-point points of the trail between `start` and `end`, one segment at a time.
+
+    Segments outside the time span are not read. With a `tolerance` in meters
+    each segment is simplified with Douglas-Peucker, keeping its end points.
+    """
+    segments = (
+        RideTrailSegment.objects.using(using).filter(ride_id=ride_id).order_by("number")
+    )
+    if start is not None:
+        segments = segments.filter(end_time__gte=start)
+    if end is not None:
+        segments = segments.filter(start_time__lte=end)
+
+    for data in segments.values_list("data", flat=True).iterator(chunk_size=16):
+        points = decode_segment(data)
+        if start is not None:
+            points = points[points[:, 2] >= start.timestamp() * 1000]
+        if end is not None:
+            points = points[points[:, 2] <= end.timestamp() * 1000]
+        if tolerance and len(points) > 2:
+            points = points[douglas_peucker(points, tolerance)]
+        if len(points):
+            yield points
+
+
+def douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Mask of the points kept by Douglas-Peucker with `tolerance` in meters.
+
+    Points are projected to a local equirectangular plane, each step measures
+    every point of a range against its chord in one vectorized pass.
+    """
+    lat = points[:, 0] / COORDINATE_SCALE
+    lng = points[:, 1] / COORDINATE_SCALE
+    meters_per_degree = np.radians(1) * EARTH_RADIUS_KM * 1000
+    x = (lng - lng[0]) * meters_per_degree * np.cos(np.radians(lat.mean()))
+    y = (lat - lat[0]) * meters_per_degree
+
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    ranges = [(0, len(points) - 1)]
+    while ranges:
+        first, last = ranges.pop()
+        if last - first < 2:
+            continue
+        dx, dy = x[last] - x[first], y[last] - y[first]
+        px, py = x[first + 1 : last] - x[first], y[first + 1 : last] - y[first]
+        length = dx * dx + dy * dy
+        # distance to the chord as a segment, so back and forth stays visible
+        t = np.clip((px * dx + py * dy) / length, 0, 1) if length else 0
+        distances = np.hypot(px - t * dx, py - t * dy)
+        farthest = int(distances.argmax())
+        if distances[farthest] > tolerance:
+            middle = first + 1 + farthest
+            keep[middle] = True
+            ranges += [(first, middle), (middle, last)]
+    return keep
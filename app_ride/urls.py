@@ -6,10 +6,22 @@ from django.urls import path
 from django.urls.conf import include
 from rest_framework import routers
 
-from .views import RideView
+from .views import (
+    DriverDailyStatsView,
+    DriverLocationView,
+    DriverMonthlyStatsView,
+    RideView,
+)
 
 router = routers.DefaultRouter()
 router.register("ride", RideView, basename="ride")
+router.register(
+    "report/driver-monthly", DriverMonthlyStatsView, basename="driver-monthly-stats"
+)
+router.register(
+    "report/driver-daily", DriverDailyStatsView, basename="driver-daily-stats"
+)
+router.register("driver-location", DriverLocationView, basename="driver-location")
 
 urlpatterns = [
     path("", include(router.urls)),
@@ -1,19 +1,79 @@
-from django.db.models import Prefetch
-from django.utils.timezone import now, timedelta
-from rest_framework import viewsets
+from heapq import merge
+from operator import itemgetter
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db.models import Prefetch, Q
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import localdate, now, timedelta
+from rest_framework import serializers, viewsets
 from rest_framework.decorators import action
+from rest_framework.settings import api_settings
 
+from app_ride.archive import CombinedRides
+from app_ride.filters.driver_stats_filter import (
+    DriverDailyStatsFilter,
+    DriverMonthlyStatsFilter,
+)
 from app_ride.filters.ride_filter import RideFilter
-from app_ride.models import Ride, RideEvent
+from app_ride.heatmap import POINTS, Heatmap, snap_window
+from app_ride.models import (
+    ArchivedRide,
+    DriverDailyStats,
+    DriverLocation,
+    DriverMonthlyStats,
+    Ride,
+    RideChange,
+    RideCounter,
+    RideTrail,
+)
+from app_ride.models.ride_change import decode_cursor, encode_cursor
+from app_ride.serializers.driver_location import DriverLocationSerializer
+from app_ride.serializers.driver_stats import (
+    DriverDailyStatsSerializer,
+    DriverMonthlyStatsSerializer,
+)
 from app_ride.serializers.ride import (
+    ArchivedRideSerializer,
     RideCreateSerializer,
     RideDefaultSerializer,
     RideStatusUpdateSerializer,
     RideUpdateSerializer,
 )
+from app_ride.serializers.ride_trail import (
+    RideTrailAppendSerializer,
+    RideTrailSerializer,
+)
+from app_ride.sharding import (
+    ShardedRides,
+    database_for_id,
+    database_for_region,
+    ride_databases,
+)
+from app_ride.streams import (
+    driver_topic,
+    event_stream,
+    poll,
+    ride_message,
+    ride_topic,
+)
+from app_ride.trails import append_points, from_fixed_point, iter_points
+from utils.idempotency import idempotent
 from utils.mixins.rest_view_mixin import RestViewMixin
 from utils.pagination import StandardResultsSetPagination
 from utils.permissions import IsAdminUserRole
+from utils.pubsub import get_broker
+from utils.renderers import EventStreamRenderer, FastJSONRenderer, MessagePackRenderer
+from utils.singleflight import SingleFlight
+
+# Identical concurrent `RideView.list` queries share one database query.
+ride_list_flight = SingleFlight(
+    fresh=settings.LIST_COALESCE_FRESH_SECONDS,
+    stale=settings.LIST_COALESCE_STALE_SECONDS,
+    shared=settings.LIST_COALESCE_SHARED,
+)
 
 
 class RideView(RestViewMixin, viewsets.ModelViewSet):
@@ -24,6 +84,17 @@ class RideView(RestViewMixin, viewsets.ModelViewSet):
     serializer_class = RideDefaultSerializer
     filterset_class = RideFilter
     pagination_class = StandardResultsSetPagination
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, MessagePackRenderer]
+
+    # Columnar MessagePack list pages (see `MessagePackRenderer`): users are sent
+    # once in a side table, coordinates as fixed-point integers.
+    columnar_tables = {"rider": "users", "driver": "users"}
+    columnar_fixed_point = [
+        "pickup_latitude",
+        "pickup_longitude",
+        "dropoff_latitude",
+        "dropoff_longitude",
+    ]
 
     action_serializers = {
         "create": RideCreateSerializer,
@@ -50,7 +121,121 @@ class RideView(RestViewMixin, viewsets.ModelViewSet):
 
         Prefetches RideEvents
         """
-        queryset = super().get_queryset()
+        return self.pin_database(self.annotate_rides(super().get_queryset()))
+
+    def get_archived_queryset(self):
+        """Archived rides with the same annotations, filtered like the live ones."""
+        queryset = self.pin_database(self.annotate_rides(ArchivedRide.objects.all()))
+        return self.filterset_class(
+            self.request.GET, queryset=queryset, request=self.request
+        ).qs
+
+    def pin_database(self, queryset):
+        """On detail routes, read from the database whose id range holds the ride."""
+        if "pk" in self.kwargs:
+            return queryset.using(database_for_id(self.kwargs["pk"]))
+        return queryset
+
+    def list_databases(self, request):
+        """
+        Ride databases `list` reads: only the region's one with the `region` filter,
+        otherwise all of them. Coordinates only rank rides by distance, rides near
+        a border or stored under another region still belong in the list.
+        """
+        region = request.GET.get("region")
+        if region in settings.RIDE_REGIONS:
+            return [database_for_region(region)]
+        return ride_databases()
+
+    def rides_of(self, databases, live, archived=None):
+        """
+        `live` (and `archived`) rides of `databases` as one sequence to paginate,
+        a plain queryset when that is only the live rides of a single database.
+        """
+        if len(databases) == 1 and archived is None:
+            return live.using(databases[0])
+        parts = [
+            CombinedRides(
+                live.using(alias),
+                archived.using(alias) if archived is not None else None,
+            )
+            for alias in databases
+        ]
+        return parts[0] if len(parts) == 1 else ShardedRides(parts)
+
+    def include_archived(self):
+        return self.request.GET.get("include_archived", "").lower() in ("1", "true")
+
+    def get_throttle_cost(self, request):
+        """
+        Throttle budget consumed by the request (see `utils.throttling`), list
+        queries pay extra for distance scans, search and deep pages, batch reads
+        per chunk of ids.
+        """
+        if self.action == "batch":
+            try:
+                count = len(self.batch_ids(request))
+            except ValueError:
+                count = 0
+            return 1 + count // settings.RIDE_BATCH_IDS_PER_COST_UNIT
+        if self.action != "list":
+            return 1
+
+        weights = settings.RIDE_LIST_THROTTLE_COSTS
+        params = request.query_params
+        cost = 1
+        if params.get("current_latitude") and params.get("current_longitude"):
+            cost += weights["pickup_distance"]
+        ordering = params.get("ordering", "").split(",")
+        if any(field.strip().lstrip("-") == "distance" for field in ordering):
+            cost += weights["distance"]
+        if params.get("search"):
+            cost += weights["search"]
+
+        try:
+            page = max(int(params.get("page", 1)), 1)
+        except ValueError:
+            page = 1
+        skipped = (page - 1) * self.pagination_class().get_page_size(request)
+        return cost + weights["deep_page"] * (skipped // 1000)
+
+    def current_point(self, request):
+        """
+        `current_latitude`/`current_longitude`, None when missing or invalid.
+
+        Rounded to `LIST_COALESCE_COORDINATE_DECIMALS` places so nearby callers
+        send identical queries that `list` can coalesce.
+        """
+        current_lat = request.GET.get("current_latitude")
+        current_lng = request.GET.get("current_longitude")
+        if not (current_lat and current_lng):
+            return None
+        try:
+            decimals = settings.LIST_COALESCE_COORDINATE_DECIMALS
+            return round(float(current_lat), decimals), round(
+                float(current_lng), decimals
+            )
+        except ValueError:
+            # Invalid coordinates, fallback silently
+            return None
+
+    def list_coalescing_key(self, request):
+        """The normalized query: every parameter, sorted, with rounded coordinates."""
+        # The list does not depend on who asks, so the key is not per user.
+        params = {
+            key: request.GET.getlist(key)
+            for key in request.GET
+            if key not in ("current_latitude", "current_longitude")
+        }
+        point = self.current_point(request)
+        if point:
+            params["current_latitude"], params["current_longitude"] = (
+                [point[0]],
+                [point[1]],
+            )
+        return "ride-list?" + urlencode(sorted(params.items()), doseq=True)
+
+    def annotate_rides(self, queryset):
         request = getattr(self, "request", None)
 
         if not request:
@@ -58,29 +243,24 @@ class RideView(RestViewMixin, viewsets.ModelViewSet):
 
         ordering_param = request.GET.get("ordering", "")
         ordering_fields = [f.strip() for f in ordering_param.split(",") if f.strip()]
-        current_lat = request.GET.get("current_latitude")
-        current_lng = request.GET.get("current_longitude")
 
         # Annotate distance if requested
         if any(f.lstrip("-") == "distance" for f in ordering_fields):
             queryset = queryset.with_distance()
 
         # Annotate pickup_distance if coordinates are provided
-        if current_lat and current_lng:
-            try:
-                lat = float(current_lat)
-                lng = float(current_lng)
-                queryset = queryset.with_pickup_distance(lat, lng)
-            except ValueError:
-                # Invalid coordinates, fallback silently
-                pass
+        point = self.current_point(request)
+        if point:
+            queryset = queryset.with_pickup_distance(*point)
 
         # Prefetch only today's RideEvents (last 24 hours)
         last_24h = now() - timedelta(hours=24)
         queryset = queryset.prefetch_related(
             Prefetch(
                 "ride_events",
-                queryset=RideEvent.objects.filter(created_at__gte=last_24h),
+                queryset=queryset.model.ride_events.rel.related_model.objects.filter(
+                    created_at__gte=last_24h
+                ),
                 to_attr="todays_ride_events",
             )
         )
@@ -94,6 +274,9 @@ class RideView(RestViewMixin, viewsets.ModelViewSet):
             - search (str, rider__email, driver__email)
             - ordering (str, ["pk", "created_at", "status", "distance", "pickup_distance", "pickup_time"])
             - status (str) ["pending", "en-route", "pickup", "dropoff"]
+            - region (str) `RIDE_REGIONS` key
+            - zone (str) `ServiceZone` code, rides picked up inside the zone
+            - include_archived (bool) also list archived rides, defaults to false
             - page (int)
             - limit (int)
 
@@ -105,47 +288,190 @@ class RideView(RestViewMixin, viewsets.ModelViewSet):
             - It is the calculated distance from current location to the pickup location, useful for getting distance of driver's current distance.
             - It also enables ordering by `pickup_distance`
                 e.g https://localhost:8000/?current_latitude=7.449681&current_longitude=125.780084&ordering=-pickup_distance
+            3. Completed rides are moved to the archive after `RIDE_ARCHIVE_AFTER_DAYS` days,
+            archived rides have an `archived_at` value.
+            4. Identical concurrent list requests share one query, and a result may be
+            up to `LIST_COALESCE_STALE_SECONDS` old. `current_latitude` and `current_longitude`
+            are rounded to `LIST_COALESCE_COORDINATE_DECIMALS` decimal places.
+            5. Rides are stored per region (`RIDE_REGIONS`). `region` only reads that region's
+            database, otherwise every database is read and the results are merged in the
+            requested order.
         """
 
         try:
-            queryset = self.filter_queryset(self.get_queryset())
-
-            paginator = self.pagination_class()
-            page = paginator.paginate_queryset(queryset, request, view=self)
-            serializer = self.get_serializer(page, many=True)
-
+            page = ride_list_flight.do(
+                self.list_coalescing_key(request), lambda: self.list_page(request)
+            )
+            # the links point to this request's own host and parameters
             return self.RestResponse(
-                data=paginator.get_paginated_data(serializer.data),
+                data=self.pagination_class().get_shared_page_data(
+                    request, page["count"], page["page"], page["results"]
+                ),
                 status=200,
             )
 
         except Exception as ex:
             return self.RestResponse(errors=str(ex), status=400)
 
+    def list_page(self, request):
+        rides = self.rides_of(
+            self.list_databases(request),
+            self.filter_queryset(self.get_queryset()),
+            self.get_archived_queryset() if self.include_archived() else None,
+        )
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(rides, request, view=self)
+        if isinstance(rides, (CombinedRides, ShardedRides)):
+            data = [self.serialize_ride(ride) for ride in page]
+        else:
+            data = self.get_serializer(page, many=True).data
+
+        # shared with the identical requests coalesced on this one
+        return {
+            "count": paginator.page.paginator.count,
+            "page": paginator.page.number,
+            "results": data,
+        }
+
     def retrieve(self, request, *args, **kwargs):
         """
         Retrieve a Ride detail
         {id} refers to the Ride.id
+
+        - PARAMS:
+            - include_archived (bool) also look the Ride up in the archive, defaults to false
+        """
+        try:
+            try:
+                ride = self.get_object()
+            except Http404:
+                if not self.include_archived():
+                    raise
+                ride = get_object_or_404(self.get_archived_queryset(), pk=kwargs["pk"])
+
+            return self.RestResponse(data=self.serialize_ride(ride), status=200)
+        except Exception as ex:
+            return self.RestResponse(errors=str(ex), status=400)
+
+    @action(detail=False, methods=["get", "post"])
+    def batch(self, request, *args, **kwargs):
+        """
+        Retrieve many Rides by id at once
+
+        - PARAMS:
+            - ids (str) comma separated Ride ids, at most `RIDE_BATCH_MAX_IDS`
+            (or POST `{"ids": [...]}` for long lists)
+            - include_archived (bool) also look the Rides up in the archive, defaults to false
+
+        - RESULT:
+            - results (dict) Ride by id, `{"id": ..., "not_found": true}` for unknown ids
+            - not_found (list) the unknown ids
+
+        - NOTE:
+            1. One query per ride database with the rider and driver joined, and one
+            prefetch of the last 24 hours of RideEvents for all of them.
         """
         try:
+            ids = self.batch_ids(request)
+            by_database = {}
+            for pk in ids:
+                by_database.setdefault(database_for_id(pk), []).append(pk)
+
+            rides = {}
+            for alias, database_ids in by_database.items():
+                found = (
+                    self.get_queryset()
+                    .select_related("rider", "driver")
+                    .using(alias)
+                    .in_bulk(database_ids)
+                )
+                missing = [pk for pk in database_ids if pk not in found]
+                if missing and self.include_archived():
+                    found.update(
+                        self.get_archived_queryset()
+                        .select_related("rider", "driver")
+                        .using(alias)
+                        .in_bulk(missing)
+                    )
+                rides.update(found)
+
+            live = [
+                ride for ride in rides.values() if not isinstance(ride, ArchivedRide)
+            ]
+            archived = [
+                ride for ride in rides.values() if isinstance(ride, ArchivedRide)
+            ]
+            context = self.get_serializer_context()
+            serialized = {
+                ride["id"]: ride
+                for ride in [
+                    *self.get_serializer(live, many=True).data,
+                    *ArchivedRideSerializer(archived, many=True, context=context).data,
+                ]
+            }
+
+            not_found = [pk for pk in ids if pk not in serialized]
             return self.RestResponse(
-                data=self.get_serializer(self.get_object()).data, status=200
+                data={
+                    "results": {
+                        str(pk): serialized.get(pk) or {"id": pk, "not_found": True}
+                        for pk in ids
+                    },
+                    "not_found": not_found,
+                },
+                status=200,
             )
+
         except Exception as ex:
             return self.RestResponse(errors=str(ex), status=400)
 
+    def batch_ids(self, request):
+        """Unique ids of a `batch` request, in the order given."""
+        ids = request.data.get("ids") if request.method == "POST" else None
+        if ids is None:
+            ids = [pk for pk in request.GET.get("ids", "").split(",") if pk.strip()]
+        if not isinstance(ids, list):
+            raise ValueError("ids must be a list of Ride ids.")
+
+        try:
+            ids = list(dict.fromkeys(int(pk) for pk in ids))
+        except (TypeError, ValueError):
+            raise ValueError("ids must be integers.")
+        if not ids:
+            raise ValueError("ids is required.")
+        if len(ids) > settings.RIDE_BATCH_MAX_IDS:
+            raise ValueError(
+                f"At most {settings.RIDE_BATCH_MAX_IDS} ids are allowed per request."
+            )
+        return ids
+
+    def serialize_ride(self, ride):
+        if isinstance(ride, ArchivedRide):
+            return ArchivedRideSerializer(
+                ride, context=self.get_serializer_context()
+            ).data
+        return self.get_serializer(ride).data
+
+    @idempotent
     def create(self, request, *args, **kwargs):
         """
         Create Ride
 
         - REQUIRED:
             - rider (int, user__id) # non-admin user
-            - driver (int, user__id) # non-admin user
             - pickup_latitude (float)
             - pickup_longitude (float)
             - dropoff_latitude (float)
             - dropoff_longitude (float)
             - pickup_time (str, datetime)
+
+        - OPTIONAL:
+            - driver (int, user__id) # non-admin user, assigned by the dispatch engine when omitted
+
+        - NOTE:
+            - send an `Idempotency-Key` header to retry safely: a retry with the same key
+            returns the first response instead of creating another Ride
         """
         try:
             serializer = self.get_serializer(data=request.data)
@@ -193,10 +519,16 @@ class RideView(RestViewMixin, viewsets.ModelViewSet):
                 message="Invalid data", errors=serializer.errors, status=400
             )
 
+        except serializers.ValidationError as ex:
+            # checked again once the ride is locked, see `lock_ride`
+            return self.RestResponse(
+                message="Invalid data", errors=ex.detail, status=400
+            )
         except Exception as ex:
             return self.RestResponse(errors=str(ex), status=400)
 
     @action(detail=True, methods=["post"], url_path="set/en-route")
+    @idempotent
     def set_enroute(self, request, *args, **kwargs):
         """
         Update Ride's status to en-route
@@ -223,10 +555,16 @@ class RideView(RestViewMixin, viewsets.ModelViewSet):
                 message="Invalid data", errors=serializer.errors, status=400
             )
 
+        except serializers.ValidationError as ex:
+            # checked again once the ride is locked, see `lock_ride`
+            return self.RestResponse(
+                message="Invalid data", errors=ex.detail, status=400
+            )
         except Exception as ex:
             return self.RestResponse(errors=str(ex), status=400)
 
     @action(detail=True, methods=["post"], url_path="set/pickup")
+    @idempotent
     def set_pickup(self, request, *args, **kwargs):
         """
         Update Ride's status to pickup
@@ -253,10 +591,16 @@ class RideView(RestViewMixin, viewsets.ModelViewSet):
                 message="Invalid data", errors=serializer.errors, status=400
             )
 
+        except serializers.ValidationError as ex:
+            # checked again once the ride is locked, see `lock_ride`
+            return self.RestResponse(
+                message="Invalid data", errors=ex.detail, status=400
+            )
         except Exception as ex:
             return self.RestResponse(errors=str(ex), status=400)
 
     @action(detail=True, methods=["post"], url_path="set/dropoff")
+    @idempotent
     def set_dropoff(self, request, *args, **kwargs):
         """
         Update Ride's status to drop-off
@@ -283,6 +627,415 @@ class RideView(RestViewMixin, viewsets.ModelViewSet):
                 message="Invalid data", errors=serializer.errors, status=400
             )
 
+        except serializers.ValidationError as ex:
+            # checked again once the ride is locked, see `lock_ride`
+            return self.RestResponse(
+                message="Invalid data", errors=ex.detail, status=400
+            )
+        except Exception as ex:
+            return self.RestResponse(errors=str(ex), status=400)
+
+    @action(detail=True, methods=["get", "post"])
+    @idempotent
+    def trail(self, request, *args, **kwargs):
+        """
+        GPS breadcrumb trail of a Ride
+        {id} refers to the Ride.id
+
+        - POST BODY:
+            - points (list) `[latitude, longitude, unix seconds]` points, at most
+            `TRAIL_MAX_BATCH_POINTS` per request
+
+        - GET PARAMS:
+            - start (str, datetime) OPTIONAL, points from
+            - end (str, datetime) OPTIONAL, points until
+            - tolerance (float) OPTIONAL, simplify the trail for display: drop points
+            closer than this many meters to the simplified line (Douglas-Peucker)
+
+        - RESULT:
+            - point_count (int), distance_km (float) traveled along the whole trail
+            - points (list) `[latitude, longitude, unix seconds]`, GET only
+
+        - NOTE:
+            1. Points not after the trail's last point are skipped, so a retried batch is
+            not stored twice.
+            2. The trail is kept when the Ride is archived.
+        """
+        try:
+            ride_id = int(kwargs["pk"])
+            using = database_for_id(ride_id)
+
+            if request.method == "POST":
+                get_object_or_404(Ride.objects.using(using), pk=ride_id)
+                serializer = RideTrailAppendSerializer(data=request.data)
+                serializer.is_valid(raise_exception=True)
+                trail, appended = append_points(
+                    ride_id, serializer.validated_data["points"], using
+                )
+                return self.RestResponse(
+                    message=f"Appended {appended} points to the Ride's trail.",
+                    data={**RideTrailSerializer(trail).data, "appended": appended},
+                    status=200,
+                )
+
+            trail = RideTrail.objects.using(using).filter(ride_id=ride_id).first()
+            if trail is None:
+                if not (
+                    Ride.objects.using(using).filter(pk=ride_id).exists()
+                    or ArchivedRide.objects.using(using).filter(pk=ride_id).exists()
+                ):
+                    raise Http404("No Ride matches the given query.")
+                trail = RideTrail(ride_id=ride_id)
+
+            params = request.GET
+            start = parse_datetime(params["start"]) if params.get("start") else None
+            end = parse_datetime(params["end"]) if params.get("end") else None
+            tolerance = float(params.get("tolerance") or 0)
+            if tolerance < 0:
+                raise ValueError("tolerance must not be negative.")
+
+            points = [
+                point
+                for chunk in iter_points(ride_id, using, start, end, tolerance)
+                for point in from_fixed_point(chunk)
+            ]
+            return self.RestResponse(
+                data={**RideTrailSerializer(trail).data, "points": points}, status=200
+            )
+
+        except Exception as ex:
+            return self.RestResponse(errors=str(ex), status=400)
+
+    @action(detail=False, methods=["get"])
+    def upcoming(self, request, *args, **kwargs):
+        """
+        Rides not yet picked up whose pickup_time is approaching, soonest first
+
+        - PARAMS:
+            - within (int) minutes ahead to look, max 1440, defaults to 60
+            - page (int)
+            - limit (int)
+        """
+        try:
+            within = max(1, min(int(request.GET.get("within", 60)), 24 * 60))
+            start = now()
+            queryset = (
+                self.get_queryset()
+                .select_related("rider", "driver")
+                .upcoming(start=start, end=start + timedelta(minutes=within))
+            )
+
+            paginator = self.pagination_class()
+            page = paginator.paginate_queryset(
+                self.rides_of(ride_databases(), queryset), request, view=self
+            )
+            serializer = self.get_serializer(page, many=True)
+
+            return self.RestResponse(
+                data=paginator.get_paginated_data(serializer.data),
+                status=200,
+            )
+
+        except Exception as ex:
+            return self.RestResponse(errors=str(ex), status=400)
+
+    @action(detail=False, methods=["get"])
+    def changes(self, request, *args, **kwargs):
+        """
+        Incremental change feed of Rides
+
+        - PARAMS:
+            - cursor (str) returned by the previous call, omit it to get the current head
+            - limit (int) max changes to consume, max 500, defaults to 100
+
+        - RESULT:
+            - results (list) current state of every changed Ride, or `{"id": ..., "deleted": true}`
+            - cursor (str) pass it to the next call
+            - has_more (bool) call again right away when true
+
+        - NOTE:
+            1. Start by calling without `cursor`, then list the Rides, then keep calling
+            with the returned cursor to receive only the Rides changed since.
+            2. Changes appear once their transaction has finished, so a write committing out
+            of sequence order is delivered late rather than skipped.
+            3. A cursor older than the pruned changes (see `prune_ride_changes`) gets a
+            410, start over without `cursor` and list the Rides again.
+        """
+        try:
+            cursor = request.GET.get("cursor")
+            limit = max(1, min(int(request.GET.get("limit", 100)), 500))
+            databases = ride_databases()
+
+            if not cursor:
+                return self.RestResponse(
+                    data={
+                        "results": [],
+                        "cursor": encode_cursor(
+                            {
+                                alias: RideChange.objects.using(alias).settled().head()
+                                for alias in databases
+                            }
+                        ),
+                        "has_more": False,
+                    },
+                    status=200,
+                )
+
+            positions = decode_cursor(cursor)
+            for alias in databases:
+                pruned = RideChange.objects.using(alias).pruned_until()
+                if pruned and pruned > positions.get(alias, (0, 0)):
+                    return self.RestResponse(
+                        errors="Cursor expired, changes since were pruned.",
+                        status=410,
+                    )
+
+            # Each ride database has its own feed: merge them by time, each one
+            # consumed in (txid, seq) order so its position in the cursor stays exact.
+            fetched = [
+                [
+                    (created_at, alias, (txid, seq), ride_id, kind)
+                    for txid, seq, ride_id, kind, created_at in RideChange.objects.using(
+                        alias
+                    )
+                    .settled()
+                    .after(positions.get(alias, (0, 0)))
+                    .values_list("txid", "seq", "ride_id", "kind", "created_at")[
+                        : limit + 1
+                    ]
+                ]
+                for alias in databases
+            ]
+            has_more = sum(map(len, fetched)) > limit
+            changes = list(merge(*fetched, key=itemgetter(0)))[:limit]
+            for _, alias, position, _, _ in changes:
+                positions[alias] = position
+
+            # several changes of the same Ride collapse into its current state
+            ride_ids = list(
+                dict.fromkeys(
+                    (alias, ride_id)
+                    for _, alias, _, ride_id, kind in changes
+                    if kind != RideChange.PRUNED
+                )
+            )
+            rides = {}
+            for alias in databases:
+                ids = [
+                    ride_id for ride_alias, ride_id in ride_ids if ride_alias == alias
+                ]
+                if not ids:
+                    continue
+                found = self.get_queryset().using(alias).in_bulk(ids)
+                missing = [ride_id for ride_id in ids if ride_id not in found]
+                if missing:
+                    # archived since the change, still a ride rather than a deletion
+                    found.update(
+                        self.annotate_rides(ArchivedRide.objects.using(alias)).in_bulk(
+                            missing
+                        )
+                    )
+                rides.update(found)
+            results = [
+                self.serialize_ride(rides[ride_id])
+                if ride_id in rides
+                else {"id": ride_id, "deleted": True}
+                for _, ride_id in ride_ids
+            ]
+
+            return self.RestResponse(
+                data={
+                    "results": results,
+                    "cursor": encode_cursor(positions) if changes else cursor,
+                    "has_more": has_more,
+                },
+                status=200,
+            )
+
+        except Exception as ex:
+            return self.RestResponse(errors=str(ex), status=400)
+
+    @action(detail=False, methods=["get"])
+    def summary(self, request, *args, **kwargs):
+        """
+        Dashboard summary of Rides
+
+        - RESULT:
+            - status (dict) ride count per status
+            - active_rides_per_driver (dict) non-dropoff ride count per driver__id
+            - created_today (int)
+
+        - NOTE:
+            1. Served from counters maintained on every Ride write, a single small query
+            per ride database regardless of the number of rides (summing the
+            `RIDE_COUNTER_SLOTS` rows of each counter).
+        """
+        try:
+            counters = (
+                RideCounter.objects.filter(
+                    Q(scope__in=[RideCounter.STATUS, RideCounter.ACTIVE_DRIVER])
+                    | Q(scope=RideCounter.CREATED_DAY, key=localdate().isoformat())
+                )
+                .totals()
+                .filter(total__gt=0)
+                .values_list("scope", "key", "total")
+            )
+
+            data = {
+                "status": {status: 0 for status in Ride.STATUS_PROGRESSION},
+                "active_rides_per_driver": {},
+                "created_today": 0,
+            }
+            # each ride database counts its own rides
+            per_driver = data["active_rides_per_driver"]
+            for alias in ride_databases():
+                for scope, key, value in counters.using(alias):
+                    if scope == RideCounter.STATUS:
+                        data["status"][key] += value
+                    elif scope == RideCounter.ACTIVE_DRIVER:
+                        per_driver[int(key)] = per_driver.get(int(key), 0) + value
+                    else:
+                        data["created_today"] += value
+
+            return self.RestResponse(data=data, status=200)
+
+        except Exception as ex:
+            return self.RestResponse(errors=str(ex), status=400)
+
+    @action(detail=False, methods=["get"])
+    def heatmap(self, request, *args, **kwargs):
+        """
+        Pickup or dropoff density of Rides, aggregated into grid cells
+
+        - PARAMS:
+            - zoom (int) 0 to `HEATMAP_MAX_ZOOM`, a tile spans 360 / 2**zoom degrees
+            - bbox (str) "south,west,north,east", defaults to the whole map
+            - point (str) ["pickup", "dropoff"], defaults to "pickup"
+            - start (str, datetime) pickup_time from, defaults to `HEATMAP_DEFAULT_WINDOW_HOURS` ago
+            - end (str, datetime) pickup_time until, defaults to now
+            - status (str) ["pending", "en-route", "pickup", "dropoff"]
+
+        - RESULT:
+            - cells (list) `[cell id, ride count, centroid latitude, centroid longitude]`
+            of every non empty cell, the cell id is "column:row" on a grid of `cell_size`
+            degrees starting at latitude -90, longitude -180
+
+        - NOTE:
+            1. Counted with a GROUP BY per tile of `HEATMAP_TILE_CELLS`² cells, each tile
+            is cached for `HEATMAP_CACHE_SECONDS`. The window is widened to whole
+            `HEATMAP_WINDOW_STEP_SECONDS` steps so nearby requests share cached tiles.
+        """
+        try:
+            params = request.GET
+            if not params.get("zoom"):
+                raise ValueError("zoom is required.")
+            zoom = int(params["zoom"])
+            if not 0 <= zoom <= settings.HEATMAP_MAX_ZOOM:
+                raise ValueError(
+                    f"zoom must be between 0 and {settings.HEATMAP_MAX_ZOOM}."
+                )
+            point = params.get("point", "pickup")
+            if point not in POINTS:
+                raise ValueError(f"point must be one of {', '.join(POINTS)}.")
+            status = params.get("status") or None
+            if status and status not in Ride.STATUS_PROGRESSION:
+                raise ValueError(
+                    f"status must be one of {', '.join(Ride.STATUS_PROGRESSION)}."
+                )
+
+            end = parse_datetime(params["end"]) if params.get("end") else now()
+            start = (
+                parse_datetime(params["start"])
+                if params.get("start")
+                else end - timedelta(hours=settings.HEATMAP_DEFAULT_WINDOW_HOURS)
+            )
+            if start is None or end is None or start >= end:
+                raise ValueError(
+                    "start and end must be datetimes with start before end."
+                )
+            start, end = snap_window(start, end)
+
+            bbox = params.get("bbox", "-90,-180,90,180").split(",")
+            if len(bbox) != 4:
+                raise ValueError('bbox must be "south,west,north,east".')
+            south, west, north, east = map(float, bbox)
+
+            heatmap = Heatmap(
+                zoom=zoom, point=point, start=start, end=end, status=status
+            )
+            return self.RestResponse(
+                data={
+                    "zoom": zoom,
+                    "point": point,
+                    "start": start,
+                    "end": end,
+                    "cell_size": heatmap.cell_size,
+                    "cells": heatmap.cells(heatmap.tiles(south, west, north, east)),
+                },
+                status=200,
+            )
+
+        except Exception as ex:
+            return self.RestResponse(errors=str(ex), status=400)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[FastJSONRenderer, EventStreamRenderer],
+    )
+    def stream(self, request, *args, **kwargs):
+        """
+        Stream Ride status changes and new RideEvents (Server-Sent Events)
+
+        - PARAMS (one of):
+            - ride (int, ride__id)
+            - driver (int, user__id) all rides of the driver
+
+        - OPTIONAL:
+            - mode (str) ["sse", "poll"], defaults to "sse"
+            - timeout (int) long-poll wait in seconds, max 60, defaults to 25
+
+        - NOTE:
+            1. SSE sends a `status` event with the ride's current status first when
+            streaming a single ride, then `status` and `event` events as they happen.
+            The stream closes after a few minutes and clients reconnect automatically.
+            2. `mode=poll` waits until something changes (or `timeout`) and returns
+            the changes as a regular response, for clients without SSE support.
+        """
+        try:
+            ride_id = request.GET.get("ride")
+            driver_id = request.GET.get("driver")
+
+            if ride_id:
+                ride_id = int(ride_id)
+                # subscribe before reading the ride, so a change committed in
+                # between is queued instead of lost
+                subscription = get_broker().subscribe(ride_topic(ride_id))
+                try:
+                    ride = Ride.objects.using(database_for_id(ride_id)).get(pk=ride_id)
+                except Exception:
+                    subscription.close()
+                    raise
+                initial = [ride_message(ride)]
+            elif driver_id:
+                subscription = get_broker().subscribe(driver_topic(int(driver_id)))
+                initial = []
+            else:
+                return self.RestResponse(
+                    errors="Either `ride` or `driver` is required.", status=400
+                )
+
+            if request.GET.get("mode") == "poll":
+                timeout = min(int(request.GET.get("timeout", 25)), 60)
+                return self.RestResponse(data=poll(subscription, timeout), status=200)
+
+            response = StreamingHttpResponse(
+                event_stream(subscription, initial), content_type="text/event-stream"
+            )
+            response["Cache-Control"] = "no-cache"
+            response["X-Accel-Buffering"] = "no"
+            return response
+
         except Exception as ex:
             return self.RestResponse(errors=str(ex), status=400)
 
@@ -302,3 +1055,121 @@ class RideView(RestViewMixin, viewsets.ModelViewSet):
 
         except Exception as ex:
             return self.RestResponse(errors=str(ex), status=400)
+
+
+class DriverMonthlyStatsView(RestViewMixin, viewsets.GenericViewSet):
+    """
+    Trip reports served from the incrementally maintained driver rollups,
+    never from the ride or event tables.
+    """
+
+    queryset = DriverMonthlyStats.objects.select_related("driver")
+
+    http_method_names = ["get"]
+    permission_classes = [IsAdminUserRole]
+    serializer_class = DriverMonthlyStatsSerializer
+    filterset_class = DriverMonthlyStatsFilter
+    pagination_class = StandardResultsSetPagination
+
+    ordering_fields = [
+        "period",
+        "trips_completed",
+        "trips_over_1h",
+        "total_trip_seconds",
+        "total_pickup_wait_seconds",
+    ]
+    ordering = ["period", "driver"]
+
+    def list(self, request, *args, **kwargs):
+        """
+        Monthly trip report per driver
+
+        - PARAMS:
+            - driver (int, user__id)
+            - period (str, date) first day of the month, e.g. 2025-10-01
+            - period_from (str, date)
+            - period_to (str, date)
+            - ordering (str, ["period", "trips_completed", "trips_over_1h", "total_trip_seconds", "total_pickup_wait_seconds"])
+            - page (int)
+            - limit (int)
+
+        - NOTE:
+            1. Trip duration is measured from the pickup to the dropoff transition.
+            2. Pickup wait is measured from the en-route to the pickup transition.
+        """
+        try:
+            queryset = self.filter_queryset(self.get_queryset())
+
+            paginator = self.pagination_class()
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            serializer = self.get_serializer(page, many=True)
+
+            return self.RestResponse(
+                data=paginator.get_paginated_data(serializer.data),
+                status=200,
+            )
+
+        except Exception as ex:
+            return self.RestResponse(errors=str(ex), status=400)
+
+
+class DriverDailyStatsView(DriverMonthlyStatsView):
+    """Daily variant of `DriverMonthlyStatsView`."""
+
+    queryset = DriverDailyStats.objects.select_related("driver")
+
+    serializer_class = DriverDailyStatsSerializer
+    filterset_class = DriverDailyStatsFilter
+
+    def list(self, request, *args, **kwargs):
+        """
+        Daily trip report per driver
+
+        - PARAMS:
+            - driver (int, user__id)
+            - period (str, date)
+            - period_from (str, date)
+            - period_to (str, date)
+            - ordering (str, ["period", "trips_completed", "trips_over_1h", "total_trip_seconds", "total_pickup_wait_seconds"])
+            - page (int)
+            - limit (int)
+        """
+        return super().list(request, *args, **kwargs)
+
+
+class DriverLocationView(RestViewMixin, viewsets.GenericViewSet):
+    """Driver positions and availability consumed by the dispatch engine."""
+
+    queryset = DriverLocation.objects.all()
+
+    http_method_names = ["post"]
+    permission_classes = [IsAdminUserRole]
+    serializer_class = DriverLocationSerializer
+
+    def create(self, request, *args, **kwargs):
+        """
+        Report a driver's position
+
+        - BODY:
+            - driver (int, user__id) REQUIRED
+            - latitude (float) REQUIRED
+            - longitude (float) REQUIRED
+            - is_available (bool) OPTIONAL, defaults to true
+
+        - NOTE:
+            1. The driver's previous position is replaced.
+            2. Positions older than `DISPATCH_LOCATION_MAX_AGE` seconds are ignored by dispatch.
+        """
+        try:
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+
+            return self.RestResponse(
+                message="Successfully updated the driver location.",
+                data=serializer.data,
+                status=200,
+            )
+
+        except Exception as ex:
+            return self.RestResponse(errors=str(ex), status=400)
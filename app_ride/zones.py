@@ -0,0 +1,245 @@
+"""
+Service zone lookups on an in-memory copy of the active `ServiceZone` polygons.
+
+Each process keeps the polygons as numpy vertex arrays with their bounding
+boxes and reloads them every `SERVICE_ZONE_CACHE_SECONDS`, or right away when
+a zone is saved or deleted in that process. Point-in-polygon tests run on whole
+arrays of points at once: a point first has to be inside the bounding box, then
+an even-odd ray cast over the polygon edges decides.
+
+A ride has a `RideZone` row for every zone containing its pickup point, so
+overlapping zones each match it and filtering by zone is an indexed lookup.
+Rides get their rows when they are saved with a new pickup point or imported,
+and every ride database is retagged against a zone when it is saved, so rides
+created before the zone (or before its last edit) match without a backfill.
+Rides created while other processes may still have held the zone's previous
+polygons are prefiltered by bounding box in SQL and tested exactly instead.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from app_ride.models import ArchivedRide, Ride, RideZone, ServiceZone
+from app_ride.sharding import ride_databases
+
+
+@dataclass(frozen=True)
+class Zone:
+    id: int
+    code: str
+    # (south, west, north, east)
+    bounds: tuple[float, float, float, float]
+    # (n, 2) array of (latitude, longitude) vertices
+    vertices: np.ndarray
+    updated_at: datetime
+
+    @classmethod
+    def from_model(cls, zone: ServiceZone) -> Zone:
+        return cls(
+            id=zone.pk,
+            code=zone.code,
+            bounds=(
+                zone.min_latitude,
+                zone.min_longitude,
+                zone.max_latitude,
+                zone.max_longitude,
+            ),
+            vertices=np.asarray(zone.polygon, dtype=np.float64),
+            updated_at=zone.updated_at,
+        )
+
+    def contains(self, latitudes, longitudes) -> np.ndarray:
+        """Boolean mask of the points inside the zone."""
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        south, west, north, east = self.bounds
+        inside = (
+            (latitudes >= south)
+            & (latitudes <= north)
+            & (longitudes >= west)
+            & (longitudes <= east)
+        )
+        if inside.any():
+            inside[inside] = points_in_polygon(
+                latitudes[inside], longitudes[inside], self.vertices
+            )
+        return inside
+
+
+def points_in_polygon(latitudes, longitudes, vertices) -> np.ndarray:
+    """
+    Even-odd ray cast of every point against the polygon, one edge at a time.
+
+    A point is inside when a ray going east from it crosses the polygon edges
+    an odd number of times.
+    """
+    inside = np.zeros(len(latitudes), dtype=bool)
+    previous = vertices[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for vertex in vertices:
+            (lat1, lng1), (lat2, lng2) = previous, vertex
+            spans = (lat1 > latitudes) != (lat2 > latitudes)
+            # longitude where the edge crosses the point's latitude, nan on flat edges
+            crossing = lng1 + (latitudes - lat1) * (lng2 - lng1) / (lat2 - lat1)
+            inside ^= spans & (longitudes < crossing)
+            previous = vertex
+    return inside
+
+
+_zones: Optional[dict[str, Zone]] = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def get_zones() -> dict[str, Zone]:
+    """Active zones by code, reloaded every `SERVICE_ZONE_CACHE_SECONDS`."""
+    global _zones, _loaded_at
+    if (
+        _zones is None
+        or time.monotonic() - _loaded_at > settings.SERVICE_ZONE_CACHE_SECONDS
+    ):
+        with _lock:
+            if (
+                _zones is None
+                or time.monotonic() - _loaded_at > settings.SERVICE_ZONE_CACHE_SECONDS
+            ):
+                _zones = load_zones()
+                _loaded_at = time.monotonic()
+    return _zones
+
+
+def load_zones() -> dict[str, Zone]:
+    return {
+        zone.code: Zone.from_model(zone)
+        for zone in ServiceZone.objects.filter(is_active=True).order_by("code")
+    }
+
+
+def clear_zones() -> None:
+    global _zones
+    with _lock:
+        _zones = None
+
+
+def ride_zones(ride_ids, latitudes, longitudes, zones=None) -> list[RideZone]:
+    """
+    `RideZone` rows of the rides, one per zone (active zones by default)
+    containing the pickup point.
+    """
+    ride_ids = np.asarray(ride_ids, dtype=np.int64)
+    rows = []
+    for zone in get_zones().values() if zones is None else zones:
+        rows.extend(
+            RideZone(ride_id=int(ride_id), zone_id=zone.id)
+            for ride_id in ride_ids[zone.contains(latitudes, longitudes)]
+        )
+    return rows
+
+
+def tag_rides(ride_ids, latitudes, longitudes, using: str) -> None:
+    """Replace the zone rows of the rides with the zones containing their pickup point."""
+    rides = RideZone.objects.using(using)
+    rides.filter(ride_id__in=ride_ids).delete()
+    # a zone being retagged at the same time may have added some rows already
+    rides.bulk_create(
+        ride_zones(ride_ids, latitudes, longitudes),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def tag_zone(zone: Zone, using: str, batch_size: int = 5000) -> int:
+    """
+    Rebuild the rows of a zone on a ride database, returns how many rides it contains.
+
+    Live and archived rides inside the zone's bounding box are tested against
+    its polygon in batches of `batch_size`.
+    """
+    south, west, north, east = zone.bounds
+    tagged = 0
+    with transaction.atomic(using=using):
+        untag_zone(zone.id, using)
+        for model in (Ride, ArchivedRide):
+            rides = (
+                model.objects.using(using)
+                .filter(
+                    pickup_latitude__range=(south, north),
+                    pickup_longitude__range=(west, east),
+                )
+                .order_by("pk")
+            )
+            last_pk = 0
+            while True:
+                batch = list(
+                    rides.filter(pk__gt=last_pk).values_list(
+                        "pk", "pickup_latitude", "pickup_longitude"
+                    )[:batch_size]
+                )
+                if not batch:
+                    break
+                last_pk = batch[-1][0]
+                rows = ride_zones(*zip(*batch), zones=[zone])
+                RideZone.objects.using(using).bulk_create(
+                    rows, batch_size=1000, ignore_conflicts=True
+                )
+                tagged += len(rows)
+    return tagged
+
+
+def untag_zone(zone_id: int, using: str) -> None:
+    RideZone.objects.using(using).filter(zone_id=zone_id).delete()
+
+
+def retag_zone(zone: ServiceZone) -> None:
+    """Rebuild the rows of a saved zone on every ride database."""
+    zone = Zone.from_model(zone)
+    for alias in ride_databases():
+        tag_zone(zone, alias)
+
+
+def rides_in_zone(queryset, code: str):
+    """
+    Rides (or archived rides) of `queryset` whose pickup point is in the zone.
+
+    Rides match on their `RideZone` rows, except the ones created around the
+    zone's last change, when processes could still tag rides with its previous
+    polygons: those are prefiltered by its bounding box and tested exactly here,
+    on every ride database unless the queryset has one.
+    """
+    zone = get_zones().get(code)
+    if zone is None:
+        return queryset.none()
+
+    south, west, north, east = zone.bounds
+    stale = timedelta(seconds=settings.SERVICE_ZONE_CACHE_SECONDS)
+    recent = Q(created_at__range=(zone.updated_at - stale, zone.updated_at + stale))
+    candidates = (
+        queryset.filter(
+            recent,
+            pickup_latitude__range=(south, north),
+            pickup_longitude__range=(west, east),
+        )
+        .order_by()
+        .values_list("pk", "pickup_latitude", "pickup_longitude")
+    )
+
+    ids = []
+    for alias in [queryset.db] if queryset._db else ride_databases():
+        rows = list(candidates.using(alias))
+        if rows:
+            pks, latitudes, longitudes = zip(*rows)
+            inside = zone.contains(latitudes, longitudes)
+            ids.extend(pk for pk, keep in zip(pks, inside) if keep)
+
+    members = RideZone.objects.filter(zone_id=zone.id).values("ride_id")
+    return queryset.filter((~recent & Q(pk__in=members)) | Q(pk__in=ids))
@@ -6,5 +6,18 @@ from app_user.models import User
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
     list_display = ["id", "email", "role", "is_active", "is_staff", "is_superuser"]
-    search_fields = ["email"]
+    search_fields = ["^email"]  # prefix search, served by the UPPER(email) index
     list_filter = ["role"]
+    ordering = ["id"]
+
+    def get_search_results(self, request, queryset, search_term):
+        queryset, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+
+        # Ride and driver location autocompletes only offer basic users.
+        if request.GET.get("app_label") == "app_ride" and request.GET.get(
+            "model_name"
+        ) in ("ride", "driverlocation"):
+            queryset = queryset.exclude(role="admin")
+        return queryset, may_have_duplicates
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    # Matches the `UPPER("email"::text) LIKE UPPER('term%')` that Django emits for
+    # `email__istartswith` (admin `^email` search) on PostgreSQL.
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS app_user_email_upper_like "
+            "ON app_user_user (UPPER(email::text) text_pattern_ops)"
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS app_user_email_upper_like")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app_user", "0003_user_groups_user_is_superuser_user_user_permissions"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
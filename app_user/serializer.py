@@ -1,4 +1,4 @@
-from django.contrib.auth import get_user_model
+from django.contrib.auth import authenticate, get_user_model
 from rest_framework import serializers
 
 User = get_user_model()
@@ -18,3 +18,22 @@ class UserDefaultSerializer(serializers.ModelSerializer):
             "role",
             "is_active",
         ]
+
+
+class TokenObtainSerializer(serializers.Serializer):
+    """Validates credentials for issuing an API token."""
+
+    email = serializers.EmailField()
+    password = serializers.CharField(write_only=True, trim_whitespace=False)
+
+    def validate(self, attrs):
+        user = authenticate(
+            self.context.get("request"),
+            email=attrs["email"],
+            password=attrs["password"],
+        )
+        if user is None:
+            raise serializers.ValidationError("Invalid email or password.")
+
+        attrs["user"] = user
+        return attrs
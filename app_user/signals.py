@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app_user.models import User
+from utils.authentication import principal_cache
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_principal(sender, instance, **kwargs):
+    principal_cache.invalidate(instance.pk)
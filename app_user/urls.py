@@ -0,0 +1,11 @@
+"""
+APP_USER URLS
+"""
+
+from django.urls import path
+
+from .views import TokenView
+
+urlpatterns = [
+    path("auth/token/", TokenView.as_view(), name="auth-token"),
+]
@@ -1 +1,46 @@
-# Create your views here.
+from django.conf import settings
+from rest_framework import generics, permissions
+
+from app_user.serializer import TokenObtainSerializer, UserDefaultSerializer
+from utils.authentication import issue_token
+from utils.mixins.rest_view_mixin import RestViewMixin
+
+
+class TokenView(RestViewMixin, generics.GenericAPIView):
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    serializer_class = TokenObtainSerializer
+
+    def post(self, request, *args, **kwargs):
+        """
+        Obtain an API token
+
+        - REQUIRED:
+            - email (str)
+            - password (str)
+
+        - NOTE:
+            1. Send the token as `Authorization: Token <token>` on subsequent requests.
+            2. Tokens expire after `expires_in` seconds and are revoked by a password change.
+        """
+        try:
+            serializer = self.get_serializer(data=request.data)
+
+            if serializer.is_valid():
+                user = serializer.validated_data["user"]
+                return self.RestResponse(
+                    message="Successfully issued a token.",
+                    data={
+                        "token": issue_token(user),
+                        "expires_in": settings.AUTH_TOKEN_MAX_AGE,
+                        "user": UserDefaultSerializer(user).data,
+                    },
+                    status=200,
+                )
+
+            return self.RestResponse(
+                message="Invalid data", errors=serializer.errors, status=400
+            )
+
+        except Exception as ex:
+            return self.RestResponse(errors=str(ex), status=400)
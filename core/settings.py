@@ -104,6 +104,36 @@ DATABASES = {
     }
 }
 
+# Region sharding of rides (see app_ride.sharding). Every alias in RIDE_SHARDS
+# must be in DATABASES, prepare new ones with `manage.py setup_ride_shards`.
+DATABASE_ROUTERS = ["app_ride.sharding.RideShardRouter"]
+# Database alias -> shard number, never renumber a shard holding rides: ride and
+# ride event ids of shard N start at N * RIDE_SHARD_ID_SPAN.
+RIDE_SHARDS = {"default": 0}
+RIDE_SHARD_ID_SPAN = 10**12
+# Region key -> database alias and (south, west, north, east) bounds of its
+# pickups, e.g. {"davao": {"database": "davao", "bounds": (6.9, 125.2, 7.4, 125.7)}}.
+# Rides outside every region are stored in "default".
+RIDE_REGIONS = {}
+# Seconds each process keeps the ServiceZone polygons before reloading them.
+SERVICE_ZONE_CACHE_SECONDS = 60
+
+# `RideView.heatmap`: a tile at zoom z spans 360 / 2**z degrees and is split into
+# HEATMAP_TILE_CELLS x HEATMAP_TILE_CELLS cells, each tile is cached on its own.
+HEATMAP_TILE_CELLS = 16
+HEATMAP_MAX_ZOOM = 16
+# Tiles one request may cover, bounds the GROUP BY queries of a cold cache.
+HEATMAP_MAX_TILES = 64
+HEATMAP_CACHE_SECONDS = 60
+# Windows are widened to whole steps so nearby requests share cached tiles.
+HEATMAP_WINDOW_STEP_SECONDS = 300
+HEATMAP_DEFAULT_WINDOW_HOURS = 24
+
+# GPS trails (see app_ride.trails): points per stored segment blob, and per
+# appended batch.
+TRAIL_SEGMENT_POINTS = 512
+TRAIL_MAX_BATCH_POINTS = 1000
+
 AUTH_USER_MODEL = "app_user.User"
 
 # Password validation
@@ -130,13 +160,120 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly"
     ],
+    # Signed tokens first so token requests never touch the session table.
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "utils.authentication.SignedTokenAuthentication",
+        "rest_framework.authentication.SessionAuthentication",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,  # default limit if not specified
+    "DEFAULT_RENDERER_CLASSES": [
+        "utils.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
         "rest_framework.filters.OrderingFilter",
     ],
+    # Cost units per user (or client IP) and view action, see utils.throttling.
+    # "<ViewClass>.<action>" entries override the "user" and "anon" defaults.
+    "DEFAULT_THROTTLE_CLASSES": ["utils.throttling.WeightedRateThrottle"],
+    "DEFAULT_THROTTLE_RATES": {
+        "user": "1200/min",
+        "anon": "120/min",
+        "RideView.list": "600/min",
+    },
+}
+
+# Extra throttle cost units of a `RideView.list` request on top of 1
+RIDE_LIST_THROTTLE_COSTS = {
+    "pickup_distance": 4,  # current_latitude/current_longitude given
+    "distance": 2,  # ordering by distance
+    "search": 2,  # email search
+    "deep_page": 1,  # per 1000 rows skipped by the page
+}
+# Ids one `RideView.batch` request may read, it costs 1 throttle unit per
+# RIDE_BATCH_IDS_PER_COST_UNIT ids.
+RIDE_BATCH_MAX_IDS = 500
+RIDE_BATCH_IDS_PER_COST_UNIT = 50
+
+# Identical concurrent ride list requests share one query (see utils.singleflight).
+# A finished result is reused for FRESH seconds, then served stale for up to
+# STALE seconds while one request refreshes it. SHARED also coalesces across
+# worker processes through the default cache.
+LIST_COALESCE_FRESH_SECONDS = 0.5
+LIST_COALESCE_STALE_SECONDS = 2
+LIST_COALESCE_SHARED = False
+LIST_COALESCE_COORDINATE_DECIMALS = 3  # ~100 m, nearby drivers share a query
+
+# Shared by all worker processes for throttling, e.g. CACHE_URL=rediscache://redis:6379/1
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
+# Idempotency-Key replays (see utils.idempotency): the cache holding the first
+# response of each key, how long it is kept (seconds), how long a request holds
+# its key while running, and the longest key accepted.
+IDEMPOTENCY_CACHE = "default"
+IDEMPOTENCY_TTL = 60 * 60 * 24
+IDEMPOTENCY_LOCK_SECONDS = 30
+IDEMPOTENCY_MAX_KEY_LENGTH = 255
+
+# Signed API tokens (see utils.authentication)
+AUTH_TOKEN_MAX_AGE = 60 * 60 * 24  # seconds
+AUTH_PRINCIPAL_CACHE_SIZE = 1024  # users kept in memory per process
+AUTH_PRINCIPAL_CACHE_TTL = 60  # seconds, bounds staleness across processes
+
+# Pub/sub broker used to push ride changes to streaming clients.
+# `utils.pubsub.InMemoryBroker` works within a single process (tests, local runs).
+PUBSUB_BROKER = "utils.pubsub.PostgresBroker"
+
+# Rows each dashboard counter (see app_ride.models.RideCounter) is spread over,
+# concurrent ride writes update different rows instead of queueing on one lock.
+RIDE_COUNTER_SLOTS = 16
+
+# Ride change feed entries older than this are deleted by
+# `manage.py prune_ride_changes`, clients with an older cursor must resync.
+RIDE_CHANGES_RETENTION_DAYS = 7
+
+# Callbacks fired by `manage.py run_pickup_scheduler`, {dotted path: seconds before pickup}
+PICKUP_SCHEDULER_JOBS = {
+    "app_ride.scheduler.send_pickup_reminder": 15 * 60,
+}
+
+# Side effects of ride status changes run by `manage.py run_ride_outbox`
+# (see app_ride.outbox), {dotted path: statuses they run on}.
+RIDE_OUTBOX_HANDLERS = {
+    "app_ride.outbox.record_driver_stats": ["dropoff"],
 }
+# Messages claimed per query, seconds a claimed message stays hidden from other
+# workers, retry backoff bounds in seconds, and attempts before a message is
+# marked dead.
+RIDE_OUTBOX_BATCH_SIZE = 100
+RIDE_OUTBOX_LEASE_SECONDS = 60
+RIDE_OUTBOX_RETRY_BASE_SECONDS = 5
+RIDE_OUTBOX_RETRY_MAX_SECONDS = 60 * 60
+RIDE_OUTBOX_MAX_ATTEMPTS = 10
+
+# Completed rides older than this are moved to the archive tables by
+# `manage.py archive_rides`, keeping the live ride tables small.
+RIDE_ARCHIVE_AFTER_DAYS = 90
+
+# RideEvent monthly partitions on PostgreSQL (see app_ride.partitions):
+# created this many months ahead by `manage.py create_event_partitions`,
+# dropped after this many months by `manage.py prune_event_partitions`.
+RIDE_EVENT_PARTITIONS_AHEAD = 3
+RIDE_EVENT_RETENTION_MONTHS = 24
+
+# Batch dispatch (see app_ride.dispatch)
+DISPATCH_MAX_DISTANCE_KM = 10  # drivers farther from the pickup are never assigned
+DISPATCH_LOCATION_MAX_AGE = 120  # seconds, older driver positions count as offline
+DISPATCH_OPTIMAL_MAX = 1000  # larger batches use the greedy solver
+
+# API docs (see utils.schema): the schema is generated once by
+# `manage.py generate_schema` into this file and served from /openapi.json.
+OPENAPI_SCHEMA_FILE = BASE_DIR / "openapi.json"
+OPENAPI_SCHEMA_MAX_AGE = 300  # seconds clients and proxies may cache it
+SWAGGER_SETTINGS = {"SPEC_URL": "schema-json"}
+REDOC_SETTINGS = {"SPEC_URL": "schema-json"}
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
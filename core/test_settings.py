@@ -0,0 +1,26 @@
+"""
+Settings for the test suite: SQLite and in-process cache and pub/sub, so the
+tests run without the docker compose services.
+
+    python manage.py test --settings=core.test_settings
+"""
+
+import os
+
+for name in ["POSTGRES_DB", "POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_HOST"]:
+    os.environ.setdefault(name, "")
+os.environ.setdefault("POSTGRES_PORT", "5432")
+
+from core.settings import *  # noqa: E402, F403
+
+DATABASES = {
+    "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"},
+    # A second ride database for the region sharding tests, see app_ride.sharding.
+    "north": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"},
+}
+
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+PUBSUB_BROKER = "utils.pubsub.InMemoryBroker"
+
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
@@ -17,29 +17,24 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import include, path
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Rider API",
-        default_version="v1",
-        description="This is an api for a mock Rider app",
-        contact=openapi.Contact(email="contact@snippets.local"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from utils.metrics import metrics_view
+from utils.schema import docs_view, schema_view
 
 admin_patterns = [
     path("admin/", admin.site.urls),
-    path("", schema_view.with_ui("swagger", cache_timeout=0), name="schema-swagger-ui"),
-    path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
+    path(
+        "",
+        docs_view("drf_yasg.renderers.SwaggerUIRenderer"),
+        name="schema-swagger-ui",
+    ),
+    path("redoc/", docs_view("drf_yasg.renderers.ReDocRenderer"), name="schema-redoc"),
+    path("openapi.json", schema_view, name="schema-json"),
+    path("metrics/", metrics_view, name="metrics"),
 ]
 
 app_patterns = [
+    path("", include("app_user.urls")),
     path("", include("app_ride.urls")),
 ]
 
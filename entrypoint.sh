@@ -11,6 +11,9 @@ echo "Postgres is ready!"
 echo "Running Django migrations..."
 python manage.py migrate --noinput
 
+echo "Generating the OpenAPI schema..."
+python manage.py generate_schema
+
 # echo "Collecting static files..."
 # python manage.py collectstatic --noinput
 if [ "$1" ]; then
@@ -0,0 +1,126 @@
+"""
+Stateless signed-token authentication.
+
+Tokens are signed with `SECRET_KEY` and carry the user id and an issue
+timestamp, so they are verified without a database hit. The user itself is
+resolved from a small in-process cache that `app_user` invalidates whenever a
+user is saved or deleted; entries also expire after `AUTH_PRINCIPAL_CACHE_TTL`
+seconds so changes made by other worker processes are picked up.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.utils.crypto import constant_time_compare, salted_hmac
+from rest_framework import authentication, exceptions
+
+TOKEN_SALT = "utils.authentication.SignedTokenAuthentication"
+
+
+def password_fingerprint(user) -> str:
+    """Short digest of the password hash, changing the password revokes old tokens."""
+    return salted_hmac(TOKEN_SALT, user.password).hexdigest()[:12]
+
+
+def issue_token(user) -> str:
+    return signing.dumps(
+        {"uid": user.pk, "pwd": password_fingerprint(user)}, salt=TOKEN_SALT
+    )
+
+
+class PrincipalCache:
+    """Thread-safe LRU of users by primary key with a time-to-live."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+    def get(self, pk) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(pk)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires < time.monotonic():
+                del self._entries[pk]
+                return None
+            self._entries.move_to_end(pk)
+            return user
+
+    def set(self, pk, user) -> None:
+        with self._lock:
+            self._entries[pk] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(pk)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, pk) -> None:
+        with self._lock:
+            self._entries.pop(pk, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.AUTH_PRINCIPAL_CACHE_SIZE, ttl=settings.AUTH_PRINCIPAL_CACHE_TTL
+)
+
+
+class SignedTokenAuthentication(authentication.BaseAuthentication):
+    """
+    `Authorization: Token <token>` (or `Bearer <token>`) authentication.
+
+    Tokens are issued by `POST /auth/token/` and expire after `AUTH_TOKEN_MAX_AGE` seconds.
+    """
+
+    keywords = (b"token", b"bearer")
+
+    def authenticate(self, request):
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or auth[0].lower() not in self.keywords:
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed("Invalid token header.")
+
+        try:
+            payload = signing.loads(
+                auth[1].decode(), salt=TOKEN_SALT, max_age=settings.AUTH_TOKEN_MAX_AGE
+            )
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed("Token has expired.")
+        except (signing.BadSignature, UnicodeDecodeError):
+            raise exceptions.AuthenticationFailed("Invalid token.")
+
+        user = self.get_user(payload["uid"])
+        if (
+            user is None
+            or not user.is_active
+            or not constant_time_compare(payload["pwd"], password_fingerprint(user))
+        ):
+            raise exceptions.AuthenticationFailed("Invalid token.")
+
+        # a copy, so request code can never mutate the shared cached instance
+        return copy.copy(user), payload
+
+    def get_user(self, pk):
+        user = principal_cache.get(pk)
+        if user is None:
+            user = get_user_model().objects.filter(pk=pk).first()
+            if user is not None:
+                principal_cache.set(pk, user)
+        return user
+
+    def authenticate_header(self, request):
+        return "Token"
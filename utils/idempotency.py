@@ -0,0 +1,126 @@
+"""
+`Idempotency-Key` support for write actions.
+
+The first successful response to a request carrying the header is kept in the
+`IDEMPOTENCY_CACHE` cache for `IDEMPOTENCY_TTL` seconds, keyed by user and
+key. A retry with the same key gets that response back (with an
+`Idempotent-Replayed: true` header) without running the action again, so it
+never touches the ride tables. The cache's own eviction bounds the store.
+
+While the first request runs, retries get 409 and should retry later. Reusing a
+key for a different request (another path or body) is rejected with 422.
+Failed responses are not kept: they wrote nothing, so a retry runs again.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+
+import orjson
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.utils import encoders
+
+from utils import metrics
+
+HEADER = "Idempotency-Key"
+
+_fallback_encoder = encoders.JSONEncoder()
+
+
+def fingerprint(request) -> str:
+    """Hash of what makes two requests the same: method, path and body."""
+    data = request.data
+    if hasattr(data, "lists"):
+        data = dict(data.lists())
+    body = orjson.dumps(
+        data, default=_fallback_encoder.default, option=orjson.OPT_SORT_KEYS
+    )
+    return hashlib.sha256(
+        f"{request.method} {request.path}\n".encode() + body
+    ).hexdigest()
+
+
+def idempotent(method):
+    """Decorate a view action to honor the `Idempotency-Key` header on unsafe methods."""
+
+    @functools.wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key or request.method in SAFE_METHODS:
+            return method(self, request, *args, **kwargs)
+
+        def count(outcome):
+            metrics.IDEMPOTENT_REQUESTS.labels(
+                type(self).__name__, getattr(self, "action", None) or "", outcome
+            ).inc()
+
+        if len(key) > settings.IDEMPOTENCY_MAX_KEY_LENGTH:
+            return self.RestResponse(
+                errors=f"{HEADER} must be at most {settings.IDEMPOTENCY_MAX_KEY_LENGTH} characters.",
+                status=400,
+            )
+
+        cache = caches[settings.IDEMPOTENCY_CACHE]
+        user = (
+            request.user.pk
+            if request.user and request.user.is_authenticated
+            else "anon"
+        )
+        cache_key = f"idempotency:{user}:{hashlib.sha256(key.encode()).hexdigest()}"
+        lock_key = f"{cache_key}:lock"
+        request_fingerprint = fingerprint(request)
+
+        def replay(stored):
+            if stored["fingerprint"] != request_fingerprint:
+                count("mismatch")
+                return self.RestResponse(
+                    errors=f"This {HEADER} was already used for a different request.",
+                    status=422,
+                )
+            count("replayed")
+            return Response(
+                orjson.loads(stored["data"]),
+                status=stored["status"],
+                headers={"Idempotent-Replayed": "true"},
+            )
+
+        stored = cache.get(cache_key)
+        if stored is not None:
+            return replay(stored)
+
+        if not cache.add(lock_key, 1, settings.IDEMPOTENCY_LOCK_SECONDS):
+            count("in_progress")
+            return self.RestResponse(
+                errors=f"A request with this {HEADER} is still in progress, retry later.",
+                status=409,
+                headers={"Retry-After": "1"},
+            )
+        try:
+            # the first request may have finished between the lookup and the lock
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return replay(stored)
+
+            response = method(self, request, *args, **kwargs)
+            if 200 <= response.status_code < 300:
+                count("stored")
+                cache.set(
+                    cache_key,
+                    {
+                        "fingerprint": request_fingerprint,
+                        "status": response.status_code,
+                        "data": orjson.dumps(
+                            response.data, default=_fallback_encoder.default
+                        ),
+                    },
+                    settings.IDEMPOTENCY_TTL,
+                )
+            return response
+        finally:
+            cache.delete(lock_key)
+
+    return wrapper
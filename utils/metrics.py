@@ -0,0 +1,192 @@
+"""
+Prometheus instrumentation for the API.
+
+Metrics are aggregated in-process by `prometheus_client`. When the
+`PROMETHEUS_MULTIPROC_DIR` environment variable points to a writable directory,
+every worker process writes its samples into memory-mapped files there and the
+`/metrics/` endpoint merges them, so the numbers cover all workers.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from django.db import connections
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+LABELS = ["view", "action", "method"]
+
+REQUEST_LATENCY = Histogram(
+    "rider_request_latency_seconds",
+    "Request latency per view action, including response rendering.",
+    LABELS,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+RESPONSE_SIZE = Histogram(
+    "rider_response_size_bytes",
+    "Rendered response body size per view action.",
+    LABELS,
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+DB_QUERIES = Histogram(
+    "rider_db_queries_per_request",
+    "Number of database queries executed per request.",
+    LABELS,
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+DB_TIME = Histogram(
+    "rider_db_time_seconds",
+    "Total database time spent per request.",
+    LABELS,
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+SERIALIZER_TIME = Histogram(
+    "rider_serializer_time_seconds",
+    "Time spent building serializer representations per request.",
+    LABELS,
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+RESPONSES = Counter(
+    "rider_responses_total",
+    "Responses per view action and status code.",
+    LABELS + ["status"],
+)
+IDEMPOTENT_REQUESTS = Counter(
+    "rider_idempotent_requests_total",
+    "Requests carrying an Idempotency-Key per view action and outcome "
+    "(stored, replayed, in_progress, mismatch).",
+    ["view", "action", "outcome"],
+)
+OUTBOX_MESSAGES = Counter(
+    "rider_outbox_messages_total",
+    "Ride outbox messages handled per handler and outcome (done, retried, dead, skipped).",
+    ["handler", "outcome"],
+)
+OUTBOX_LAG = Histogram(
+    "rider_outbox_lag_seconds",
+    "Time from writing a ride outbox message to handling it successfully.",
+    ["handler"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 1800.0),
+)
+OUTBOX_HANDLER_TIME = Histogram(
+    "rider_outbox_handler_seconds",
+    "Time spent running a ride outbox handler, including its transaction.",
+    ["handler"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+
+@dataclass
+class RequestTracker:
+    """Per-request accumulator for database and serializer timings."""
+
+    started: float = field(default_factory=time.perf_counter)
+    db_queries: int = 0
+    db_time: float = 0.0
+    serializer_time: float = 0.0
+    _serializing: bool = False
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper, see `connection.execute_wrapper()`."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+_current_tracker: ContextVar[Optional[RequestTracker]] = ContextVar(
+    "rider_request_tracker", default=None
+)
+
+
+@contextmanager
+def track_request() -> Iterator[RequestTracker]:
+    """Collect database timings for every connection while the block runs."""
+    tracker = RequestTracker()
+    token = _current_tracker.set(tracker)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(tracker))
+            yield tracker
+    finally:
+        _current_tracker.reset(token)
+
+
+@contextmanager
+def track_serialization() -> Iterator[None]:
+    """Add the block's duration to the current request's serializer time."""
+    tracker = _current_tracker.get()
+    if tracker is None or tracker._serializing:
+        yield
+        return
+
+    tracker._serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        tracker.serializer_time += time.perf_counter() - started
+        tracker._serializing = False
+
+
+def observe_response(view, request, tracker: RequestTracker, response) -> None:
+    """
+    Record the request metrics once the response body is available.
+
+    DRF responses are rendered after the view returns, so the observation is
+    deferred to a post-render callback to include rendering time and size.
+    Streaming responses are observed when the stream starts, without a size.
+    """
+    labels = (
+        type(view).__name__,
+        getattr(view, "action", None) or "unknown",
+        request.method,
+    )
+
+    def observe(rendered):
+        REQUEST_LATENCY.labels(*labels).observe(time.perf_counter() - tracker.started)
+        if not rendered.streaming:
+            RESPONSE_SIZE.labels(*labels).observe(len(rendered.content))
+        DB_QUERIES.labels(*labels).observe(tracker.db_queries)
+        DB_TIME.labels(*labels).observe(tracker.db_time)
+        SERIALIZER_TIME.labels(*labels).observe(tracker.serializer_time)
+        RESPONSES.labels(*labels, str(rendered.status_code)).inc()
+
+    if getattr(response, "is_rendered", True):
+        observe(response)
+    else:
+        response.add_post_render_callback(observe)
+
+
+def get_registry():
+    """Return a registry merging all worker processes when multiprocess mode is on."""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_view(request):
+    """Expose collected metrics in the Prometheus text format."""
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
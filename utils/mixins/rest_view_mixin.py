@@ -1,17 +1,25 @@
 from __future__ import annotations
 
-from functools import lru_cache
 from typing import Any, Optional, Union
 
-from rest_framework import status
+from rest_framework import exceptions, status
 from rest_framework.response import Response
 
+from utils import metrics
+
+# Precomputed once so status lookups are a dict hit instead of a scan of `vars(status)`.
+STATUS_CODES = {
+    value: value for name, value in vars(status).items() if name.startswith("HTTP_")
+}
+
 
 class RestViewMixin:
     """
     A reusable mixin for DRF providing:
       1. Action-based serializer identification.
       2. Unified JSON response with consistent schema.
+      3. Per-action request metrics (see `utils.metrics`).
+      4. Throttled requests answered with the same schema (see `utils.throttling`).
 
     Response schema:
     {
@@ -22,6 +30,26 @@ class RestViewMixin:
     }
     """
 
+    def dispatch(self, request, *args, **kwargs):
+        """Wrap the request with latency, database and response metrics."""
+        with metrics.track_request() as tracker:
+            response = super().dispatch(request, *args, **kwargs)
+
+        metrics.observe_response(self, request, tracker, response)
+        return response
+
+    def handle_exception(self, exc):
+        """Return throttling rejections in the unified response schema."""
+        if isinstance(exc, exceptions.Throttled):
+            headers = {"Retry-After": str(exc.wait)} if exc.wait is not None else None
+            return self.RestResponse(
+                message="Request was throttled.",
+                errors=str(exc.detail),
+                status=429,
+                headers=headers,
+            )
+        return super().handle_exception(exc)
+
     def get_serializer_class(self):
         """Identify which serializer to use based on the action name."""
 
@@ -64,13 +92,9 @@ class RestViewMixin:
             return [str(e) for e in errors if str(e).strip()]
         return [str(errors)]
 
-    @lru_cache(maxsize=None)
     def _map_status_constant(self, status_code: int) -> int:
         """Map numeric code to DRF status constant if available, returns the numeric code otherwise."""
-        for name, value in vars(status).items():
-            if name.startswith("HTTP_") and value == status_code:
-                return value
-        return status_code
+        return STATUS_CODES.get(status_code, status_code)
 
     def _build_message(self, message: Optional[str], code: int) -> str:
         """Provide a default message if none is given."""
@@ -0,0 +1,22 @@
+from rest_framework import serializers
+
+from utils import metrics
+
+
+class TimedSerializerMixin:
+    """
+    Records the time spent in `to_representation` into the request metrics.
+
+    Only top-level serializers (or the items of a top-level `many=True` list)
+    are timed, nested serializers are already covered by their parent.
+    """
+
+    def to_representation(self, instance):
+        parent = self.parent
+        if parent is not None and not (
+            isinstance(parent, serializers.ListSerializer) and parent.parent is None
+        ):
+            return super().to_representation(instance)
+
+        with metrics.track_serialization():
+            return super().to_representation(instance)
@@ -1,3 +1,4 @@
+from django.core.paginator import Paginator
 from rest_framework.pagination import PageNumberPagination
 
 
@@ -15,3 +16,12 @@ class StandardResultsSetPagination(PageNumberPagination):
             "previous": self.get_previous_link(),
             "results": data,
         }
+
+    def get_shared_page_data(self, request, count, number, data):
+        """
+        Paginated data of a page counted and loaded for another, identical
+        request: only the links are built from this one.
+        """
+        self.request = request
+        self.page = Paginator(range(count), self.get_page_size(request)).page(number)
+        return self.get_paginated_data(data)
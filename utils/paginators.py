@@ -0,0 +1,45 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for very large tables.
+
+    An unfiltered changelist on PostgreSQL uses the planner's row estimate from
+    `pg_class.reltuples` instead of an exact `COUNT(*)` over the whole table.
+    A partitioned table has no estimate of its own, its partitions' are summed.
+    Filtered querysets, small tables and other databases keep the exact count.
+    """
+
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+
+        if connection.vendor == "postgresql" and not queryset.query.where:
+            with connection.cursor() as cursor:
+                # reltuples is -1 for tables that were never analyzed
+                cursor.execute(
+                    """
+                    SELECT COALESCE(
+                        (
+                            SELECT SUM(GREATEST(child.reltuples, 0))
+                            FROM pg_inherits
+                            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                            WHERE pg_inherits.inhparent = %s::regclass
+                        ),
+                        (SELECT reltuples FROM pg_class WHERE oid = %s::regclass)
+                    )::bigint
+                    """,
+                    [queryset.model._meta.db_table] * 2,
+                )
+                row = cursor.fetchone()
+
+            if row and row[0] > self.estimate_threshold:
+                return row[0]
+
+        return super().count
@@ -0,0 +1,171 @@
+"""
+Lightweight topic based pub/sub used to push changes to streaming clients.
+
+`InMemoryBroker` delivers messages between threads of a single process and is
+meant for tests and single-process development servers. `PostgresBroker` sends
+every message through PostgreSQL `NOTIFY` so subscribers in every worker process
+receive it. The broker class is selected with the `PUBSUB_BROKER` setting.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Optional
+
+import orjson
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connections
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """A bounded queue of messages for one subscriber and its topics."""
+
+    def __init__(self, broker: InMemoryBroker, topics: tuple[str, ...], maxsize: int):
+        self.broker = broker
+        self.topics = topics
+        self.queue: queue.Queue = queue.Queue(maxsize)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[dict[str, Any]]:
+        """Wait up to `timeout` seconds for the next message, None if there is none."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def put(self, message: dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            # A slow consumer must never block publishers, it will resync on reconnect.
+            logger.warning("Dropping pub/sub message for a full subscription.")
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+    def __enter__(self) -> Subscription:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class InMemoryBroker:
+    """Fan out published messages to the subscriptions of this process."""
+
+    max_queue_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions: dict[str, set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, *topics: str) -> Subscription:
+        subscription = Subscription(self, topics, self.max_queue_size)
+        with self._lock:
+            for topic in topics:
+                self._subscriptions[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscriptions.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[topic]
+
+    def publish(self, topics: list[str], message: dict[str, Any]) -> None:
+        """Deliver `message` once to every subscription of any of `topics`."""
+        self._deliver(topics, message)
+
+    def _deliver(self, topics: list[str], message: dict[str, Any]) -> None:
+        with self._lock:
+            recipients = set()
+            for topic in topics:
+                recipients.update(self._subscriptions.get(topic, ()))
+
+        for subscription in recipients:
+            subscription.put(message)
+
+
+class PostgresBroker(InMemoryBroker):
+    """
+    Cross-process broker on top of PostgreSQL LISTEN/NOTIFY.
+
+    `publish()` runs `pg_notify` on the current database connection, so inside a
+    transaction the notification is only sent on commit. Each process runs one
+    daemon thread that LISTENs on a dedicated connection and hands notifications
+    to the local subscriptions.
+    """
+
+    channel = "rider_pubsub"
+    reconnect_delay = 1.0
+
+    def __init__(self, using: str = "default"):
+        super().__init__()
+        self.using = using
+        self._listener: Optional[threading.Thread] = None
+
+    def publish(self, topics: list[str], message: dict[str, Any]) -> None:
+        payload = orjson.dumps({"topics": topics, "message": message}).decode()
+        with connections[self.using].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    def subscribe(self, *topics: str) -> Subscription:
+        self._ensure_listener()
+        return super().subscribe(*topics)
+
+    def _ensure_listener(self) -> None:
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(
+                    target=self._listen, name="pubsub-listener", daemon=True
+                )
+                self._listener.start()
+
+    def _listen(self) -> None:
+        while True:
+            connection = connections.create_connection(self.using)
+            try:
+                connection.ensure_connection()
+                raw = connection.connection
+                raw.execute(f"LISTEN {self.channel}")
+                for notify in raw.notifies():
+                    data = orjson.loads(notify.payload)
+                    self._deliver(data["topics"], data["message"])
+            except Exception:
+                logger.exception("Pub/sub listener lost its connection, reconnecting.")
+                time.sleep(self.reconnect_delay)
+            finally:
+                connection.close()
+
+
+_broker: Optional[InMemoryBroker] = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> InMemoryBroker:
+    """Return the process wide broker configured by `settings.PUBSUB_BROKER`."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.PUBSUB_BROKER)()
+    return _broker
+
+
+@receiver(setting_changed)
+def reset_broker(setting, **kwargs):
+    """Let `override_settings(PUBSUB_BROKER=...)` swap the broker, e.g. in tests."""
+    global _broker
+    if setting == "PUBSUB_BROKER":
+        _broker = None
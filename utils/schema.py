@@ -0,0 +1,107 @@
+"""
+Precomputed OpenAPI schema and the docs pages built on it.
+
+Generating the schema introspects every view and serializer, so it is done
+once: `python manage.py generate_schema` writes it to `OPENAPI_SCHEMA_FILE`
+(the entrypoint runs it at startup) and workers serve that file as is. Without
+the file, the first request generates the schema in process and keeps it.
+
+drf_yasg is only imported when a docs page or the schema is first requested,
+so loading the URLconf does not pay for it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from typing import Optional
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
+from django.utils.module_loading import import_string
+
+_schema: Optional[bytes] = None
+_etag: Optional[str] = None
+_lock = threading.Lock()
+
+
+def schema_info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="Rider API",
+        default_version="v1",
+        description="This is an api for a mock Rider app",
+        contact=openapi.Contact(email="contact@snippets.local"),
+        license=openapi.License(name="BSD License"),
+    )
+
+
+def generate_schema() -> bytes:
+    """Introspect the API and encode its full (public) schema as JSON."""
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    swagger = OpenAPISchemaGenerator(schema_info()).get_schema(
+        request=None, public=True
+    )
+    return OpenAPICodecJson(validators=[]).encode(swagger)
+
+
+def get_schema() -> tuple[bytes, str]:
+    """The schema and its ETag, read from `OPENAPI_SCHEMA_FILE` or generated once."""
+    global _schema, _etag
+    if _schema is None:
+        with _lock:
+            if _schema is None:
+                try:
+                    with open(settings.OPENAPI_SCHEMA_FILE, "rb") as file:
+                        schema = file.read()
+                except FileNotFoundError:
+                    schema = generate_schema()
+                _etag = f'"{hashlib.md5(schema).hexdigest()}"'
+                _schema = schema
+    return _schema, _etag
+
+
+def schema_view(request):
+    """Serve the precomputed schema, revalidated with its ETag."""
+    schema, etag = get_schema()
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(schema, content_type="application/json")
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+    return response
+
+
+def docs_view(renderer_path: str):
+    """
+    A Swagger UI or ReDoc page for the precomputed schema.
+
+    The page itself only holds the UI settings, the browser then fetches the
+    schema from `schema_view` (`SPEC_URL`). `?format=openapi` still returns the
+    schema, as the drf_yasg views did.
+    """
+
+    def view(request):
+        if request.GET.get("format") == "openapi":
+            return schema_view(request)
+
+        from drf_yasg import openapi
+
+        renderer = import_string(renderer_path)()
+        swagger = openapi.Swagger(
+            info=schema_info(), _prefix="/", paths=openapi.Paths(paths={})
+        )
+        context = {"request": request}
+        renderer.set_context(context, swagger)
+        return HttpResponse(
+            render_to_string(renderer.template, context, request),
+            content_type="text/html; charset=utf-8",
+        )
+
+    return view
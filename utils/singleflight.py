@@ -0,0 +1,140 @@
+"""
+Single-flight coalescing of identical concurrent computations.
+
+While one request (the leader) computes the result for a key, identical
+requests wait for it instead of running the same query again, and every waiter
+gets the leader's result. A finished result is reused as is for `fresh`
+seconds, then served stale for up to `stale` seconds to everyone but the one
+request refreshing it. With `shared=True` the leader also takes a lock in the
+`default` cache and publishes its result there, so other worker processes
+coalesce on it too.
+
+Results are shared objects: callers must treat them as read-only.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from django.core.cache import caches
+
+
+class Call:
+    """One in-flight computation and its outcome."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    poll_interval = 0.02
+
+    def __init__(
+        self,
+        fresh: float = 0.5,
+        stale: float = 2.0,
+        wait: float = 10.0,
+        shared: bool = False,
+        cache_alias: str = "default",
+        max_entries: int = 1000,
+    ):
+        self.fresh = fresh
+        self.stale = max(stale, fresh)
+        self.wait = wait
+        self.shared = shared
+        self.cache_alias = cache_alias
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Call] = {}
+        self._results: dict[str, tuple[float, Any]] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Return `fn()`, sharing it with identical concurrent or recent calls."""
+        now = time.monotonic()
+        with self._lock:
+            result = self._results.get(key)
+            if result and now - result[0] <= self.fresh:
+                return result[1]
+
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = Call()
+            elif result and now - result[0] <= self.stale:
+                # someone is already refreshing it
+                return result[1]
+
+        if not leader:
+            if not call.done.wait(self.wait):
+                # the leader is stuck, do not queue behind it any longer
+                return fn()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = self._compute(key, fn)
+        except BaseException as ex:
+            call.error = ex
+            raise
+        else:
+            self._remember(key, call.value)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+        return call.value
+
+    def clear(self) -> None:
+        """Forget the finished results, the next call of every key recomputes."""
+        with self._lock:
+            self._results = {}
+
+    def _remember(self, key: str, value: Any) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._results[key] = (now, value)
+            if len(self._results) > self.max_entries:
+                self._results = {
+                    k: entry
+                    for k, entry in self._results.items()
+                    if now - entry[0] <= self.stale
+                }
+
+    def _compute(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run `fn`, coalescing with other processes through the cache when shared."""
+        if not self.shared:
+            return fn()
+
+        cache = caches[self.cache_alias]
+        result_key = f"singleflight:{key}:result"
+        lock_key = f"singleflight:{key}:lock"
+
+        cached = cache.get(result_key)
+        if cached is not None:
+            return cached
+
+        if cache.add(lock_key, 1, timeout=math.ceil(self.wait)):
+            try:
+                value = fn()
+                cache.set(result_key, value, timeout=math.ceil(self.stale))
+                return value
+            finally:
+                cache.delete(lock_key)
+
+        # another process is computing it, wait for its result
+        deadline = time.monotonic() + self.wait
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            cached = cache.get(result_key)
+            if cached is not None:
+                return cached
+            if cache.get(lock_key) is None:
+                break
+        return fn()
@@ -0,0 +1,89 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from app_ride.tests.utils import make_user
+from utils.authentication import (
+    PrincipalCache,
+    SignedTokenAuthentication,
+    principal_cache,
+)
+
+
+class PrincipalCacheTests(SimpleTestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = PrincipalCache(maxsize=2, ttl=60)
+        cache.set(1, "one")
+        cache.set(2, "two")
+        cache.get(1)
+        cache.set(3, "three")
+        self.assertEqual(cache.get(1), "one")
+        self.assertIsNone(cache.get(2))
+
+    def test_entries_expire(self):
+        cache = PrincipalCache(maxsize=2, ttl=60)
+        with mock.patch("utils.authentication.time.monotonic", return_value=100):
+            cache.set(1, "one")
+        with mock.patch("utils.authentication.time.monotonic", return_value=161):
+            self.assertIsNone(cache.get(1))
+
+
+class TokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        principal_cache.clear()
+        self.admin = make_user("admin@example.com", role="admin")
+
+    def obtain_token(self, password="password"):
+        return self.client.post(
+            "/auth/token/", {"email": self.admin.email, "password": password}
+        )
+
+    def authorize(self, token, keyword="Token"):
+        self.client.credentials(HTTP_AUTHORIZATION=f"{keyword} {token}")
+
+    def test_token_authenticates_requests(self):
+        response = self.obtain_token()
+        self.assertEqual(response.status_code, 200)
+        token = response.json()["data"]["token"]
+
+        for keyword in ["Token", "Bearer"]:
+            self.authorize(token, keyword)
+            self.assertEqual(self.client.get("/ride/").status_code, 200)
+
+    def test_wrong_password_gets_no_token(self):
+        self.assertEqual(self.obtain_token("wrong").status_code, 400)
+
+    def test_the_user_is_served_from_the_cache(self):
+        token = self.obtain_token().json()["data"]["token"]
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Token {token}")
+        SignedTokenAuthentication().authenticate(request)
+
+        with self.assertNumQueries(0):
+            user, _ = SignedTokenAuthentication().authenticate(request)
+        self.assertEqual(user.pk, self.admin.pk)
+
+    def test_password_change_revokes_tokens(self):
+        self.authorize(self.obtain_token().json()["data"]["token"])
+        self.client.get("/ride/")
+
+        self.admin.set_password("changed")
+        self.admin.save()
+        self.assertEqual(self.client.get("/ride/").status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        self.authorize(self.obtain_token().json()["data"]["token"])
+        self.admin.is_active = False
+        self.admin.save()
+        self.assertEqual(self.client.get("/ride/").status_code, 401)
+
+    def test_expired_and_tampered_tokens_are_rejected(self):
+        token = self.obtain_token().json()["data"]["token"]
+        self.authorize(token[:-1] + ("A" if token[-1] != "A" else "B"))
+        self.assertEqual(self.client.get("/ride/").status_code, 401)
+
+        self.authorize(token)
+        with override_settings(AUTH_TOKEN_MAX_AGE=-1):
+            response = self.client.get("/ride/")
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("expired", str(response.json()))
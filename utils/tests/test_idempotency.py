@@ -0,0 +1,79 @@
+import hashlib
+
+from django.core.cache import cache
+
+from app_ride.models import Ride, RideEvent
+from app_ride.tests.utils import RideAPITestCase, make_ride, make_user
+
+
+class IdempotencyTests(RideAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.payload = self.ride_payload()
+
+    def create(self, key, **fields):
+        return self.client.post(
+            "/ride/", {**self.payload, **fields}, HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_the_first_response(self):
+        first = self.create("create-1")
+        retry = self.create("create-1")
+
+        self.assertEqual(retry.status_code, first.status_code)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertFalse(first.has_header("Idempotent-Replayed"))
+        self.assertEqual(Ride.objects.count(), 1)
+
+        # another key is another request
+        self.create("create-2")
+        self.assertEqual(Ride.objects.count(), 2)
+
+    def test_keys_are_per_user(self):
+        self.create("create-1")
+        self.client.force_authenticate(make_user("admin2@example.com", role="admin"))
+        response = self.create("create-1")
+        self.assertFalse(response.has_header("Idempotent-Replayed"))
+        self.assertEqual(Ride.objects.count(), 2)
+
+    def test_key_reused_for_another_request_is_rejected(self):
+        self.create("create-1")
+        response = self.create("create-1", pickup_latitude=7.08)
+        self.assertEqual(response.status_code, 422)
+
+        ride = make_ride(self.rider, self.driver)
+        response = self.client.post(
+            f"/ride/{ride.pk}/set/en-route/", HTTP_IDEMPOTENCY_KEY="create-1"
+        )
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Ride.objects.get(pk=ride.pk).status, "pending")
+
+    def test_failed_responses_are_not_kept(self):
+        response = self.create("create-1", rider=999999)
+        self.assertEqual(response.status_code, 400)
+        response = self.create("create-1")
+        self.assertFalse(response.has_header("Idempotent-Replayed"))
+        self.assertEqual(Ride.objects.count(), 1)
+
+    def test_retry_while_the_first_request_runs(self):
+        digest = hashlib.sha256(b"create-1").hexdigest()
+        cache.add(f"idempotency:{self.admin.pk}:{digest}:lock", 1)
+        response = self.create("create-1")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertFalse(Ride.objects.exists())
+
+    def test_transition_is_not_applied_twice(self):
+        ride = make_ride(self.rider, self.driver)
+        url = f"/ride/{ride.pk}/set/en-route/"
+        first = self.client.post(url, HTTP_IDEMPOTENCY_KEY="start")
+        # without the key the second transition would fail, en-route to en-route
+        retry = self.client.post(url, HTTP_IDEMPOTENCY_KEY="start")
+        self.assertEqual((first.status_code, retry.status_code), (200, 200))
+        self.assertEqual(RideEvent.objects.filter(ride=ride).count(), 1)
+
+    def test_key_length_is_bounded(self):
+        response = self.create("x" * 256)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Ride.objects.exists())
@@ -0,0 +1,96 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import msgpack
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+
+from utils.renderers import FastJSONRenderer, MessagePackRenderer
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_matches_the_drf_renderer(self):
+        data = {
+            "message": "Success",
+            "errors": [],
+            "data": {"id": 1, "amount": Decimal("1.50"), "names": ["á", "b"]},
+            "status": 200,
+        }
+        fast = json.loads(FastJSONRenderer().render(data))
+        drf = json.loads(JSONRenderer().render(data))
+        self.assertEqual(fast, drf)
+
+    def test_datetimes_are_iso_8601_in_utc(self):
+        moment = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        self.assertEqual(
+            FastJSONRenderer().render({"at": moment}), b'{"at":"2026-01-02T03:04:05Z"}'
+        )
+
+    def test_line_separators_are_escaped(self):
+        rendered = FastJSONRenderer().render({"text": "a\u2028b\u2029c"})
+        self.assertEqual(rendered, b'{"text":"a\\u2028b\\u2029c"}')
+
+    def test_none_renders_an_empty_body(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_indent_is_honored(self):
+        rendered = FastJSONRenderer().render({"a": 1}, "application/json; indent=4", {})
+        self.assertIn(b"\n", rendered)
+
+
+class ColumnarView:
+    columnar_tables = {"rider": "users", "driver": "users"}
+    columnar_fixed_point = ["latitude"]
+
+
+class MessagePackRendererTests(SimpleTestCase):
+    rider = {"id": 1, "email": "rider@example.com"}
+    driver = {"id": 2, "email": "driver@example.com"}
+    page = {
+        "message": "Success",
+        "data": {
+            "count": 2,
+            "results": [
+                {"id": 10, "rider": rider, "driver": driver, "latitude": 7.070001},
+                {"id": 11, "rider": rider, "driver": None, "latitude": None},
+            ],
+        },
+    }
+
+    def render(self, data, media_type="application/msgpack"):
+        rendered = MessagePackRenderer().render(
+            data, media_type, {"view": ColumnarView()}
+        )
+        return msgpack.unpackb(rendered, strict_map_key=False)
+
+    def test_same_document_as_json(self):
+        self.assertEqual(self.render(self.page), self.page)
+        data = {"amount": Decimal("1.50")}
+        self.assertEqual(self.render(data), json.loads(FastJSONRenderer().render(data)))
+        self.assertEqual(MessagePackRenderer().render(None), b"")
+
+    def test_columnar_list_page(self):
+        data = self.render(self.page, "application/msgpack; layout=columnar")
+        self.assertEqual(data["message"], "Success")
+        self.assertEqual(data["data"]["count"], 2)
+        self.assertEqual(
+            data["data"]["results"],
+            {
+                "length": 2,
+                "columns": {
+                    "id": [10, 11],
+                    "rider": [1, 1],
+                    "driver": [2, None],
+                    "latitude": [7070001, None],
+                },
+                "tables": {"users": [self.rider, self.driver]},
+                "fixed_point": ["latitude"],
+                "scale": 1_000_000,
+            },
+        )
+
+    def test_columnar_leaves_other_documents_alone(self):
+        detail = {"message": "Success", "data": {"id": 10, "rider": self.rider}}
+        media_type = "application/msgpack; layout=columnar"
+        self.assertEqual(self.render(detail, media_type), detail)
@@ -0,0 +1,90 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from utils import schema
+
+
+class SchemaTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "openapi.json")
+        # every test starts without a schema loaded in process
+        for name in ("_schema", "_etag"):
+            patcher = mock.patch.object(schema, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_generated_schema_lists_the_api(self):
+        generated = json.loads(schema.generate_schema())
+        self.assertEqual(generated["info"]["title"], "Rider API")
+        self.assertIn("/ride/", generated["paths"])
+
+    def test_serves_the_precomputed_file_with_its_etag(self):
+        with open(self.path, "wb") as file:
+            file.write(b'{"swagger": "2.0"}')
+
+        with (
+            override_settings(OPENAPI_SCHEMA_FILE=self.path),
+            mock.patch.object(schema, "generate_schema") as generate,
+        ):
+            response = self.client.get("/openapi.json")
+            self.assertEqual(response.content, b'{"swagger": "2.0"}')
+            self.assertIn("max-age=300", response["Cache-Control"])
+
+            etag = response["ETag"]
+            response = self.client.get("/openapi.json", HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            # the docs pages keep their old schema URL
+            response = self.client.get("/", {"format": "openapi"})
+            self.assertEqual(response.content, b'{"swagger": "2.0"}')
+        generate.assert_not_called()
+
+    def test_missing_file_is_generated_once(self):
+        with (
+            override_settings(OPENAPI_SCHEMA_FILE=self.path),
+            mock.patch.object(
+                schema, "generate_schema", return_value=b"{}"
+            ) as generate,
+        ):
+            self.client.get("/openapi.json")
+            self.client.get("/openapi.json")
+        generate.assert_called_once()
+
+    def test_docs_pages_render_without_the_schema(self):
+        with mock.patch.object(schema, "generate_schema") as generate:
+            for url in ("/", "/redoc/"):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(b"Rider API", response.content)
+        generate.assert_not_called()
+
+    def test_generate_schema_command_writes_the_file(self):
+        call_command("generate_schema", output=self.path, stdout=StringIO())
+        with open(self.path) as file:
+            self.assertIn("/ride/", json.load(file)["paths"])
+        self.assertFalse(os.path.exists(f"{self.path}.tmp"))
+
+    def test_urlconf_does_not_import_the_docs_tooling(self):
+        # the bare `drf_yasg` app package is loaded by INSTALLED_APPS
+        code = (
+            "import sys, django; django.setup(); import core.urls; "
+            "print('drf_yasg.openapi' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "core.test_settings"},
+        )
+        self.assertEqual(result.stdout.strip(), "False", result.stderr)
@@ -0,0 +1,64 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from utils.throttling import WeightedRateThrottle, parse_rate
+
+
+class ReportView:
+    action = "list"
+
+    def __init__(self, cost=1):
+        self.cost = cost
+
+    def get_throttle_cost(self, request):
+        return self.cost
+
+
+@override_settings(
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {"anon": "5/min", "ReportView.list": "10/min"},
+    }
+)
+class WeightedRateThrottleTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        WeightedRateThrottle._previous_counts.clear()
+        self.request = Request(APIRequestFactory().get("/report/"))
+
+    def allow(self, view, at):
+        throttle = WeightedRateThrottle()
+        with mock.patch("utils.throttling.time.time", return_value=at):
+            return throttle.allow_request(self.request, view), throttle.wait()
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("600/min"), (600, 60))
+        self.assertEqual(parse_rate("10/s"), (10, 1))
+
+    def test_requests_consume_their_cost(self):
+        view = ReportView(cost=4)
+        self.assertEqual(self.allow(view, 6000), (True, None))
+        self.assertEqual(self.allow(view, 6001), (True, None))
+        # 12 units in the window, over the 10/min budget until the next one
+        self.assertEqual(self.allow(view, 6002), (False, 58))
+
+    def test_previous_window_slides_out(self):
+        view = ReportView(cost=5)
+        self.allow(view, 6030)
+        self.allow(view, 6031)
+        # a quarter into the next window, 3/4 of the previous 10 units remain
+        self.assertEqual(self.allow(view, 6075)[0], False)
+        # halfway through, 5 + 5 = 10 fits the budget
+        self.assertEqual(self.allow(ReportView(cost=0), 6090)[0], True)
+
+    def test_cache_errors_let_requests_through(self):
+        with mock.patch.object(
+            WeightedRateThrottle, "incr", side_effect=ConnectionError("down")
+        ):
+            with self.assertLogs("utils.throttling", "WARNING"):
+                self.assertEqual(self.allow(ReportView(cost=100), 6000), (True, None))
@@ -0,0 +1,121 @@
+"""
+Weighted request throttling shared by every worker process.
+
+Each user (or client IP when anonymous) gets a budget of cost units per period
+and per view action. Requests consume `view.get_throttle_cost(request)` units,
+so views can charge expensive queries more than cheap ones. Counts live in the
+`default` cache, which must be shared (e.g. Redis via `CACHE_URL`) for the
+limits to hold across processes. While that cache is unreachable requests are
+let through (and the error logged) rather than failed.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from typing import Optional
+
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """`"600/min"` -> `(600, 60)`, the same format as DRF's throttle rates."""
+    num, period = rate.split("/")
+    return int(num), PERIODS[period[0]]
+
+
+class WeightedRateThrottle(BaseThrottle):
+    """
+    Sliding window counter over two fixed windows.
+
+    The estimate is `previous window * share of it still in the sliding window
+    + current window`. A request costs one atomic `incr` on the shared cache:
+    the previous window no longer changes, so its count is read once per window
+    and kept in process. Rejected requests still count, so a client that keeps
+    hammering stays limited instead of getting a request through each time a
+    little budget frees up.
+
+    Rates come from `DEFAULT_THROTTLE_RATES`: `"<ViewClass>.<action>"` entries
+    override the `"user"` and `"anon"` defaults.
+    """
+
+    cache_alias = "default"
+    key_prefix = "throttle"
+
+    _previous_counts: dict[str, int] = {}
+    _previous_lock = threading.Lock()
+
+    def __init__(self):
+        self.wait_seconds: Optional[float] = None
+
+    def allow_request(self, request, view):
+        scope = f"{type(view).__name__}.{getattr(view, 'action', None) or request.method.lower()}"
+        authenticated = request.user and request.user.is_authenticated
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        rate = rates.get(scope) or rates.get("user" if authenticated else "anon")
+        if not rate:
+            return True
+
+        limit, period = parse_rate(rate)
+        get_cost = getattr(view, "get_throttle_cost", None)
+        cost = get_cost(request) if get_cost else 1
+        ident = request.user.pk if authenticated else self.get_ident(request)
+
+        now = time.time()
+        window, elapsed = divmod(now, period)
+        key = f"{self.key_prefix}:{scope}:{ident}:{int(window)}"
+        try:
+            current = self.incr(key, cost, timeout=period * 2)
+            previous = self.previous_count(
+                f"{self.key_prefix}:{scope}:{ident}:{int(window) - 1}"
+            )
+        except Exception:
+            # backends raise their own client errors, e.g. redis.ConnectionError
+            logger.warning(
+                "Throttle cache unavailable, request allowed.", exc_info=True
+            )
+            return True
+
+        remaining_share = 1 - elapsed / period
+        if previous * remaining_share + current <= limit:
+            return True
+
+        # The current window alone is over budget: wait for the next one,
+        # otherwise until enough of the previous window has slid out.
+        if current > limit or not previous:
+            self.wait_seconds = period - elapsed
+        else:
+            excess = previous * remaining_share + current - limit
+            self.wait_seconds = min(period - elapsed, excess / previous * period)
+        return False
+
+    def incr(self, key: str, cost: int, timeout: int) -> int:
+        cache = caches[self.cache_alias]
+        try:
+            return cache.incr(key, cost)
+        except ValueError:
+            # first request of the window
+            if cache.add(key, cost, timeout):
+                return cost
+            return cache.incr(key, cost)
+
+    def previous_count(self, key: str) -> int:
+        count = self._previous_counts.get(key)
+        if count is None:
+            count = caches[self.cache_alias].get(key, 0)
+            with self._previous_lock:
+                if len(self._previous_counts) > 10000:
+                    self._previous_counts.clear()
+                self._previous_counts[key] = count
+        return count
+
+    def wait(self):
+        return math.ceil(self.wait_seconds) if self.wait_seconds is not None else None